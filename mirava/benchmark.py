@@ -0,0 +1,84 @@
+"""Download-throughput measurement for ``--benchmark``.
+
+Each registry names a representative file (see
+``BaseRegistry.benchmark_url``): a pool ``.deb`` for APT, a package tarball
+for npm, a wheel for PyPI, a layer blob for Docker registries and the index
+itself for Yum, Alpine and Pacman. The file is fetched a few times up to a
+byte budget and the median transfer rate, median time to first byte and
+TTFB jitter are recorded on the :class:`~mirava.models.CheckResult`.
+"""
+from __future__ import annotations
+
+import statistics
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from .defaults import BENCH_BYTES, BENCH_SAMPLES, MB
+from .models import Throughput
+
+if TYPE_CHECKING:
+    import httpx
+
+
+@dataclass
+class BenchmarkConfig:
+    budget_bytes: int = BENCH_BYTES
+    samples: int = BENCH_SAMPLES
+
+    @classmethod
+    def from_args(cls, args) -> Optional["BenchmarkConfig"]:
+        """Config for the parsed CLI options, or None without ``--benchmark``."""
+        if not args.benchmark:
+            return None
+        return cls(budget_bytes=int(args.bench_mb * MB), samples=args.bench_samples)
+
+
+async def _sample(client: httpx.AsyncClient, url: str, budget: int) -> Tuple[int, float, int, float]:
+    """One ranged download: status, TTFB in ms, bytes read and transfer seconds."""
+    start = time.perf_counter()
+    headers = {"Range": f"bytes=0-{budget - 1}"}
+    async with client.stream("GET", url, headers=headers, follow_redirects=True) as resp:
+        ttfb = time.perf_counter() - start
+        received = 0
+        if resp.status_code in (200, 206):
+            # Servers that ignore Range still stop at the budget: leaving the
+            # block closes the stream.
+            async for chunk in resp.aiter_bytes():
+                received += len(chunk)
+                if received >= budget:
+                    break
+        transfer = time.perf_counter() - start - ttfb
+    return resp.status_code, ttfb * 1000, received, transfer
+
+
+async def measure_throughput(client: httpx.AsyncClient, url: str, config: BenchmarkConfig) -> Throughput:
+    # Imported here so the CLI can read BenchmarkConfig without httpx.
+    import httpx
+
+    ttfbs: List[float] = []
+    rates: List[float] = []
+    total = 0
+    error = ""
+    for _ in range(max(1, config.samples)):
+        try:
+            status, ttfb, received, transfer = await _sample(client, url, config.budget_bytes)
+        except httpx.RequestError as exc:
+            error = str(exc) or type(exc).__name__
+            continue
+        if status not in (200, 206):
+            error = f"http {status}"
+            break
+        ttfbs.append(ttfb)
+        total += received
+        if received and transfer > 0:
+            rates.append(received / transfer / MB)
+    return Throughput(
+        url=url,
+        mbps=statistics.median(rates) if rates else None,
+        ttfb_ms=statistics.median(ttfbs) if ttfbs else None,
+        jitter_ms=statistics.pstdev(ttfbs) if len(ttfbs) > 1 else None,
+        bytes=total,
+        samples=len(ttfbs),
+        detail="" if rates else (error or "empty response"),
+    )
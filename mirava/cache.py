@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .deadlines import current, guard
+from .defaults import CACHE_MAX_BYTES
+from .metrics import INDEX_BYTES, INDEX_CACHE
+
+if TYPE_CHECKING:
+    import httpx
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BYTES = CACHE_MAX_BYTES
+
+
+def default_cache_dir() -> str:
+    if sys.platform == "win32":
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(root, "mirava", "index")
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    path: str
+    etag: str = ""
+    last_modified: str = ""
+    # False when a reader stopped early and only a prefix of the body is stored.
+    complete: bool = True
+
+    def validators(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def resume_headers(self) -> Dict[str, str]:
+        """Range request for the rest of a partial body, if it has not changed since."""
+        # If-Range only accepts a strong ETag or a date.
+        validator = self.etag if self.etag and not self.etag.startswith("W/") else self.last_modified
+        if not validator:
+            return {}
+        return {"Range": f"bytes={os.path.getsize(self.path)}-", "If-Range": validator}
+
+
+class IndexCache:
+    """Repository indexes on disk, keyed by URL and revalidated with ETag/Last-Modified.
+
+    Bodies are stored verbatim (still compressed). The least recently used
+    entries are evicted once the total size exceeds ``max_bytes``.
+
+    Readers usually stop as soon as every package has been seen, so most
+    bodies are never read to the end. What was read is kept as a partial
+    entry, and the next run asks for the rest with ``Range``/``If-Range``:
+    the prefix comes from disk and the download resumes where the last one
+    stopped. The trade-off: a partial entry never saves a request (there is
+    no ``304`` for it), and mirrors that ignore ``Range`` send the whole body
+    again, replacing the entry.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = root or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _key(self, url: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        key = self._key(url)
+        try:
+            with open(f"{key}.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or not os.path.exists(f"{key}.body"):
+            return None
+        return CacheEntry(
+            url=url,
+            path=f"{key}.body",
+            etag=meta.get("etag", ""),
+            last_modified=meta.get("last_modified", ""),
+            complete=meta.get("complete", True),
+        )
+
+    def touch(self, entry: CacheEntry) -> None:
+        try:
+            os.utime(entry.path)
+        except OSError:
+            pass
+
+    def writer(self, url: str, headers: httpx.Headers, prefix: Optional[CacheEntry] = None) -> "_CacheWriter":
+        """Writer for a response body; with ``prefix``, the body continues that partial entry."""
+        if prefix is not None:
+            return _CacheWriter(self, url, prefix.etag, prefix.last_modified, prefix=prefix.path)
+        # A decoded body's offsets are not the ones Range refers to.
+        resumable = not headers.get("content-encoding")
+        return _CacheWriter(self, url, headers.get("etag", ""), headers.get("last-modified", ""), resumable)
+
+    def drop(self, url: str) -> None:
+        key = self._key(url)
+        for suffix in (".body", ".json"):
+            try:
+                os.remove(key + suffix)
+            except OSError:
+                pass
+
+    def _commit(self, url: str, tmp_path: str, etag: str, last_modified: str, complete: bool = True) -> None:
+        key = self._key(url)
+        os.replace(tmp_path, f"{key}.body")
+        with open(f"{key}.json", "w", encoding="utf-8") as f:
+            json.dump({"url": url, "etag": etag, "last_modified": last_modified, "complete": complete}, f)
+        self.evict(keep=f"{key}.body")
+
+    def evict(self, keep: str = "") -> None:
+        try:
+            bodies: List[os.DirEntry] = [e for e in os.scandir(self.root) if e.name.endswith(".body")]
+        except OSError:
+            return
+        total = sum(e.stat().st_size for e in bodies)
+        for e in sorted(bodies, key=lambda e: e.stat().st_mtime_ns):
+            if total <= self.max_bytes:
+                break
+            if e.path == keep:
+                continue
+            total -= e.stat().st_size
+            key = e.path[: -len(".body")]
+            for suffix in (".body", ".json"):
+                try:
+                    os.remove(key + suffix)
+                except OSError:
+                    pass
+
+
+class _CacheWriter:
+    """Tees a response body into a temp file, committed when the reader is done.
+
+    A body read to the end is a complete entry; one the reader stopped early
+    is kept as a partial entry when ``resumable``. ``prefix`` is the stored
+    start of a resumed body.
+    """
+
+    def __init__(
+        self, cache: IndexCache, url: str, etag: str, last_modified: str,
+        resumable: bool = True, prefix: Optional[str] = None,
+    ) -> None:
+        self.cache = cache
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.resumable = resumable
+        self.prefix = prefix
+        self.tmp_path = f"{cache._key(url)}.{os.getpid()}.{id(self)}.tmp"
+        self.complete = False
+        self._written = 0
+        self._gen: Optional[AsyncIterator[bytes]] = None
+
+    def tee(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        self._gen = self._tee(chunks)
+        return self._gen
+
+    async def _tee(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        if not (self.etag or self.last_modified):
+            # Nothing to revalidate with, so there is no point storing it.
+            async for chunk in chunks:
+                yield chunk
+            return
+        os.makedirs(self.cache.root, exist_ok=True)
+        with open(self.tmp_path, "wb") as f:
+            if self.prefix is not None:
+                with open(self.prefix, "rb") as start:
+                    shutil.copyfileobj(start, f)
+            async for chunk in chunks:
+                # Written before it is handed on, so the file is always a prefix of the body.
+                f.write(chunk)
+                self._written += len(chunk)
+                yield chunk
+        self.complete = True
+
+    async def aclose(self) -> None:
+        if self._gen is not None:
+            # Closes the temp file if the reader stopped before the end.
+            await self._gen.aclose()
+        if self.complete or (self.resumable and self._written):
+            try:
+                self.cache._commit(self.url, self.tmp_path, self.etag, self.last_modified, self.complete)
+                return
+            except OSError:
+                pass
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+def _fingerprint(last_modified: str, size: Optional[str]) -> Optional[str]:
+    """Modification time and size of a body, when both are known.
+
+    Mirrors synced with ``rsync -t`` keep the upstream mtime, so copies of
+    the same snapshot agree on it without anyone hashing the body.
+    """
+    if not last_modified or not size:
+        return None
+    return f"{last_modified}|{size}"
+
+
+class IndexResponse:
+    def __init__(
+        self, status_code: int, chunks: AsyncIterator[bytes], from_cache: bool = False,
+        fingerprint: Optional[str] = None,
+    ) -> None:
+        self.status_code = status_code
+        self.from_cache = from_cache
+        self.fingerprint = fingerprint
+        self._chunks = chunks
+
+    def aiter_bytes(self) -> AsyncIterator[bytes]:
+        return self._chunks
+
+    async def aread(self) -> bytes:
+        return b"".join([chunk async for chunk in self._chunks])
+
+
+async def _read_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def _chain(*parts: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    for part in parts:
+        async for chunk in part:
+            yield chunk
+
+
+def _resumes(resp: httpx.Response, entry: CacheEntry) -> bool:
+    """Whether ``resp`` is the rest of ``entry``'s body, as asked for."""
+    return (
+        resp.status_code == 206
+        and not resp.headers.get("content-encoding")
+        and resp.headers.get("content-range", "").startswith(f"bytes {os.path.getsize(entry.path)}-")
+    )
+
+
+@asynccontextmanager
+async def open_index(
+    client: httpx.AsyncClient, url: str, cache: Optional[IndexCache] = None,
+) -> AsyncIterator[IndexResponse]:
+    """Stream an index from ``url``, revalidating against ``cache`` when given.
+
+    On ``304 Not Modified`` the body is served from disk and reported as a 200.
+    A partial entry is resumed: its prefix is served from disk and the rest
+    streamed from a ``206`` response, also reported as a 200. When the mirror
+    answers the range with anything else, the entry is dropped and the index
+    fetched again in full.
+    Network bodies are held to the running check's minimum transfer rate.
+    """
+    entry = cache.get(url) if cache else None
+    headers = {}
+    if entry is not None:
+        headers = entry.validators() if entry.complete else entry.resume_headers()
+    parts = urlsplit(url)
+    async with client.stream("GET", url, headers=headers, follow_redirects=True) as resp:
+        try:
+            if resp.status_code == 304 and entry is not None and entry.complete:
+                INDEX_CACHE.labels("hit").inc()
+                cache.touch(entry)
+                fingerprint = _fingerprint(entry.last_modified, str(os.path.getsize(entry.path)))
+                yield IndexResponse(200, _read_file(entry.path), from_cache=True, fingerprint=fingerprint)
+                return
+            restart = entry is not None and not entry.complete and resp.status_code in (206, 416)
+            if restart and _resumes(resp, entry):
+                INDEX_CACHE.labels("resume").inc()
+                total = resp.headers["content-range"].rpartition("/")[2]
+                fingerprint = _fingerprint(entry.last_modified, total if total.isdigit() else None)
+                writer = cache.writer(url, resp.headers, prefix=entry)
+                rest = guard(resp.aiter_bytes(), current())
+                try:
+                    yield IndexResponse(200, _chain(_read_file(entry.path), writer.tee(rest)), fingerprint=fingerprint)
+                finally:
+                    await writer.aclose()
+                return
+            if restart:
+                # Not the rest of the stored prefix: drop it and ask again
+                # without a range once this response is closed.
+                cache.drop(url)
+            else:
+                # Without Content-Encoding the length is that of the stored body.
+                size = None if resp.headers.get("content-encoding") else resp.headers.get("content-length")
+                fingerprint = _fingerprint(resp.headers.get("last-modified", ""), size)
+                chunks = guard(resp.aiter_bytes(), current())
+                if resp.status_code != 200 or cache is None:
+                    yield IndexResponse(resp.status_code, chunks, fingerprint=fingerprint)
+                    return
+                INDEX_CACHE.labels("miss").inc()
+                writer = cache.writer(url, resp.headers)
+                try:
+                    yield IndexResponse(200, writer.tee(chunks), fingerprint=fingerprint)
+                finally:
+                    await writer.aclose()
+        finally:
+            INDEX_BYTES.labels(parts.hostname or "", parts.path.rsplit("/", 1)[-1]).inc(
+                resp.num_bytes_downloaded
+            )
+    if restart:
+        async with open_index(client, url, cache) as resp:
+            yield resp
@@ -0,0 +1,164 @@
+"""Prebuilt mirror catalog.
+
+``scripts/build_catalog.py`` compiles ``mirava_full_json.json`` into a small
+read-only SQLite file shipped inside the package (and the Nuitka binary).
+URLs are stored already normalized and endpoints are indexed by name, so a
+lookup for one OS/registry reads only the rows it needs. The JSON file stays
+the source of truth: the catalog records the SHA256 of the JSON it was built
+from and is ignored when that file has changed since.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from .models import Mirror, PackageEndpoint
+
+if TYPE_CHECKING:
+    import sqlite3
+
+SCHEMA_VERSION = "1"
+PACKAGED_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.sqlite")
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE mirrors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE TABLE endpoints (
+    id INTEGER PRIMARY KEY,
+    mirror_id INTEGER NOT NULL REFERENCES mirrors(id),
+    name TEXT NOT NULL,
+    urls TEXT NOT NULL
+);
+CREATE INDEX endpoints_by_name ON endpoints (name);
+"""
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def compile_catalog(json_path: str, out_path: str) -> int:
+    """Write the catalog for ``json_path`` to ``out_path``; returns the endpoint count."""
+    import sqlite3
+
+    from .mirrors import load_mirrors_json
+
+    mirrors = load_mirrors_json(json_path)
+    tmp_path = f"{out_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    count = 0
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("schema", SCHEMA_VERSION),
+            ("source_name", os.path.basename(json_path)),
+            ("source_sha256", _sha256(json_path)),
+        ])
+        for mirror_id, m in enumerate(mirrors, 1):
+            conn.execute(
+                "INSERT INTO mirrors VALUES (?, ?, ?, ?)",
+                (mirror_id, m.name, m.url, m.description),
+            )
+            for p in m.packages:
+                conn.execute(
+                    "INSERT INTO endpoints (mirror_id, name, urls) VALUES (?, ?, ?)",
+                    (mirror_id, p.name, "\n".join(p.urls)),
+                )
+                count += 1
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, out_path)
+    return count
+
+
+def _connect(path: str) -> "sqlite3.Connection":
+    import sqlite3
+    from urllib.parse import quote
+
+    # immutable=1: no locking or journal lookups; the file never changes at runtime.
+    return sqlite3.connect(f"file:{quote(os.path.abspath(path))}?mode=ro&immutable=1", uri=True)
+
+
+def is_fresh(db_path: str, json_path: str) -> bool:
+    """True if ``db_path`` was compiled from ``json_path`` as it is now.
+
+    A missing JSON file counts as fresh, so wheel installs (which ship only
+    the catalog) still work from any directory.
+    """
+    import sqlite3
+
+    if not os.path.exists(db_path):
+        return False
+    try:
+        conn = _connect(db_path)
+        try:
+            meta: Dict[str, str] = dict(conn.execute("SELECT key, value FROM meta"))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    if meta.get("schema") != SCHEMA_VERSION:
+        return False
+    if meta.get("source_name") != os.path.basename(json_path):
+        return False
+    if not os.path.exists(json_path):
+        return True
+    return meta.get("source_sha256") == _sha256(json_path)
+
+
+def _endpoint(name: str, urls: str, mirror_name: str, mirror_url: str) -> PackageEndpoint:
+    return PackageEndpoint(name=name, urls=urls.split("\n"), mirror_name=mirror_name, mirror_url=mirror_url)
+
+
+def read_mirrors(db_path: str) -> List[Mirror]:
+    conn = _connect(db_path)
+    try:
+        by_id: Dict[int, Mirror] = {}
+        for mirror_id, name, url, description in conn.execute(
+            "SELECT id, name, url, description FROM mirrors ORDER BY id"
+        ):
+            by_id[mirror_id] = Mirror(name=name, url=url, description=description, packages=[])
+        for mirror_id, name, urls in conn.execute(
+            "SELECT mirror_id, name, urls FROM endpoints ORDER BY id"
+        ):
+            m = by_id[mirror_id]
+            m.packages.append(_endpoint(name, urls, m.name, m.url))
+        return list(by_id.values())
+    finally:
+        conn.close()
+
+
+def read_endpoints(db_path: str, name: Optional[str] = None) -> List[PackageEndpoint]:
+    """Endpoints called ``name`` (all endpoints if None), via the name index."""
+    sql = (
+        "SELECT e.name, e.urls, m.name, m.url FROM endpoints e"
+        " JOIN mirrors m ON m.id = e.mirror_id"
+    )
+    params: tuple = ()
+    if name is not None:
+        sql += " WHERE e.name = ?"
+        params = (name,)
+    conn = _connect(db_path)
+    try:
+        return [_endpoint(*row) for row in conn.execute(sql + " ORDER BY e.id", params)]
+    finally:
+        conn.close()
+
+
+def read_names(db_path: str) -> List[str]:
+    conn = _connect(db_path)
+    try:
+        return [n for (n,) in conn.execute("SELECT DISTINCT name FROM endpoints ORDER BY name")]
+    finally:
+        conn.close()
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from contextlib import AsyncExitStack, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from urllib.request import getproxies
+
+import httpx
+
+from .benchmark import BenchmarkConfig, measure_throughput
+from .cache import IndexCache
+from .deadlines import Deadlines, applied, budget_detail, within
+from .metrics import ENDPOINT_LATENCY, ENDPOINT_UP, METRICS, PROBE_LATENCY, watch_loop_lag
+from .models import CheckResult, PackageEndpoint, Throughput
+from .profiling import collect, install_trace
+from .registry.base import percentile
+from .registry.factory import registry_for
+from .registry.os.generic import IndexMemo
+from .resolver import CachingTransport
+from .scheduler import AdaptiveLimiter, ConcurrencyConfig
+
+# Called after each endpoint finishes: (result, done, total, elapsed seconds).
+ProgressCallback = Callable[[CheckResult, int, int, float], None]
+
+
+@dataclass
+class RunOptions:
+    cache: Optional[IndexCache] = None
+    concurrency: ConcurrencyConfig = field(default_factory=ConcurrencyConfig)
+    # "head" (HEAD / ranged GET) or "get" (full GET of the mirror root).
+    probe: str = "head"
+    # Reachability probes per URL; more than one ranks by the median steady
+    # round trip and reports a latency spread (opt-in: it multiplies probes).
+    # ``latency_ms`` stays the (median) total probe time either way.
+    samples: int = 1
+    # Set to time downloads of a representative file per endpoint.
+    benchmark: Optional[BenchmarkConfig] = None
+    # OpenMetrics text file rewritten after every run (textfile collector).
+    metrics_file: Optional[str] = None
+    # Record per-phase spans on every result (--profile).
+    profile: bool = False
+    # Chrome trace-event JSON written by the caller after a profiled run.
+    trace_file: Optional[str] = None
+    # Stop once this many URLs are reachable and have every package, and
+    # cancel the checks still running (--race).
+    race: Optional[int] = None
+    # Per-check deadline, phase budgets and minimum index transfer rate.
+    deadlines: Deadlines = field(default_factory=Deadlines)
+    # Hedge each endpoint across its URLs: start the next URL once the
+    # current ones run longer than this percentile (0-100) of finished
+    # checks, and keep the first good answer (--hedge). One result per
+    # endpoint instead of one per URL.
+    hedge: Optional[float] = None
+
+
+# HTTP/2 needs the optional ``h2`` package (``pip install "mirava-tui[http2]"``).
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Hedging delay until enough checks have finished to take a percentile of.
+HEDGE_FALLBACK_S = 2.0
+HEDGE_MIN_SAMPLES = 5
+
+
+def _mbps(r: CheckResult) -> float:
+    return r.throughput.mbps if r.throughput and r.throughput.mbps is not None else -1.0
+
+
+def qualifies(r: CheckResult) -> bool:
+    """Reachable and not missing any requested package."""
+    return r.reachable and r.package_ok is not False
+
+
+def _rank_ms(r: CheckResult) -> float:
+    """Median steady round trip when sampled, else the probe's total time."""
+    if r.latency is not None and r.latency.median_ms is not None:
+        return r.latency.median_ms
+    return r.latency_ms or 1e9
+
+
+def result_key(by_throughput: bool = False) -> Callable[[CheckResult], Tuple[Any, ...]]:
+    """Sort key behind :func:`sort_results`, for callers that insert results as they arrive."""
+    if by_throughput:
+        return lambda r: (not r.reachable, -_mbps(r), _rank_ms(r))
+    return lambda r: (not r.reachable, _rank_ms(r))
+
+
+def planned_checks(endpoints: List[PackageEndpoint], options: RunOptions) -> int:
+    """Results a full run produces: one per URL, or one per endpoint when hedging."""
+    if options.hedge:
+        return sum(1 for ep in endpoints if ep.urls)
+    return sum(len(ep.urls) for ep in endpoints)
+
+
+def sort_results(results: List[CheckResult], by_throughput: bool = False) -> List[CheckResult]:
+    """Reachable endpoints first, then fastest (median latency) first.
+
+    ``by_throughput`` ranks by measured MB/s (highest first) before latency.
+    """
+    return sorted(results, key=result_key(by_throughput))
+
+
+def open_client(config: ConcurrencyConfig) -> httpx.AsyncClient:
+    """HTTP client sized for ``config``; one is shared by every check of a run.
+
+    Speaks HTTP/2 to mirrors that offer it when ``h2`` is installed, and
+    resolves host names through an in-process cache. Behind a proxy
+    (``HTTPS_PROXY`` and friends) httpx's own transports are kept so the
+    proxy settings apply; the proxy resolves the names then.
+    """
+    timeout = httpx.Timeout(8.0, connect=4.0)
+    limits = httpx.Limits(
+        max_connections=2 * config.maximum, max_keepalive_connections=config.maximum, keepalive_expiry=60.0,
+    )
+    # The hook is a no-op unless a check is being profiled.
+    hooks = {"request": [install_trace]}
+    if getproxies():
+        return httpx.AsyncClient(timeout=timeout, limits=limits, http2=HTTP2, event_hooks=hooks)
+    transport = CachingTransport(limits, http2=HTTP2)
+    return httpx.AsyncClient(timeout=timeout, transport=transport, event_hooks=hooks)
+
+
+async def check_url(
+    client: httpx.AsyncClient,
+    ep: PackageEndpoint,
+    url: str,
+    packages: List[str],
+    os_kwargs: Dict[str, str],
+    options: RunOptions,
+    limiter: AdaptiveLimiter,
+    memo: Optional[IndexMemo] = None,
+) -> CheckResult:
+    """Check one URL of ``ep`` under ``limiter`` (no benchmark).
+
+    OS options missing from ``os_kwargs`` take the registry's defaults.
+    """
+    reg = registry_for(ep.name)
+    deadline = options.deadlines.check_s
+    async with limiter.slot(urlsplit(url).hostname or url) as slot:
+        with collect() if options.profile else nullcontext() as spans, applied(options.deadlines):
+            try:
+                result = await within(reg.check(
+                    client, url, packages=packages, probe=options.probe,
+                    samples=options.samples, cache=options.cache, memo=memo,
+                    **{**reg.default_os_kwargs(), **os_kwargs},
+                ), deadline)
+            except asyncio.TimeoutError:
+                result = CheckResult(
+                    mirror_name="", endpoint_name=ep.name, url=url, reachable=False, latency_ms=None,
+                    ttfb_ms=None, package_ok=None, detail=budget_detail("check", deadline),
+                )
+        if spans is not None:
+            result.spans = spans
+        if not result.reachable:
+            slot.fail()
+    result.mirror_name = ep.mirror_name
+    result.endpoint_name = ep.name
+    ENDPOINT_UP.labels(ep.name, ep.mirror_name, url).set(1 if result.reachable else 0)
+    if result.reachable and result.latency_ms is not None:
+        ENDPOINT_LATENCY.labels(ep.name, ep.mirror_name, url).set(result.latency_ms / 1000)
+        PROBE_LATENCY.labels(ep.name, ep.mirror_name).observe(result.latency_ms / 1000)
+    return result
+
+
+async def run_checks(
+    endpoints: List[PackageEndpoint],
+    packages: List[str],
+    os_kwargs: Dict[str, str],
+    options: Optional[RunOptions] = None,
+    on_result: Optional[ProgressCallback] = None,
+    limiter: Optional[AdaptiveLimiter] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[CheckResult]:
+    """Check every URL of ``endpoints``.
+
+    With ``options.race`` the run ends as soon as that many results
+    qualify; unfinished checks are cancelled (closing their connections) and
+    left out of the returned list. With ``options.hedge`` each endpoint
+    yields one result, from whichever of its URLs answered well first. Pass
+    ``limiter`` to read the effective
+    concurrency back after the run, and ``client`` to reuse warm connections
+    across runs (it is left open).
+    """
+    options = options or RunOptions()
+    limiter = limiter or AdaptiveLimiter(options.concurrency)
+    async with AsyncExitStack() as stack:
+        if client is None:
+            client = await stack.enter_async_context(open_client(limiter.config))
+        # Shared by all workers so identical index snapshots are parsed once.
+        memo = IndexMemo()
+        # Benchmark downloads run one at a time so mirrors do not compete
+        # for the local link.
+        bandwidth = asyncio.Lock()
+
+        async def benchmark(reg, url: str) -> Throughput:
+            kwargs = {**reg.default_os_kwargs(), **os_kwargs}
+            target = await reg.benchmark_url(client, url, packages, cache=options.cache, **kwargs)
+            if not target:
+                return Throughput(url="", mbps=None, ttfb_ms=None, jitter_ms=None, bytes=0, samples=0,
+                                  detail="no benchmark file")
+            async with bandwidth:
+                return await measure_throughput(client, target, options.benchmark)
+
+        loop = asyncio.get_running_loop()
+        # Wall time of every check that ran to completion, for --hedge.
+        durations: List[float] = []
+
+        async def timed(ep: PackageEndpoint, url: str) -> CheckResult:
+            started = loop.time()
+            result = await check_url(client, ep, url, packages, os_kwargs, options, limiter, memo)
+            durations.append(loop.time() - started)
+            return result
+
+        def hedge_delay() -> float:
+            if len(durations) < HEDGE_MIN_SAMPLES:
+                return HEDGE_FALLBACK_S
+            return percentile(sorted(durations), options.hedge)
+
+        async def hedged(ep: PackageEndpoint) -> CheckResult:
+            """First qualifying result among ``ep.urls``.
+
+            The next URL is started when every running check is slower than
+            the hedge delay, or when one finishes without qualifying. Without
+            a qualifying answer the best failure is returned.
+            """
+            waiting = list(ep.urls)
+            running: Set[asyncio.Task] = set()
+            best: Optional[CheckResult] = None
+
+            def launch() -> None:
+                if waiting:
+                    running.add(asyncio.create_task(timed(ep, waiting.pop(0))))
+
+            launch()
+            try:
+                while running:
+                    # Once every URL is started there is nothing left to hedge with.
+                    finished, running = await asyncio.wait(
+                        running, timeout=hedge_delay() if waiting else None,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    if not finished:
+                        launch()
+                        continue
+                    for task in finished:
+                        r = task.result()
+                        if qualifies(r):
+                            return r
+                        if best is None or (r.reachable and not best.reachable):
+                            best = r
+                    if not running:
+                        launch()
+                assert best is not None
+                return best
+            finally:
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+
+        async def worker(ep: PackageEndpoint, url: Optional[str] = None) -> CheckResult:
+            result = await (timed(ep, url) if url is not None else hedged(ep))
+            # After the slot is released: waiting for the bandwidth lock must
+            # not hold back the remaining reachability checks.
+            if options.benchmark and result.reachable:
+                result.throughput = await benchmark(registry_for(ep.name), result.url)
+            return result
+
+        lag = asyncio.create_task(watch_loop_lag())
+        if options.hedge:
+            tasks = [asyncio.create_task(worker(ep)) for ep in endpoints if ep.urls]
+        else:
+            tasks = [asyncio.create_task(worker(ep, u)) for ep in endpoints for u in ep.urls]
+        total = len(tasks)
+        done = 0
+        winners = 0
+        results: List[CheckResult] = []
+        t0 = loop.time()
+
+        try:
+            for task in asyncio.as_completed(tasks):
+                r = await task
+                results.append(r)
+                done += 1
+                if on_result is not None:
+                    on_result(r, done, total, loop.time() - t0)
+                if options.race and qualifies(r):
+                    winners += 1
+                    if winners >= options.race:
+                        break
+        finally:
+            lag.cancel()
+            # Stragglers after a race, or everything when the run was cancelled.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if options.metrics_file:
+            METRICS.write_textfile(options.metrics_file)
+        return results
@@ -0,0 +1,339 @@
+"""Package-manager configuration rendered from ranked results.
+
+Each writer turns the URLs that passed a check (best first) into the files
+its package manager reads: an apt ``mirror+file:`` list, ``pip.conf``,
+``.npmrc``, pacman's ``mirrorlist``, ``/etc/apk/repositories`` or Docker's
+``daemon.json``. Managers that fall back to the next mirror get several in
+ranked order; the others get the best one. Files that also hold unrelated
+settings (``pip.conf``, ``.npmrc``, ``daemon.json``) are updated in place
+rather than replaced.
+
+Nothing is written until :func:`write` is called; :func:`diff` shows what
+would change.
+"""
+from __future__ import annotations
+
+import difflib
+import fnmatch
+import json
+import os
+import re
+import shutil
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .checks import qualifies
+from .models import CheckResult
+from .registry.os.pacman import ARCH_LAYOUT, MANJARO_LAYOUT, server_url
+
+# Mirrors listed for managers that try them in order.
+FALLBACK_MIRRORS = 5
+
+_HEADER = "# Written by mirava from a ranked mirror check; fastest first.\n"
+
+_APT_COMPONENTS = {
+    "Ubuntu": "main restricted universe multiverse",
+    "Debian": "main contrib non-free",
+}
+# Debian releases before bookworm (12), which added the non-free-firmware component.
+_PRE_FIRMWARE = {"buzz", "rex", "bo", "hamm", "slink", "potato", "woody", "sarge", "etch",
+                 "lenny", "squeeze", "wheezy", "jessie", "stretch", "buster", "bullseye"}
+# Distributions that publish a ``<suite>-updates`` pocket next to the release.
+_APT_UPDATES = {"Ubuntu", "Debian"}
+# Hosts of each distribution's own archive, as written by its installer.
+_APT_ARCHIVES = {
+    "Ubuntu": ("archive.ubuntu.com", "*.archive.ubuntu.com", "ports.ubuntu.com"),
+    "Debian": ("deb.debian.org", "ftp.debian.org", "ftp.*.debian.org", "httpredir.debian.org"),
+    "Kali": ("http.kali.org", "kali.download"),
+    "Mint": ("packages.linuxmint.com",),
+    "Raspbian": ("raspbian.raspberrypi.org", "archive.raspbian.org"),
+}
+
+
+@dataclass
+class ConfigFile:
+    path: str
+    content: str
+
+
+def current_text(path: str) -> str:
+    """Contents of ``path``, or "" when it does not exist yet."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+def ranked_urls(results: List[CheckResult]) -> List[str]:
+    """URLs of qualifying results in the order given, without duplicates."""
+    return list(dict.fromkeys(r.url.rstrip("/") for r in results if qualifies(r)))
+
+
+def _set_ini(text: str, section: str, values: Dict[str, str]) -> str:
+    """``text`` with ``values`` set in ``[section]``; other lines are kept."""
+    out: List[str] = []
+    in_section = found = skipping = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if skipping and line[:1].isspace() and stripped:
+            # Continuation of a multi-line value being replaced.
+            continue
+        skipping = False
+        if stripped.startswith("[") and stripped.endswith("]"):
+            in_section = stripped[1:-1].strip() == section
+            out.append(line)
+            if in_section and not found:
+                found = True
+                out.extend(f"{key} = {value}" for key, value in values.items())
+            continue
+        key = stripped.split("=", 1)[0].strip() if "=" in stripped else ""
+        if in_section and key in values:
+            skipping = True
+            continue
+        out.append(line)
+    if not found:
+        if out and out[-1].strip():
+            out.append("")
+        out.append(f"[{section}]")
+        out.extend(f"{key} = {value}" for key, value in values.items())
+    return "\n".join(out) + "\n"
+
+
+def _set_key(text: str, key: str, value: str) -> str:
+    """``text`` (``key=value`` lines) with ``key`` set once."""
+    out: List[str] = []
+    done = False
+    for line in text.splitlines():
+        if line.split("=", 1)[0].strip() == key and "=" in line:
+            if not done:
+                out.append(f"{key}={value}")
+                done = True
+            continue
+        out.append(line)
+    if not done:
+        out.append(f"{key}={value}")
+    return "\n".join(out) + "\n"
+
+
+def _archive_uri(name: str, urls: List[str]) -> Callable[[str], bool]:
+    """Whether a source URI is ``name``'s own archive: a known archive host or a ranked mirror.
+
+    Third-party repositories often reuse the distribution's suite names and
+    must not be switched off with it.
+    """
+    mirrors = {(urlsplit(u).hostname, urlsplit(u).path.rstrip("/")) for u in urls}
+    patterns = _APT_ARCHIVES.get(name, ())
+
+    def matches(uri: str) -> bool:
+        parts = urlsplit(uri)
+        host = parts.hostname or ""
+        return (host, parts.path.rstrip("/")) in mirrors or any(fnmatch.fnmatch(host, p) for p in patterns)
+
+    return matches
+
+
+def _disable_list(text: str, suites: List[str], archive: Callable[[str], bool]) -> str:
+    """``sources.list`` text with the ``deb`` lines for ``suites`` of an ``archive`` URI commented out."""
+    out: List[str] = []
+    for line in text.splitlines():
+        # deb [options] uri suite component...
+        fields = re.sub(r"\[[^\]]*\]", " ", line.split("#", 1)[0]).split()
+        if len(fields) >= 3 and fields[0] == "deb" and fields[2] in suites and archive(fields[1]):
+            out.append(f"# disabled by mirava: {line}")
+        else:
+            out.append(line)
+    return "\n".join(out) + "\n" if out else ""
+
+
+def _disable_deb822(text: str, suites: List[str], archive: Callable[[str], bool]) -> str:
+    """A ``.sources`` file with ``suites`` removed from each stanza whose URIs are all ``archive`` ones.
+
+    A stanza left without suites gets ``Enabled: no``.
+    """
+    stanzas: List[List[str]] = [[]]
+    for line in text.splitlines():
+        if line.strip():
+            stanzas[-1].append(line)
+        elif stanzas[-1]:
+            stanzas.append([])
+    out: List[str] = []
+    for stanza in (s for s in stanzas if s):
+        fields = {line.split(":", 1)[0].strip().lower(): i for i, line in enumerate(stanza) if ":" in line}
+        uris = stanza[fields["uris"]].split(":", 1)[1].split() if "uris" in fields else []
+        if "suites" in fields and uris and all(archive(u) for u in uris):
+            i = fields["suites"]
+            listed = stanza[i].split(":", 1)[1].split()
+            kept = [s for s in listed if s not in suites]
+            if kept and kept != listed:
+                stanza[i] = f"Suites: {' '.join(kept)}"
+            elif not kept:
+                if "enabled" in fields:
+                    stanza[fields["enabled"]] = "Enabled: no"
+                else:
+                    stanza.append("Enabled: no")
+        out.append("\n".join(stanza))
+    return "\n\n".join(out) + "\n" if out else ""
+
+
+def _apt_components(name: str, suite: str, component: str) -> str:
+    """Components for ``suite``; a ``--component`` other than the default wins."""
+    if component != "main":
+        return " ".join(component.replace(",", " ").split())
+    components = _APT_COMPONENTS.get(name, "main")
+    if name == "Debian":
+        release = suite.split("-", 1)[0]
+        old = release in _PRE_FIRMWARE or (release.isdigit() and int(release) < 12)
+        if not old:
+            components += " non-free-firmware"
+    return components
+
+
+def _apt(name: str, urls: List[str], os_kwargs: Dict[str, str]) -> List[ConfigFile]:
+    suite = os_kwargs.get("suite") or os_kwargs.get("codename")
+    if not suite:
+        raise ValueError("apt configuration needs a suite (--suite)")
+    components = _apt_components(name, suite, os_kwargs.get("component") or "main")
+    suites = [suite, f"{suite}-updates"] if name in _APT_UPDATES else [suite]
+    slug = name.lower().replace(" ", "-")
+    mirror_list = f"/etc/apt/mirrors/mirava-{slug}.list"
+    # apt's mirror method moves on to the next line when a mirror fails.
+    mirrors = ConfigFile(mirror_list, "".join(f"{u}\n" for u in urls[:FALLBACK_MIRRORS]))
+    sources = ConfigFile(
+        f"/etc/apt/sources.list.d/mirava-{slug}.list",
+        _HEADER + "".join(f"deb mirror+file:{mirror_list} {s} {components}\n" for s in suites),
+    )
+    files = [mirrors, sources]
+    # Otherwise apt keeps the distribution's own entries for the same suites
+    # and fetches every index twice. Other repositories (PPAs, vendors) are
+    # left alone, even when they use the same suite names.
+    archive = _archive_uri(name, urls)
+    for path, disable in (
+        ("/etc/apt/sources.list", _disable_list),
+        (f"/etc/apt/sources.list.d/{slug}.sources", _disable_deb822),
+    ):
+        text = current_text(path)
+        updated = disable(text, suites, archive) if text.strip() else text
+        if updated != text:
+            files.append(ConfigFile(path, updated))
+    return files
+
+
+def _pacman(name: str, urls: List[str], os_kwargs: Dict[str, str]) -> List[ConfigFile]:
+    # Bare mirror bases get the repository layout appended, as the registry does when checking.
+    layout = MANJARO_LAYOUT if name == "Manjaro" else ARCH_LAYOUT
+    servers = "".join(f"Server = {server_url(u, layout)}\n" for u in urls[:FALLBACK_MIRRORS])
+    return [ConfigFile("/etc/pacman.d/mirrorlist", _HEADER + servers)]
+
+
+def _alpine(name: str, urls: List[str], os_kwargs: Dict[str, str]) -> List[ConfigFile]:
+    # apk reads every listed repository, so only the best mirror is used.
+    branch = os_kwargs.get("branch") or "v3.18"
+    base = urls[0].replace("@@version@@", branch)
+    for suffix in ("/main", "/community"):
+        if base.endswith(suffix):
+            base = base[: -len(suffix)]
+            break
+    else:
+        base = f"{base}/{branch}"
+    return [ConfigFile("/etc/apk/repositories", f"{_HEADER}{base}/main\n{base}/community\n")]
+
+
+def _pip_conf_path() -> str:
+    if os.name == "nt":
+        return os.path.join(os.environ.get("APPDATA", os.path.expanduser("~")), "pip", "pip.ini")
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(config_home, "pip", "pip.conf")
+
+
+def _pip(name: str, urls: List[str], os_kwargs: Dict[str, str]) -> List[ConfigFile]:
+    # pip has no mirror fallback; extra-index-url merges indexes instead.
+    index = urls[0] if urls[0].endswith("/simple") else f"{urls[0]}/simple"
+    values = {"index-url": index}
+    if index.startswith("http://"):
+        values["trusted-host"] = index.split("/")[2]
+    path = _pip_conf_path()
+    return [ConfigFile(path, _set_ini(current_text(path), "global", values))]
+
+
+def _npm(name: str, urls: List[str], os_kwargs: Dict[str, str]) -> List[ConfigFile]:
+    # Read by npm and by Yarn 1.
+    path = os.path.expanduser("~/.npmrc")
+    return [ConfigFile(path, _set_key(current_text(path), "registry", f"{urls[0]}/"))]
+
+
+def _docker(name: str, urls: List[str], os_kwargs: Dict[str, str]) -> List[ConfigFile]:
+    path = "/etc/docker/daemon.json"
+    text = current_text(path)
+    try:
+        daemon = json.loads(text) if text.strip() else {}
+    except ValueError:
+        raise ValueError(f"{path} is not valid JSON; not touching it") from None
+    # dockerd tries registry mirrors in order before Docker Hub.
+    daemon["registry-mirrors"] = urls[:FALLBACK_MIRRORS]
+    return [ConfigFile(path, json.dumps(daemon, indent=2) + "\n")]
+
+
+# Endpoint name -> writer(endpoint name, ranked URLs, OS options).
+WRITERS: Dict[str, Callable[[str, List[str], Dict[str, str]], List[ConfigFile]]] = {
+    "Debian": _apt,
+    "Ubuntu": _apt,
+    "Kali": _apt,
+    "Mint": _apt,
+    "Raspbian": _apt,
+    "Arch Linux": _pacman,
+    "Archlinux": _pacman,
+    "Manjaro": _pacman,
+    "Alpine": _alpine,
+    "PyPI": _pip,
+    "npm": _npm,
+    "Yarn": _npm,
+    "Docker Registry": _docker,
+}
+
+
+def render(results: List[CheckResult], os_kwargs: Dict[str, str]) -> List[ConfigFile]:
+    """Config files for the endpoint types in ``results`` (ranked best first).
+
+    Types without a writer, or without a qualifying result, are left out.
+    Raises ``ValueError`` when a file cannot be rendered safely.
+    """
+    files: List[ConfigFile] = []
+    for name in dict.fromkeys(r.endpoint_name for r in results):
+        writer = WRITERS.get(name)
+        urls = ranked_urls([r for r in results if r.endpoint_name == name])
+        if writer is not None and urls:
+            files.extend(writer(name, urls, os_kwargs))
+    return files
+
+
+def diff(config: ConfigFile) -> str:
+    """Unified diff from the file on disk to ``config``; "" when unchanged."""
+    return "".join(difflib.unified_diff(
+        current_text(config.path).splitlines(True), config.content.splitlines(True),
+        fromfile=config.path, tofile=f"{config.path} (mirava)",
+    ))
+
+
+def write(config: ConfigFile, root: Optional[str] = None) -> str:
+    """Write ``config`` and return the path written.
+
+    With ``root`` the file goes to the same path below that directory
+    (export); otherwise it replaces the real file, whose previous contents
+    are kept next to it as ``.bak``.
+    """
+    path = config.path
+    if root is not None:
+        path = os.path.join(root, os.path.splitdrive(path)[1].lstrip("\\/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(config.content)
+    if os.path.exists(path):
+        # Keep the mode: .npmrc and pip.conf may hold credentials.
+        shutil.copymode(path, tmp)
+        if root is None:
+            shutil.copy2(path, f"{path}.bak")
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,113 @@
+"""Time and throughput limits for a single check.
+
+httpx's timeouts bound each network operation, not a whole check: a mirror
+that trickles a large index a few KB at a time never trips the read timeout
+and can hold a concurrency slot for minutes. :class:`Deadlines` adds
+
+* a budget for the reachability probe and one for package / index lookups,
+* an overall deadline for the check, as a backstop,
+* a minimum transfer rate for index downloads, enforced after a grace
+  period by :func:`guard` on the time spent waiting for the network.
+
+:func:`applied` makes the limits of the running check available to code
+deep inside the registries (a context variable, like the spans in
+:mod:`mirava.profiling`), so the registry signatures stay unchanged.
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+from . import defaults
+
+T = TypeVar("T")
+
+
+@dataclass
+class Deadlines:
+    # Whole check (probe + packages); None disables each limit.
+    check_s: Optional[float] = defaults.CHECK_S
+    probe_s: Optional[float] = defaults.PROBE_S
+    index_s: Optional[float] = defaults.INDEX_S
+    # Index downloads slower than this on average are abandoned; 0 disables.
+    min_bytes_per_s: float = defaults.MIN_BYTES_PER_S
+    # Rate is only judged after this long waiting for data, so slow starts are forgiven.
+    grace_s: float = 5.0
+
+    @classmethod
+    def from_args(cls, args) -> "Deadlines":
+        def seconds(value: float) -> Optional[float]:
+            return value if value > 0 else None
+
+        return cls(
+            check_s=seconds(args.deadline),
+            probe_s=seconds(args.probe_budget),
+            index_s=seconds(args.index_budget),
+            min_bytes_per_s=max(0.0, args.min_kbps * 1000),
+        )
+
+
+_current: ContextVar[Optional[Deadlines]] = ContextVar("mirava_deadlines", default=None)
+
+
+@contextmanager
+def applied(deadlines: Optional[Deadlines]) -> Iterator[None]:
+    """Make ``deadlines`` the limits of everything run inside the block."""
+    token = _current.set(deadlines)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[Deadlines]:
+    return _current.get()
+
+
+async def within(aw: Awaitable[T], seconds: Optional[float]) -> T:
+    """Await ``aw``, raising ``asyncio.TimeoutError`` after ``seconds`` (None: no limit)."""
+    import asyncio
+
+    if seconds is None:
+        return await aw
+    return await asyncio.wait_for(aw, seconds)
+
+
+def budget_detail(what: str, seconds: Optional[float]) -> str:
+    return f"{what} took over {seconds:.0f}s"
+
+
+async def guard(chunks: AsyncIterator[bytes], deadlines: Optional[Deadlines]) -> AsyncIterator[bytes]:
+    """Pass ``chunks`` through, failing once the average rate drops below the minimum.
+
+    Only the time spent waiting for the next chunk counts: a consumer that
+    is slow to parse (decompressing in a worker thread, say) does not make
+    the mirror look slow. Raises ``httpx.ReadTimeout``, so registries report
+    it like any other slow read.
+    """
+    if deadlines is None or not deadlines.min_bytes_per_s:
+        async for chunk in chunks:
+            yield chunk
+        return
+    it = chunks.__aiter__()
+    waited = 0.0
+    received = 0
+    while True:
+        started = time.monotonic()
+        try:
+            chunk = await it.__anext__()
+        except StopAsyncIteration:
+            return
+        waited += time.monotonic() - started
+        received += len(chunk)
+        if waited > deadlines.grace_s and received / waited < deadlines.min_bytes_per_s:
+            import httpx
+
+            raise httpx.ReadTimeout(
+                f"transfer below {deadlines.min_bytes_per_s / 1000:.0f} kB/s "
+                f"({received / waited / 1000:.1f} kB/s)"
+            )
+        yield chunk
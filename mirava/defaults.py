@@ -0,0 +1,27 @@
+"""Option defaults shared by the CLI parser and the modules that use them.
+
+This module imports nothing, so building the argument parser does not load
+the scheduler, cache, deadline or benchmark code just to show their
+defaults in ``--help``.
+"""
+
+MB = 1_000_000
+
+# Index cache (mirava.cache).
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Throughput benchmark (mirava.benchmark).
+BENCH_BYTES = 8 * MB
+BENCH_SAMPLES = 3
+
+# Per-check limits (mirava.deadlines); None disables a limit.
+CHECK_S = 90.0
+PROBE_S = 20.0
+INDEX_S = 60.0
+MIN_BYTES_PER_S = 20_000
+
+# Adaptive concurrency (mirava.scheduler).
+CONCURRENCY = 10
+MIN_CONCURRENCY = 2
+MAX_CONCURRENCY = 64
+PER_HOST = 4
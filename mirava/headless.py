@@ -0,0 +1,206 @@
+"""Non-interactive ``mirava check`` command for cron jobs and CI.
+
+Nothing in here imports prompt_toolkit; results go to stdout as JSON, NDJSON
+or CSV and the exit status tells whether any endpoint was reachable.
+
+The CLI imports this module just to register the sub-command's arguments, so
+anything heavy (asyncio, httpx, the registries) is imported inside
+:func:`run_check`.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, TextIO
+
+if TYPE_CHECKING:
+    from .models import CheckResult
+
+FORMATS = ("json", "ndjson", "csv")
+OS_OPTIONS = ("suite", "component", "arch", "repo", "branch", "releasever")
+
+EXIT_OK = 0
+EXIT_UNREACHABLE = 1
+EXIT_USAGE = 2
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--os", dest="target", metavar="NAME", help="OS mirrors to check, e.g. Ubuntu")
+    target.add_argument("--registry", dest="target", metavar="NAME", help="registry mirrors to check, e.g. PyPI")
+    parser.add_argument(
+        "-p", "--package", action="append", default=[],
+        help="package to look up; repeat or comma-separate for several",
+    )
+    for opt in OS_OPTIONS:
+        parser.add_argument(f"--{opt}", help=f"OS repository {opt} (defaults follow the detected OS)")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="output format (default: json)")
+    parser.add_argument(
+        "--diff", action="store_true",
+        help="show (on stderr) how package-manager config would change to use the ranked mirrors",
+    )
+    parser.add_argument(
+        "--apply", action="store_true",
+        help="write that config in place (sources.list.d, pip.conf, .npmrc, mirrorlist, ...); "
+             "previous files are kept as .bak",
+    )
+    parser.add_argument(
+        "--export", metavar="DIR",
+        help="write that config below DIR instead, e.g. DIR/etc/pacman.d/mirrorlist",
+    )
+
+
+def result_row(r: CheckResult) -> Dict[str, Any]:
+    """``r`` as a JSON-ready dict with timings rounded."""
+    from dataclasses import asdict
+
+    row = asdict(r)
+    for key in ("latency_ms", "ttfb_ms"):
+        if row[key] is not None:
+            row[key] = round(row[key], 1)
+    bench = row["throughput"]
+    if bench is not None:
+        for key in ("mbps", "ttfb_ms", "jitter_ms"):
+            if bench[key] is not None:
+                bench[key] = round(bench[key], 2 if key == "mbps" else 1)
+    stats = row["latency"]
+    if stats is not None:
+        for key, value in stats.items():
+            if isinstance(value, float):
+                stats[key] = round(value, 3 if key == "loss_rate" else 1)
+    for s in row["spans"]:
+        s["duration_ms"] = round(s["duration_ms"], 3)
+    return row
+
+
+def write_results(results: List[CheckResult], packages: List[str], fmt: str, out: TextIO) -> None:
+    import csv
+    import json
+
+    if fmt == "json":
+        json.dump([result_row(r) for r in results], out, indent=2, ensure_ascii=False)
+        out.write("\n")
+    elif fmt == "ndjson":
+        for r in results:
+            out.write(json.dumps(result_row(r), ensure_ascii=False) + "\n")
+    elif fmt == "csv":
+        fields = ["mirror_name", "endpoint_name", "url", "reachable", "latency_ms", "ttfb_ms", "package_ok", "detail"]
+        # Latency spread and benchmark columns only appear when measured.
+        stat_fields = (
+            ["min_ms", "median_ms", "p90_ms", "p99_ms", "loss_rate", "handshake_ms"]
+            if any(r.latency for r in results) else []
+        )
+        bench_fields = ["mbps", "ttfb_ms", "jitter_ms"] if any(r.throughput for r in results) else []
+        writer = csv.writer(out)
+        writer.writerow(
+            fields + [f"latency_{f}" for f in stat_fields] + [f"bench_{f}" for f in bench_fields]
+            + [f"package:{p}" for p in packages]
+        )
+        for r in results:
+            row = result_row(r)
+            stats = row["latency"] or {}
+            bench = row["throughput"] or {}
+            writer.writerow(
+                [row[f] for f in fields]
+                + ["" if stats.get(f) is None else stats[f] for f in stat_fields]
+                + ["" if bench.get(f) is None else bench[f] for f in bench_fields]
+                + ["" if r.packages.get(p) is None else r.packages[p] for p in packages]
+            )
+    else:
+        raise ValueError(f"unknown format: {fmt}")
+
+
+def _write_configs(results: List[CheckResult], os_kwargs: Dict[str, str], args: argparse.Namespace) -> int:
+    """Handle ``--diff`` / ``--apply`` / ``--export``; returns an exit status."""
+    from .configs import diff, render, write
+
+    try:
+        files = render(results, os_kwargs)
+    except ValueError as exc:
+        print(f"mirava: {exc}", file=sys.stderr)
+        return EXIT_USAGE
+    if not files:
+        print(f"mirava: no config to write for {args.target!r}", file=sys.stderr)
+        return EXIT_OK
+    for config in files:
+        if args.diff:
+            sys.stderr.write(diff(config) or f"mirava: {config.path} unchanged\n")
+        try:
+            if args.export:
+                print(f"mirava: wrote {write(config, args.export)}", file=sys.stderr)
+            if args.apply:
+                print(f"mirava: wrote {write(config)}", file=sys.stderr)
+        except OSError as exc:
+            print(f"mirava: cannot write {config.path}: {exc}", file=sys.stderr)
+            return EXIT_USAGE
+    return EXIT_OK
+
+
+def _report_profile(results: List[CheckResult], trace_file: Optional[str]) -> None:
+    """Phase breakdown on stderr, so stdout stays machine-readable."""
+    from .profiling import BREAKDOWN_HEADERS, format_breakdown, write_chrome_trace
+
+    rows = [BREAKDOWN_HEADERS] + format_breakdown(results)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(BREAKDOWN_HEADERS))]
+    for row in rows:
+        print("  ".join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip(), file=sys.stderr)
+    if trace_file:
+        write_chrome_trace(results, trace_file)
+        print(f"mirava: trace written to {trace_file}", file=sys.stderr)
+
+
+def run_check(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .benchmark import BenchmarkConfig
+    from .cache import IndexCache
+    from .checks import RunOptions, planned_checks, run_checks, sort_results
+    from .deadlines import Deadlines
+    from .scheduler import ConcurrencyConfig
+    from .mirrors import load_endpoints
+    from .utils import detect_os, os_defaults, split_packages
+
+    endpoints = load_endpoints(args.mirrors, args.target)
+    if not endpoints:
+        print(f"mirava: no mirrors found for {args.target!r}", file=sys.stderr)
+        return EXIT_USAGE
+
+    os_default, os_kwargs = os_defaults(detect_os())
+    if args.target != os_default:
+        # Suite/release of the host OS are meaningless for another distro;
+        # its registry fills in its own defaults.
+        os_kwargs = {}
+    for opt in OS_OPTIONS:
+        value = getattr(args, opt)
+        if value:
+            os_kwargs[opt] = value
+
+    packages = [p for raw in args.package for p in split_packages(raw)]
+    options = RunOptions(
+        cache=None if args.no_cache else IndexCache(max_bytes=args.cache_max_mb * 1024 * 1024),
+        concurrency=ConcurrencyConfig.from_args(args),
+        probe=args.probe,
+        samples=max(1, args.samples),
+        metrics_file=args.metrics_file,
+        profile=args.profile or bool(args.trace_file),
+        trace_file=args.trace_file,
+        benchmark=BenchmarkConfig.from_args(args),
+        race=args.race,
+        deadlines=Deadlines.from_args(args),
+        hedge=args.hedge,
+    )
+    results = sort_results(
+        asyncio.run(run_checks(endpoints, packages, os_kwargs, options)),
+        by_throughput=options.benchmark is not None,
+    )
+    write_results(results, packages, args.format, sys.stdout)
+    cancelled = planned_checks(endpoints, options) - len(results)
+    if cancelled:
+        print(f"mirava: race won by {args.race} mirrors; {cancelled} checks cancelled", file=sys.stderr)
+    if options.profile:
+        _report_profile(results, options.trace_file)
+    if args.diff or args.apply or args.export:
+        status = _write_configs(results, os_kwargs, args)
+        if status != EXIT_OK:
+            return status
+    return EXIT_OK if any(r.reachable for r in results) else EXIT_UNREACHABLE
@@ -0,0 +1,236 @@
+"""Prometheus / OpenMetrics metrics for probe results and Mirava's own timings.
+
+A small dependency-free registry in the style of ``prometheus_client``:
+module-level metrics are updated by the registries, the index cache and
+:func:`mirava.checks.check_url`, and :meth:`MetricsRegistry.render` produces the
+text exposition format. ``--metrics-file`` writes it atomically for
+node_exporter's textfile collector; ``mirava watch --metrics-port`` and
+``mirava serve`` expose it on ``/metrics``.
+"""
+from __future__ import annotations
+
+import math
+import os
+import time
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._child()
+        return child
+
+    def _child(self):
+        raise NotImplementedError
+
+    def samples(self, openmetrics: bool) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _child(self) -> _Value:
+        return _Value()
+
+    def samples(self, openmetrics: bool) -> Iterable[str]:
+        for key, child in self._children.items():
+            yield f"{self.name}_total{_labels(self.labelnames, key)} {_number(child.value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _child(self) -> _Value:
+        return _Value()
+
+    def samples(self, openmetrics: bool) -> Iterable[str]:
+        for key, child in self._children.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(child.value)}"
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def samples(self, openmetrics: bool) -> Iterable[str]:
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(child.sum)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Text exposition; OpenMetrics when asked for, else Prometheus 0.0.4."""
+        lines: List[str] = []
+        for m in self._metrics:
+            # OpenMetrics names the counter family without the _total suffix.
+            family = m.name if openmetrics or m.kind != "counter" else f"{m.name}_total"
+            lines.append(f"# HELP {family} {m.documentation}")
+            lines.append(f"# TYPE {family} {m.kind}")
+            lines.extend(m.samples(openmetrics))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Atomically write the Prometheus format for the textfile collector."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+METRICS = MetricsRegistry()
+
+ENDPOINT_UP = METRICS.gauge(
+    "mirava_endpoint_up", "1 if the last probe of the URL succeeded", ("endpoint", "mirror", "url"),
+)
+ENDPOINT_LATENCY = METRICS.gauge(
+    "mirava_endpoint_latency_seconds", "Latency of the last successful probe of the URL",
+    ("endpoint", "mirror", "url"),
+)
+PROBE_LATENCY = METRICS.histogram(
+    "mirava_probe_latency_seconds", "Reachability probe latency", ("endpoint", "mirror"),
+)
+PACKAGE_CHECK_DURATION = METRICS.histogram(
+    "mirava_package_check_duration_seconds", "Time spent checking packages on one URL", ("registry",),
+)
+INDEX_BYTES = METRICS.counter(
+    "mirava_index_bytes", "Bytes downloaded for repository indexes", ("host", "index"),
+)
+INDEX_CACHE = METRICS.counter(
+    "mirava_index_cache_requests", "Index cache lookups by outcome", ("result",),
+)
+DNS_CACHE = METRICS.counter(
+    "mirava_dns_cache_requests", "Host name lookups by outcome", ("result",),
+)
+LOOP_LAG = METRICS.histogram(
+    "mirava_event_loop_lag_seconds", "How late the event loop woke up a sleeping task", (),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+_lag_watchers = 0
+
+
+async def watch_loop_lag(interval: float = 0.5) -> None:
+    """Sample event-loop lag until cancelled.
+
+    Nested callers (a check wave inside ``mirava serve``) return at once so
+    each wake-up is observed only once.
+    """
+    import asyncio
+
+    global _lag_watchers
+    if _lag_watchers:
+        return
+    _lag_watchers += 1
+    lag = LOOP_LAG.labels()
+    try:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag.observe(max(0.0, time.perf_counter() - start - interval))
+    finally:
+        _lag_watchers -= 1
+
+
+def wants_openmetrics(accept: str) -> bool:
+    return "application/openmetrics-text" in accept
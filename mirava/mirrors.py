@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import json
-from typing import Iterable, List
+from typing import Iterable, List, Optional
 
-from .models import Mirror, PackageEndpoint
+from . import catalog
+from .models import Mirror, MirrorCatalog, PackageEndpoint
 from .utils import normalize_url
 
 
@@ -13,7 +14,29 @@ def _coerce_urls(value) -> List[str]:
     return [normalize_url(str(value))]
 
 
-def load_mirrors(path: str) -> List[Mirror]:
+def _compiled_for(path: str) -> Optional[str]:
+    if catalog.is_fresh(catalog.PACKAGED_CATALOG, path):
+        return catalog.PACKAGED_CATALOG
+    return None
+
+
+def load_mirrors(path: str) -> MirrorCatalog:
+    """Load the mirrors, from the prebuilt catalog when it matches ``path``."""
+    compiled = _compiled_for(path)
+    if compiled:
+        return MirrorCatalog(catalog.read_mirrors(compiled))
+    return MirrorCatalog(load_mirrors_json(path))
+
+
+def load_endpoints(path: str, name: str) -> List[PackageEndpoint]:
+    """Endpoints called ``name`` without building the whole mirror list when possible."""
+    compiled = _compiled_for(path)
+    if compiled:
+        return catalog.read_endpoints(compiled, name)
+    return MirrorCatalog(load_mirrors_json(path)).endpoints(name)
+
+
+def load_mirrors_json(path: str) -> List[Mirror]:
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
@@ -23,6 +46,7 @@ def load_mirrors(path: str) -> List[Mirror]:
             name=item.get("name", ""),
             url=normalize_url(item.get("url", "")),
             description=item.get("description", ""),
+            packages=[],
         )
         packages = item.get("packages", [])
         for entry in packages:
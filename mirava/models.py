@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import  List, Optional
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
 
 
 @dataclass(frozen=True)
 class PackageEndpoint:
+    __slots__ = ("name", "urls", "mirror_name", "mirror_url")
+
     name: str
     urls: List[str]
     mirror_name: str
@@ -14,15 +17,105 @@ class PackageEndpoint:
 
 @dataclass
 class Mirror:
+    # Slotted, so ``packages`` has no default; pass ``[]`` explicitly.
+    __slots__ = ("name", "url", "description", "packages")
+
     name: str
     url: str
     description: str
-    packages: List[PackageEndpoint] = field(default_factory=list)
+    packages: List[PackageEndpoint]
 
     def packages_by_name(self, name: str) -> List[PackageEndpoint]:
         return [p for p in self.packages if p.name == name]
 
 
+class MirrorCatalog:
+    """All mirrors plus dict indexes by endpoint name, mirror name and host.
+
+    Built once by :func:`mirava.mirrors.load_mirrors`; iterating it yields the
+    mirrors in catalog order.
+    """
+
+    __slots__ = ("mirrors", "_by_endpoint", "_by_mirror", "_by_host", "_names")
+
+    def __init__(self, mirrors: List[Mirror]) -> None:
+        self.mirrors = mirrors
+        self._by_endpoint: Dict[str, List[PackageEndpoint]] = {}
+        self._by_mirror: Dict[str, Mirror] = {}
+        self._by_host: Dict[str, List[PackageEndpoint]] = {}
+        for m in mirrors:
+            self._by_mirror.setdefault(m.name, m)
+            for ep in m.packages:
+                self._by_endpoint.setdefault(ep.name, []).append(ep)
+                hosts = {(urlsplit(u).hostname or "").lower() for u in ep.urls}
+                for host in hosts:
+                    self._by_host.setdefault(host, []).append(ep)
+        self._names = sorted(self._by_endpoint)
+
+    def __iter__(self) -> Iterator[Mirror]:
+        return iter(self.mirrors)
+
+    def __len__(self) -> int:
+        return len(self.mirrors)
+
+    def names(self) -> List[str]:
+        """Sorted distinct endpoint names (OS and registry names)."""
+        return list(self._names)
+
+    def endpoints(self, name: str) -> List[PackageEndpoint]:
+        return list(self._by_endpoint.get(name, ()))
+
+    def mirror(self, name: str) -> Optional[Mirror]:
+        return self._by_mirror.get(name)
+
+    def endpoints_on_host(self, host: str) -> List[PackageEndpoint]:
+        return list(self._by_host.get(host.lower(), ()))
+
+
+@dataclass
+class Span:
+    """One timed phase of a check (connect, download, gunzip, …)."""
+
+    name: str
+    # ``time.perf_counter()`` at the start, in seconds.
+    start: float
+    duration_ms: float
+    # File the phase worked on, e.g. ``repomd.xml``.
+    target: str = ""
+
+
+@dataclass
+class LatencyStats:
+    """Spread of repeated reachability probes over one pooled connection.
+
+    Percentiles are taken over steady-state round trips, i.e. with the time
+    spent opening connections (TCP + TLS) removed; that is reported on its
+    own as ``handshake_ms``.
+    """
+
+    samples: int
+    loss_rate: float
+    min_ms: Optional[float]
+    median_ms: Optional[float]
+    p90_ms: Optional[float]
+    p99_ms: Optional[float]
+    handshake_ms: Optional[float]
+
+
+@dataclass
+class Throughput:
+    """Outcome of a ``--benchmark`` download of a representative file."""
+
+    url: str
+    mbps: Optional[float]
+    ttfb_ms: Optional[float]
+    # Population standard deviation of the per-sample TTFB.
+    jitter_ms: Optional[float]
+    bytes: int
+    samples: int
+    detail: str = ""
+
+
 @dataclass
 class CheckResult:
     mirror_name: str
@@ -32,3 +125,13 @@ class CheckResult:
     latency_ms: Optional[float]
     package_ok: Optional[bool]
     detail: str = ""
+    # Time to first byte of the reachability probe; latency_ms is the total
+    # (the median total when several probes were sent; their steady-state
+    # round trips are in ``latency``).
+    ttfb_ms: Optional[float] = None
+    # Per-package outcome when several packages are checked in one run.
+    packages: Dict[str, Optional[bool]] = field(default_factory=dict)
+    throughput: Optional[Throughput] = None
+    latency: Optional[LatencyStats] = None
+    # Per-phase timings, recorded with --profile.
+    spans: List[Span] = field(default_factory=list)
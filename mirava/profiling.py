@@ -0,0 +1,168 @@
+"""Per-phase spans for ``--profile``.
+
+:func:`collect` installs a span list for the current check (a context
+variable, so tasks started by the check inherit it). HTTP phases come from
+httpcore's ``trace`` extension, which :func:`install_trace` adds to every
+request of the shared client; CPU phases such as gunzip or parsing are timed
+with :func:`span` or an accumulating :class:`Phase`. Outside :func:`collect`
+all of this is a context-variable lookup and nothing else.
+
+Connection set-up is reported as ``connect`` (DNS resolution included, which
+httpcore does not trace separately) and ``tls``; a request is split into
+``send``, ``wait`` (until response headers) and ``download`` (the body,
+including any processing done while streaming it).
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .models import Span
+
+if TYPE_CHECKING:
+    import httpx
+
+    from .models import CheckResult
+
+_spans: ContextVar[Optional[List[Span]]] = ContextVar("mirava_spans", default=None)
+
+# httpcore trace stage (without the "connection."/"http11."/"http2." prefix).
+_HTTP_PHASES = {
+    "connect_tcp": "connect",
+    "connect_unix_socket": "connect",
+    "start_tls": "tls",
+    "send_request_headers": "send",
+    "send_request_body": "send",
+    "receive_response_headers": "wait",
+    "receive_response_body": "download",
+}
+
+
+def file_label(url: str) -> str:
+    """Last path segment of ``url`` (or its host) for span targets."""
+    parts = urlsplit(url)
+    return parts.path.rstrip("/").rsplit("/", 1)[-1] or parts.hostname or url
+
+
+@contextmanager
+def collect() -> Iterator[List[Span]]:
+    """Record spans of everything run inside the block into the yielded list."""
+    spans: List[Span] = []
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+
+@contextmanager
+def span(name: str, target: str = "") -> Iterator[None]:
+    spans = _spans.get()
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append(Span(name, start, (time.perf_counter() - start) * 1000, target))
+
+
+class Phase:
+    """A span entered many times (e.g. once per chunk), reported as one total."""
+
+    __slots__ = ("_span", "_entered")
+
+    def __init__(self, name: str, target: str = "") -> None:
+        spans = _spans.get()
+        self._span: Optional[Span] = None
+        if spans is not None:
+            self._span = Span(name, time.perf_counter(), 0.0, target)
+            spans.append(self._span)
+        self._entered = 0.0
+
+    def __enter__(self) -> "Phase":
+        if self._span is not None:
+            self._entered = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._span is not None:
+            self._span.duration_ms += (time.perf_counter() - self._entered) * 1000
+
+
+async def install_trace(request: httpx.Request) -> None:
+    """httpx ``request`` event hook adding span-recording trace callbacks."""
+    spans = _spans.get()
+    if spans is None:
+        return
+    inner = request.extensions.get("trace")
+    target = file_label(str(request.url))
+    started: Dict[str, float] = {}
+
+    async def trace(event: str, info: Dict[str, Any]) -> None:
+        if inner is not None:
+            await inner(event, info)
+        stage, _, state = event.rpartition(".")
+        phase = _HTTP_PHASES.get(stage.partition(".")[2])
+        if phase is None:
+            return
+        if state == "started":
+            started[stage] = time.perf_counter()
+        elif stage in started:
+            start = started.pop(stage)
+            spans.append(Span(phase, start, (time.perf_counter() - start) * 1000, target))
+
+    request.extensions["trace"] = trace
+
+
+def breakdown(results: List[CheckResult]) -> List[Tuple[str, str, int, float, float, float]]:
+    """``(phase, file, count, total ms, mean ms, max ms)`` by total time, largest first."""
+    groups: Dict[Tuple[str, str], List[float]] = {}
+    for r in results:
+        for s in r.spans:
+            groups.setdefault((s.name, s.target), []).append(s.duration_ms)
+    rows = [
+        (name, target, len(d), sum(d), sum(d) / len(d), max(d))
+        for (name, target), d in groups.items()
+    ]
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def format_breakdown(results: List[CheckResult]) -> List[List[str]]:
+    return [
+        [name, target, str(count), f"{total:.0f}ms", f"{mean:.1f}ms", f"{peak:.1f}ms"]
+        for name, target, count, total, mean, peak in breakdown(results)
+    ]
+
+
+BREAKDOWN_HEADERS = ["Phase", "File", "Count", "Total", "Mean", "Max"]
+
+
+def chrome_trace(results: List[CheckResult]) -> Dict[str, Any]:
+    """Trace-event JSON (chrome://tracing, Perfetto) with one track per URL."""
+    starts = [s.start for r in results for s in r.spans]
+    origin = min(starts) if starts else 0.0
+    events: List[Dict[str, Any]] = []
+    for tid, r in enumerate(results, 1):
+        events.append({
+            "name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+            "args": {"name": f"{r.mirror_name} {r.endpoint_name} {r.url}"},
+        })
+        for s in r.spans:
+            events.append({
+                "name": f"{s.name} {s.target}".strip(), "cat": s.name, "ph": "X",
+                "ts": round((s.start - origin) * 1e6, 1), "dur": round(s.duration_ms * 1000, 1),
+                "pid": 1, "tid": tid, "args": {"target": s.target},
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(results: List[CheckResult], path: str) -> None:
+    import json
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(results), f)
@@ -1,33 +1,265 @@
 from __future__ import annotations
 
 import asyncio
+import statistics
 import time
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 import httpx
 
+from ..deadlines import budget_detail, current, within
+from ..metrics import PACKAGE_CHECK_DURATION
+from ..models import CheckResult, LatencyStats
+from ..profiling import span
+
+PackageStatus = Tuple[Optional[bool], str]
+
+# HEAD answers that usually mean "try GET instead" rather than "down".
+_HEAD_REJECTED = {403, 405, 501}
+
+# httpcore trace stages that make up opening a connection.
+_CONNECT_STAGES = ("connection.connect_tcp", "connection.start_tls")
+
+
+class Probe(NamedTuple):
+    reachable: bool
+    latency_ms: Optional[float]
+    ttfb_ms: Optional[float]
+    detail: str
+    # Time spent opening connections (TCP + TLS) during the probe.
+    connect_ms: float = 0.0
+    # ``latency_ms`` without the connection set-up of the final request.
+    rtt_ms: Optional[float] = None
+
+
+async def _timed_request(
+    client: httpx.AsyncClient, method: str, url: str,
+    headers: Optional[Dict[str, str]] = None, read_body: bool = False,
+) -> Tuple[httpx.Response, float, float, float]:
+    """Send a request; return the response, time to first byte, total time and
+    the part of it spent opening a connection, all in ms.
+
+    Unless ``read_body`` is set, at most the first body chunk is read before
+    the stream is closed. The connection time comes from httpcore's ``trace``
+    extension and is 0 when a pooled connection was reused.
+    """
+    started: Dict[str, float] = {}
+    connect = 0.0
+
+    async def trace(event: str, info) -> None:
+        nonlocal connect
+        stage, _, state = event.rpartition(".")
+        if stage in _CONNECT_STAGES:
+            if state == "started":
+                started[stage] = time.perf_counter()
+            elif stage in started:
+                connect += time.perf_counter() - started.pop(stage)
+
+    start = time.perf_counter()
+    request = client.build_request(method, url, headers=headers, extensions={"trace": trace})
+    resp = await client.send(request, stream=True, follow_redirects=True)
+    ttfb = (time.perf_counter() - start) * 1000
+    try:
+        if read_body:
+            await resp.aread()
+        else:
+            async for _ in resp.aiter_bytes():
+                break
+    finally:
+        await resp.aclose()
+    return resp, ttfb, (time.perf_counter() - start) * 1000, connect * 1000
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Linear-interpolated percentile ``q`` (0-100) of a sorted list."""
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def latency_stats(probes: List[Probe], sent: int) -> LatencyStats:
+    """Summarize ``probes`` answered out of ``sent`` attempts."""
+    rtts = sorted(p.rtt_ms for p in probes if p.rtt_ms is not None)
+    handshakes = [p.connect_ms for p in probes if p.connect_ms]
+    return LatencyStats(
+        samples=sent,
+        loss_rate=(sent - len(probes)) / sent if sent else 0.0,
+        min_ms=rtts[0] if rtts else None,
+        median_ms=statistics.median(rtts) if rtts else None,
+        p90_ms=percentile(rtts, 90) if rtts else None,
+        p99_ms=percentile(rtts, 99) if rtts else None,
+        handshake_ms=max(handshakes) if handshakes else None,
+    )
+
+
+def summarize_packages(statuses: Dict[str, PackageStatus]) -> PackageStatus:
+    """Fold per-package statuses into one ``(package_ok, detail)`` pair."""
+    if not statuses:
+        return None, ""
+    if len(statuses) == 1:
+        return next(iter(statuses.values()))
+    oks = [ok for ok, _ in statuses.values()]
+    if all(ok is None for ok in oks):
+        return None, next(iter(statuses.values()))[1]
+    details = {detail for _, detail in statuses.values()}
+    missing = [name for name, (ok, _) in statuses.items() if ok is False]
+    found = sum(1 for ok in oks if ok is True)
+    if len(details) == 1 and found == 0:
+        # Every package failed for the same reason (e.g. index http 404).
+        return False, details.pop()
+    detail = f"{found}/{len(statuses)} found"
+    if missing:
+        detail += f"; missing {', '.join(missing)}"
+    return (not missing), detail
+
+
+async def head_status(client: httpx.AsyncClient, url: str) -> int:
+    """Status of ``url`` from HEAD, asked again with GET (body unread) when HEAD is rejected.
+
+    For registries where the existence of a metadata file answers the package
+    question, so nothing but headers needs to be transferred.
+    """
+    resp = await client.head(url, follow_redirects=True)
+    if resp.status_code in _HEAD_REJECTED:
+        async with client.stream("GET", url, follow_redirects=True) as resp:
+            pass
+    return resp.status_code
+
+
+def status_result(status: int) -> PackageStatus:
+    if status == 200:
+        return True, "found"
+    if status in (404, 410):
+        return False, "not found"
+    return False, f"http {status}"
+
 
 class BaseRegistry:
     name = "base"
 
-    async def check_reachable(self, client: httpx.AsyncClient, url: str) -> Tuple[bool, Optional[float], str]:
-        start = time.perf_counter()
+    async def check_reachable(self, client: httpx.AsyncClient, url: str, mode: str = "head") -> Probe:
+        """Probe ``url``.
+
+        ``head`` sends HEAD and falls back to a one-byte ranged GET whose
+        stream is closed after the first chunk; ``get`` downloads the whole
+        response as older versions did.
+        """
         try:
-            resp = await client.get(url, follow_redirects=True)
-            latency = (time.perf_counter() - start) * 1000
-            if resp.status_code < 400:
-                return True, latency, "ok"
-            return False, latency, f"http {resp.status_code}"
+            if mode == "get":
+                resp, ttfb, total, connect = await _timed_request(client, "GET", url, read_body=True)
+                handshake = connect
+            else:
+                resp, ttfb, total, connect = await _timed_request(client, "HEAD", url)
+                handshake = connect
+                if resp.status_code in _HEAD_REJECTED:
+                    resp, ttfb, total, connect = await _timed_request(
+                        client, "GET", url, headers={"Range": "bytes=0-0"},
+                    )
+                    handshake += connect
+            rtt = max(0.0, total - connect)
+            # 416: the range was rejected, but the server is clearly up.
+            if resp.status_code < 400 or resp.status_code == 416:
+                return Probe(True, total, ttfb, "ok", handshake, rtt)
+            return Probe(False, total, ttfb, f"http {resp.status_code}", handshake, rtt)
         except httpx.RequestError as exc:
-            return False, None, str(exc)
+            return Probe(False, None, None, str(exc))
+
+    async def sample_reachable(
+        self, client: httpx.AsyncClient, url: str, mode: str = "head", samples: int = 1,
+    ) -> Tuple[Probe, Optional[LatencyStats]]:
+        """Probe ``url`` ``samples`` times in a row over the pooled connection.
+
+        Returns one probe summarizing the run (median total time and TTFB,
+        so ``latency_ms`` means the same as for a single probe) plus the
+        spread of steady-state round trips; the spread is None for a single
+        sample. Transport errors count as loss; an HTTP error answer ends the
+        run early since repeating it will not change the verdict.
+        """
+        if samples <= 1:
+            return await self.check_reachable(client, url, mode=mode), None
+        answered: List[Probe] = []
+        failure: Optional[Probe] = None
+        sent = 0
+        for _ in range(samples):
+            sent += 1
+            probe = await self.check_reachable(client, url, mode=mode)
+            if probe.latency_ms is None:
+                failure = failure or probe
+                continue
+            answered.append(probe)
+            if not probe.reachable:
+                failure = probe
+                break
+        stats = latency_stats(answered, sent)
+        ok = [p for p in answered if p.reachable]
+        if not ok:
+            return failure or answered[-1], stats
+        detail = "ok"
+        if stats.loss_rate:
+            detail = f"ok; {sent - len(answered)}/{sent} lost"
+        latency = statistics.median(p.latency_ms for p in ok)
+        ttfb = statistics.median(p.ttfb_ms for p in ok if p.ttfb_ms is not None)
+        return Probe(True, latency, ttfb, detail, stats.handshake_ms or 0.0, stats.median_ms), stats
+
+    def default_os_kwargs(self) -> Dict[str, str]:
+        """OS options (repo, arch, ...) used when neither the host nor the user sets them."""
+        return {}
 
     async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
         return None, "package check not supported"
 
-    async def check(self, client: httpx.AsyncClient, url: str, package: Optional[str] = None, **kwargs):
-        reachable, latency, detail = await self.check_reachable(client, url)
-        package_ok = None
-        pkg_detail = ""
-        if package:
-            package_ok, pkg_detail = await self.check_package(client, url, package, **kwargs)
-        return reachable, latency, detail, package_ok, pkg_detail
+    async def check_packages(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Dict[str, PackageStatus]:
+        """Check several packages; registries with a single index override this."""
+        statuses = await asyncio.gather(
+            *(self.check_package(client, url, p, **kwargs) for p in packages)
+        )
+        return dict(zip(packages, statuses))
+
+    async def benchmark_url(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Optional[str]:
+        """URL of a representative file to time downloads with, or None.
+
+        Used by ``--benchmark``; ``packages`` are the packages the user asked
+        about, which registries may prefer over their built-in default.
+        """
+        return None
+
+    async def check(
+        self, client: httpx.AsyncClient, url: str, packages: Optional[Iterable[str]] = None,
+        probe: str = "head", samples: int = 1, **kwargs,
+    ) -> CheckResult:
+        limits = current()
+        with span("probe"):
+            budget = limits.probe_s if limits else None
+            try:
+                result, stats = await within(self.sample_reachable(client, url, mode=probe, samples=samples), budget)
+            except asyncio.TimeoutError:
+                result, stats = Probe(False, None, None, budget_detail("probe", budget)), None
+        reachable, latency, ttfb, detail = result.reachable, result.latency_ms, result.ttfb_ms, result.detail
+        wanted = list(dict.fromkeys(p.strip() for p in (packages or ()) if p.strip()))
+        statuses: Dict[str, PackageStatus] = {}
+        if wanted:
+            started = time.perf_counter()
+            with span("packages"):
+                budget = limits.index_s if limits else None
+                try:
+                    statuses = await within(self.check_packages(client, url, wanted, **kwargs), budget)
+                except asyncio.TimeoutError:
+                    failure = budget_detail("package lookup", budget)
+                    statuses = {p: (False, failure) for p in wanted}
+            PACKAGE_CHECK_DURATION.labels(self.name).observe(time.perf_counter() - started)
+        package_ok, pkg_detail = summarize_packages(statuses)
+        if pkg_detail:
+            detail = f"{detail}; {pkg_detail}" if detail else pkg_detail
+        return CheckResult(
+            mirror_name="",
+            endpoint_name=self.name,
+            url=url,
+            reachable=reachable,
+            latency_ms=latency,
+            ttfb_ms=ttfb,
+            package_ok=package_ok,
+            detail=detail,
+            packages={p: ok for p, (ok, _) in statuses.items()},
+            latency=stats,
+        )
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+
+from .base import BaseRegistry, PackageStatus, head_status, status_result
+
+# Composer 2 metadata location when packages.json does not name one.
+_DEFAULT_METADATA_URL = "p2/%package%.json"
+
+
+class ComposerRegistry(BaseRegistry):
+    """Composer repositories (Packagist mirrors), checked via v2 ``p2/`` metadata."""
+
+    name = "Composer"
+
+    def __init__(self) -> None:
+        # ``metadata-url`` template per repository URL, from its packages.json.
+        self._templates: Dict[str, str] = {}
+
+    async def _metadata_url(self, client: httpx.AsyncClient, url: str) -> str:
+        template = self._templates.get(url)
+        if template is not None:
+            return template
+        base = url.rstrip("/") + "/"
+        discovered = None
+        try:
+            resp = await client.get(urljoin(base, "packages.json"), follow_redirects=True)
+            if resp.status_code == 200:
+                discovered = resp.json().get("metadata-url") or _DEFAULT_METADATA_URL
+        except (ValueError, AttributeError):
+            pass
+        # A leading slash is relative to the host, as Composer resolves it.
+        template = urljoin(base, discovered or _DEFAULT_METADATA_URL)
+        # Only a packages.json that was read is remembered; after an error the
+        # next check asks again.
+        if discovered is not None:
+            self._templates[url] = template
+        return template
+
+    async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
+        return (await self.check_packages(client, url, [package], **kwargs))[package]
+
+    async def _check(self, client: httpx.AsyncClient, template: str, package: str) -> PackageStatus:
+        package = package.strip().lower()
+        if not package:
+            return None, "no package"
+        if package.count("/") != 1:
+            return False, "expected vendor/package"
+        try:
+            return status_result(await head_status(client, template.replace("%package%", package)))
+        except httpx.RequestError as exc:
+            return False, str(exc)
+
+    async def check_packages(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Dict[str, PackageStatus]:
+        try:
+            # Read packages.json once before fanning out.
+            template = await self._metadata_url(client, url)
+        except httpx.RequestError as exc:
+            return {p: (False, str(exc)) for p in packages}
+        statuses = await asyncio.gather(*(self._check(client, template, p) for p in packages))
+        return dict(zip(packages, statuses))
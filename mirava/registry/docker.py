@@ -1,19 +1,71 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 import httpx
 
-from .base import BaseRegistry
+from .base import BaseRegistry, Probe
+
+
+# Image whose largest layer --benchmark times when no image was given.
+BENCH_IMAGE = "library/debian:latest"
+
+_MANIFEST_TYPES = ", ".join((
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+))
+
+
+def _pick_platform(index: dict) -> Optional[str]:
+    """Digest of the linux/amd64 manifest in a manifest list, else the first."""
+    manifests = index.get("manifests") or []
+    for m in manifests:
+        platform = m.get("platform") or {}
+        if platform.get("os") == "linux" and platform.get("architecture") == "amd64":
+            return m.get("digest")
+    return manifests[0].get("digest") if manifests else None
 
 
 class DockerRegistry(BaseRegistry):
     name = "Docker Registry"
 
-    async def check_reachable(self, client: httpx.AsyncClient, url: str):
+    async def benchmark_url(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Optional[str]:
+        """Largest layer blob of the first requested image (``name[:tag]``).
+
+        Registries that demand a bearer token for pulls are not supported.
+        """
+        image = packages[0] if packages else BENCH_IMAGE
+        name, _, tag = image.partition(":")
+        if "/" not in name:
+            name = f"library/{name}"
+        base = f"{url.rstrip('/')}/v2/{name}"
+        headers = {"Accept": _MANIFEST_TYPES}
+        try:
+            reference = tag or "latest"
+            for _ in range(2):
+                resp = await client.get(f"{base}/manifests/{reference}", headers=headers, follow_redirects=True)
+                if resp.status_code != 200:
+                    return None
+                manifest = resp.json()
+                if "manifests" not in manifest:
+                    break
+                reference = _pick_platform(manifest)
+                if not reference:
+                    return None
+            layers = manifest.get("layers") or []
+        except (httpx.RequestError, ValueError, AttributeError):
+            return None
+        if not layers:
+            return None
+        digest = max(layers, key=lambda layer: layer.get("size") or 0).get("digest")
+        return f"{base}/blobs/{digest}" if digest else None
+
+    async def check_reachable(self, client: httpx.AsyncClient, url: str, mode: str = "head") -> Probe:
         base = url.rstrip("/")
         # Docker registry v2 ping
-        return await super().check_reachable(client, f"{base}/v2/")
+        return await super().check_reachable(client, f"{base}/v2/", mode=mode)
 
     async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
         package = package.strip()
@@ -1,39 +1,42 @@
 from __future__ import annotations
 
-from typing import Dict
-
-from .base import BaseRegistry
-from .docker import DockerRegistry
-from .npm import NpmRegistry
-from .pypi import PyPIRegistry
-from .os.apt import AptRegistry
-from .os.yum import YumRegistry
-from .os.pacman import PacmanRegistry
-from .os.alpine import AlpineRegistry
-from .os.generic import OsRegistry
-
-
-REGISTRY_MAP: Dict[str, BaseRegistry] = {
-    "PyPI": PyPIRegistry(),
-    "npm": NpmRegistry(),
-    "Docker Registry": DockerRegistry(),
-    "Debian": AptRegistry(),
-    "Ubuntu": AptRegistry(),
-    "Kali": AptRegistry(),
-    "Mint": AptRegistry(),
-    "Raspbian": AptRegistry(),
-    "CentOS": YumRegistry(),
-    "Rocky Linux": YumRegistry(),
-    "AlmaLinux": YumRegistry(),
-    "Almalinux": YumRegistry(),
-    "Fedora": YumRegistry(),
-    "EPEL": YumRegistry(),
-    "Fedora EPEL": YumRegistry(),
-    "Arch Linux": PacmanRegistry(),
-    "Archlinux": PacmanRegistry(),
-    "Manjaro": PacmanRegistry(),
-    "Alpine": AlpineRegistry(),
+import importlib
+from typing import TYPE_CHECKING, Dict, Set
+
+if TYPE_CHECKING:
+    from .base import BaseRegistry
+
+
+# Registry classes are referenced by "module:Class" and imported on first use,
+# so starting the CLI does not pay for httpx, tarfile, gzip, ... up front.
+REGISTRY_CLASSES: Dict[str, str] = {
+    "PyPI": ".pypi:PyPIRegistry",
+    "npm": ".npm:NpmRegistry",
+    "Yarn": ".npm:NpmRegistry",
+    "Docker Registry": ".docker:DockerRegistry",
+    "Maven": ".maven:MavenRegistry",
+    "Gradle": ".maven:MavenRegistry",
+    "NuGet": ".nuget:NuGetRegistry",
+    "Composer": ".composer:ComposerRegistry",
+    "NodeJS": ".nodejs:NodeJSRegistry",
+    "Debian": ".os.apt:AptRegistry",
+    "Ubuntu": ".os.apt:AptRegistry",
+    "Kali": ".os.apt:AptRegistry",
+    "Mint": ".os.apt:AptRegistry",
+    "Raspbian": ".os.apt:AptRegistry",
+    "CentOS": ".os.yum:YumRegistry",
+    "Rocky Linux": ".os.yum:YumRegistry",
+    "AlmaLinux": ".os.yum:YumRegistry",
+    "Almalinux": ".os.yum:YumRegistry",
+    "Fedora": ".os.yum:YumRegistry",
+    "EPEL": ".os.yum:YumRegistry",
+    "Fedora EPEL": ".os.yum:YumRegistry",
+    "Arch Linux": ".os.pacman:PacmanRegistry",
+    "Archlinux": ".os.pacman:PacmanRegistry",
+    "Manjaro": ".os.pacman:ManjaroRegistry",
+    "Alpine": ".os.alpine:AlpineRegistry",
 }
+DEFAULT_REGISTRY = ".os.generic:OsRegistry"
 
 OS_NAMES = {
     "Alpine",
@@ -69,6 +72,49 @@ REGISTRY_NAMES = {
     "NodeJS",
 }
 
+# Third-party registries declare entry points in this group, named after the
+# catalog endpoint they check, e.g. in their pyproject.toml:
+#
+#     [project.entry-points."mirava.registries"]
+#     "Conda" = "mirava_conda:CondaRegistry"
+#
+# They take precedence over the built-in classes above.
+ENTRY_POINT_GROUP = "mirava.registries"
+
+# One instance per class, shared by every name that maps to it.
+_instances: Dict[str, BaseRegistry] = {}
+_plugins: Dict[str, str] = {}
+_plugins_loaded = False
+
+
+def plugins() -> Dict[str, str]:
+    """Installed plugin registries as ``{endpoint name: "module:Class"}``.
+
+    Entry-point metadata is read once, on first use; nothing is imported.
+    """
+    global _plugins_loaded
+    if not _plugins_loaded:
+        from importlib.metadata import entry_points
+
+        try:
+            eps = entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:  # Python < 3.10
+            eps = entry_points().get(ENTRY_POINT_GROUP, [])
+        _plugins.update((ep.name, ep.value) for ep in eps)
+        _plugins_loaded = True
+    return _plugins
+
+
+def registry_names() -> Set[str]:
+    """Names shown in the registry menu: the built-ins plus plugins that are not OSes."""
+    return REGISTRY_NAMES | {n for n in plugins() if n not in OS_NAMES}
+
 
 def registry_for(name: str) -> BaseRegistry:
-    return REGISTRY_MAP.get(name, OsRegistry())
+    path = plugins().get(name) or REGISTRY_CLASSES.get(name, DEFAULT_REGISTRY)
+    reg = _instances.get(path)
+    if reg is None:
+        module_name, _, class_name = path.partition(":")
+        module = importlib.import_module(module_name, __package__)
+        reg = _instances[path] = getattr(module, class_name)()
+    return reg
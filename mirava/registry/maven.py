@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import httpx
+
+from .base import BaseRegistry, head_status, status_result
+
+
+def _metadata_path(package: str) -> Optional[str]:
+    """Repository path answering ``group:artifact[:version]``, or None if malformed.
+
+    Without a version that is the artifact's ``maven-metadata.xml``; with one,
+    the version's POM.
+    """
+    parts = [p.strip() for p in package.split(":")]
+    if len(parts) not in (2, 3) or not all(parts):
+        return None
+    group, artifact = parts[0].replace(".", "/"), parts[1]
+    if len(parts) == 3:
+        version = parts[2]
+        return f"{group}/{artifact}/{version}/{artifact}-{version}.pom"
+    return f"{group}/{artifact}/maven-metadata.xml"
+
+
+class MavenRegistry(BaseRegistry):
+    """Maven 2 layout repositories; Gradle mirrors use the same layout."""
+
+    name = "Maven"
+
+    async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
+        package = package.strip()
+        if not package:
+            return None, "no package"
+        if url.rstrip("/").endswith(".zip"):
+            # Catalog entries for Gradle distributions point at a single file.
+            return None, "not a Maven repository"
+        path = _metadata_path(package)
+        if path is None:
+            return False, "expected group:artifact[:version]"
+        try:
+            return status_result(await head_status(client, f"{url.rstrip('/')}/{path}"))
+        except httpx.RequestError as exc:
+            return False, str(exc)
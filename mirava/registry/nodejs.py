@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .base import BaseRegistry, PackageStatus
+
+
+def _index_candidates(url: str) -> List[str]:
+    base = url.rstrip("/")
+    if base.endswith("/dist"):
+        return [f"{base}/index.json"]
+    # Mirrors either serve the dist tree at the root or under /dist.
+    return [f"{base}/index.json", f"{base}/dist/index.json"]
+
+
+def _match(releases: List[Dict[str, Any]], wanted: str) -> Optional[str]:
+    """Newest release matching ``wanted``, or None.
+
+    ``node`` / ``latest`` match any release, ``lts`` any LTS release, and a
+    version matches by components: ``20`` or ``v20.11`` or ``20.11.1``.
+    """
+    wanted = wanted.strip().lower()
+    if wanted.startswith("node@"):
+        wanted = wanted[5:]
+    if wanted in ("node", "latest", ""):
+        return releases[0].get("version") if releases else None
+    if wanted == "lts":
+        return next((r.get("version") for r in releases if r.get("lts")), None)
+    prefix = wanted.lstrip("v").split(".")
+    for r in releases:
+        version = str(r.get("version", ""))
+        if version.lstrip("v").split(".")[: len(prefix)] == prefix:
+            return version
+    return None
+
+
+class NodeJSRegistry(BaseRegistry):
+    """Node.js distribution mirrors; "packages" are Node versions looked up in ``index.json``."""
+
+    name = "NodeJS"
+
+    async def _releases(self, client: httpx.AsyncClient, url: str) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+        status = 0
+        for index_url in _index_candidates(url):
+            resp = await client.get(index_url, follow_redirects=True)
+            status = resp.status_code
+            if status == 200:
+                try:
+                    releases = resp.json()
+                except ValueError:
+                    return None, "invalid index.json"
+                # Newest first, as published by nodejs.org.
+                return [r for r in releases if isinstance(r, dict)] if isinstance(releases, list) else [], ""
+        return None, f"index.json http {status}"
+
+    async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
+        if not package.strip():
+            return None, "no package"
+        return (await self.check_packages(client, url, [package], **kwargs))[package]
+
+    async def check_packages(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Dict[str, PackageStatus]:
+        """One ``index.json`` download answers every version asked about."""
+        try:
+            releases, error = await self._releases(client, url)
+        except httpx.RequestError as exc:
+            return {p: (False, str(exc)) for p in packages}
+        if releases is None:
+            return {p: (False, error) for p in packages}
+        statuses: Dict[str, PackageStatus] = {}
+        for p in packages:
+            version = _match(releases, p)
+            statuses[p] = (True, f"found {version}") if version else (False, "not found")
+        return statuses
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 import httpx
 
 from .base import BaseRegistry
 
 
+# Tarball timed by --benchmark when no package was given.
+BENCH_PACKAGE = "typescript"
+
+
 class NpmRegistry(BaseRegistry):
     name = "npm"
 
+    async def benchmark_url(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Optional[str]:
+        """Tarball of the latest version of the first requested package."""
+        pkg = (packages[0] if packages else BENCH_PACKAGE).replace("/", "%2F")
+        # ``/<pkg>/latest`` returns one version document instead of the
+        # full packument, which is several MB for popular packages.
+        try:
+            resp = await client.get(f"{url.rstrip('/')}/{pkg}/latest", follow_redirects=True)
+            if resp.status_code != 200:
+                return None
+            return resp.json().get("dist", {}).get("tarball")
+        except (httpx.RequestError, ValueError, AttributeError):
+            return None
+
     async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
         package = package.strip()
         if not package:
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from .base import BaseRegistry, PackageStatus, status_result
+
+_BASE_ADDRESS = "PackageBaseAddress/3.0.0"
+
+
+def _index_candidates(url: str) -> List[str]:
+    base = url.rstrip("/")
+    if base.endswith(".json"):
+        return [base]
+    return [f"{base}/v3/index.json", f"{base}/index.json"]
+
+
+def _split(package: str) -> Tuple[str, Optional[str]]:
+    """``Id`` or ``Id@version``; NuGet ids cannot contain ``@``."""
+    package_id, sep, version = package.partition("@")
+    return package_id.strip(), version.strip() if sep else None
+
+
+class NuGetRegistry(BaseRegistry):
+    """NuGet v3 feeds, checked through the flat container (``PackageBaseAddress``)."""
+
+    name = "NuGet"
+
+    def __init__(self) -> None:
+        # Flat container address per feed URL, from its service index.
+        self._bases: Dict[str, str] = {}
+
+    async def _base_address(self, client: httpx.AsyncClient, url: str) -> str:
+        base = self._bases.get(url)
+        if base is not None:
+            return base
+        for index_url in _index_candidates(url):
+            try:
+                resp = await client.get(index_url, follow_redirects=True)
+                if resp.status_code != 200:
+                    continue
+                resources = resp.json().get("resources") or []
+            except (ValueError, AttributeError):
+                continue
+            for resource in resources:
+                if not isinstance(resource, dict):
+                    continue
+                types = resource.get("@type")
+                types = types if isinstance(types, list) else [types]
+                if _BASE_ADDRESS in types and resource.get("@id"):
+                    base = resource["@id"].rstrip("/") + "/"
+                    break
+            if base is not None:
+                break
+        if base is None:
+            # nuget.org's layout, for feeds that do not publish a service index.
+            # Not remembered: the index may only have been unavailable this time.
+            return f"{url.rstrip('/')}/v3-flatcontainer/"
+        self._bases[url] = base
+        return base
+
+    async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
+        return (await self.check_packages(client, url, [package], **kwargs))[package]
+
+    async def _check(self, client: httpx.AsyncClient, base: str, package: str) -> PackageStatus:
+        package_id, version = _split(package)
+        if not package_id:
+            return None, "no package"
+        try:
+            # Lists every version of the package: a few hundred bytes to a few KB.
+            resp = await client.get(f"{base}{package_id.lower()}/index.json", follow_redirects=True)
+            if resp.status_code != 200 or version is None:
+                return status_result(resp.status_code)
+            versions = resp.json().get("versions") or []
+        except httpx.RequestError as exc:
+            return False, str(exc)
+        except (ValueError, AttributeError):
+            return False, "invalid package index"
+        if version.lower() in versions:
+            return True, "found"
+        return False, f"version {version} not found"
+
+    async def check_packages(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Dict[str, PackageStatus]:
+        try:
+            # Resolve the service index once before fanning out.
+            base = await self._base_address(client, url)
+        except httpx.RequestError as exc:
+            return {p: (False, str(exc)) for p in packages}
+        statuses = await asyncio.gather(*(self._check(client, base, p) for p in packages))
+        return dict(zip(packages, statuses))
@@ -1,45 +1,109 @@
 from __future__ import annotations
 
-import io
+import lzma
+import re
 import tarfile
-from typing import Optional, Tuple
+import zlib
+from typing import Dict, List, Optional, Set
 
 import httpx
 
-from .generic import OsRegistry
+from ...cache import open_index
+from ..base import PackageStatus
+from .generic import IndexUnavailable, OsRegistry, failed_statuses, found_statuses, iter_members, memoized, scan_tar
+
+_PKG_RE = re.compile(rb"^P:([^\n]*)$", re.MULTILINE)
+_READ_SIZE = 64 * 1024
+# Options used when neither the host nor the user sets them.
+DEFAULTS = {"branch": "v3.18", "repo": "main", "arch": "x86_64"}
+
+
+def _index_url(url: str, kwargs) -> str:
+    base = url.rstrip("/")
+    # If base already ends in main/community, use it directly.
+    if base.endswith("/main") or base.endswith("/community"):
+        return f"{base}/APKINDEX.tar.gz"
+    branch = kwargs.get("branch") or DEFAULTS["branch"]
+    repo = kwargs.get("repo") or DEFAULTS["repo"]
+    arch = kwargs.get("arch") or DEFAULTS["arch"]
+    return f"{base}/{branch}/{repo}/{arch}/APKINDEX.tar.gz"
+
+
+def _index_key(index_url: str, fingerprint: Optional[str]) -> Optional[str]:
+    """Memo key for an APKINDEX: where it sits (branch/repo/arch) and which snapshot it is."""
+    if not fingerprint:
+        return None
+    return f"apk:{'/'.join(index_url.split('/')[-4:-1])}:{fingerprint}"
+
+
+def _scan_apkindex(tf: tarfile.TarFile, wanted: Set[bytes]) -> Set[bytes]:
+    """Names in ``wanted`` listed as ``P:`` lines of the archive's ``APKINDEX``.
+
+    The member is read in blocks and matched as bytes; only the last partial
+    line is carried over. Returns as soon as everything has been found.
+    """
+    found: Set[bytes] = set()
+    for member in iter_members(tf):
+        if not member.name.endswith("APKINDEX"):
+            continue
+        f = tf.extractfile(member)
+        if f is None:
+            continue
+        carry = b""
+        while True:
+            block = f.read(_READ_SIZE)
+            buf = carry + block if block else carry + b"\n"
+            cut = buf.rfind(b"\n") + 1
+            for name in _PKG_RE.findall(buf, 0, cut):
+                if name in wanted:
+                    found.add(name)
+            if found == wanted or not block:
+                return found
+            carry = buf[cut:]
+    return found
 
 
 class AlpineRegistry(OsRegistry):
     name = "Alpine"
 
-    async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
-        package = package.strip()
-        if not package:
-            return None, "no package"
-        base = url.rstrip("/")
-        # If base already ends in main/community, use it directly.
-        if base.endswith("/main") or base.endswith("/community"):
-            index_url = f"{base}/APKINDEX.tar.gz"
-        else:
-            branch = kwargs.get("branch") or "v3.18"
-            repo = kwargs.get("repo") or "main"
-            arch = kwargs.get("arch") or "x86_64"
-            index_url = f"{base}/{branch}/{repo}/{arch}/APKINDEX.tar.gz"
+    def default_os_kwargs(self) -> Dict[str, str]:
+        return dict(DEFAULTS)
+
+    async def benchmark_url(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Optional[str]:
+        return _index_url(url, kwargs)
+
+    async def check_packages(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Dict[str, PackageStatus]:
+        index_url = _index_url(url, kwargs)
+        cache, memo = kwargs.get("cache"), kwargs.get("memo")
+
+        async def scan_body(resp, wanted: List[str]) -> Set[str]:
+            names = {p.encode("utf-8") for p in wanted}
+            found = await scan_tar(resp.aiter_bytes(), lambda tf: _scan_apkindex(tf, names), "APKINDEX.tar.gz")
+            return {p.decode("utf-8") for p in found}
+
+        async def scan(wanted: List[str]) -> Set[str]:
+            async with open_index(client, index_url, cache) as resp:
+                if resp.status_code != 200:
+                    raise IndexUnavailable(f"index http {resp.status_code}")
+                return await scan_body(resp, wanted)
+
         try:
-            resp = await client.get(index_url, follow_redirects=True)
-            if resp.status_code != 200:
-                return False, f"index http {resp.status_code}"
-            with tarfile.open(fileobj=io.BytesIO(resp.content), mode="r:gz") as tf:
-                for member in tf.getmembers():
-                    if member.name.endswith("APKINDEX"):
-                        f = tf.extractfile(member)
-                        if not f:
-                            continue
-                        content = f.read().decode("utf-8", errors="ignore")
-                        if f"P:{package}\n" in content:
-                            return True, "found"
-            return False, "not found"
+            # Leaving the ``async with`` block once every package has been
+            # seen closes the response and cancels the rest of the download.
+            async with open_index(client, index_url, cache) as resp:
+                if resp.status_code != 200:
+                    return failed_statuses(packages, f"index http {resp.status_code}")
+                key = _index_key(index_url, resp.fingerprint)
+                if memo is None or key is None or not memo.busy(key):
+                    found = await memoized(memo, key, packages, lambda wanted: scan_body(resp, wanted))
+                    return found_statuses(packages, found)
+            # Another mirror is scanning the same snapshot. Wait for it with
+            # this response closed; if that scan fails, fetch the index again.
+            found = await memo.lookup(key, packages, scan)
+            return found_statuses(packages, found)
+        except IndexUnavailable as exc:
+            return failed_statuses(packages, str(exc))
         except httpx.RequestError as exc:
-            return False, str(exc)
-        except tarfile.TarError:
-            return False, "invalid APKINDEX"
+            return failed_statuses(packages, str(exc))
+        except (tarfile.TarError, OSError, EOFError, zlib.error, lzma.LZMAError):
+            return failed_statuses(packages, "invalid APKINDEX")
@@ -1,36 +1,160 @@
 from __future__ import annotations
 
-import gzip
-import io
-from typing import Optional, Tuple
+import zlib
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import httpx
 
-from .generic import OsRegistry
+from ...cache import open_index
+from ...profiling import Phase
+from ..base import PackageStatus
+from .generic import (
+    Decompressor,
+    IndexUnavailable,
+    OsRegistry,
+    collect_names,
+    failed_statuses,
+    found_statuses,
+    memoized,
+)
+
+
+async def _iter_stanzas(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gunzip ``chunks`` incrementally and yield complete control stanzas.
+
+    Only the stanza currently being assembled is kept in memory, so the
+    footprint stays flat no matter how large ``Packages.gz`` is.
+    """
+    # Packages.gz may consist of several concatenated gzip members.
+    decomp = Decompressor()
+    gunzip = Phase("gunzip", "Packages.gz")
+    pending = b""
+    async for chunk in chunks:
+        with gunzip:
+            data = decomp.decompress(chunk)
+        if not data:
+            continue
+        pending += data
+        cut = pending.rfind(b"\n\n")
+        if cut == -1:
+            continue
+        for stanza in pending[:cut].split(b"\n\n"):
+            if stanza:
+                yield stanza
+        pending = pending[cut + 2:]
+    with gunzip:
+        pending += decomp.flush()
+    for stanza in pending.split(b"\n\n"):
+        if stanza:
+            yield stanza
+
+
+async def _iter_package_names(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    parse = Phase("parse", "Packages.gz")
+    async for stanza in _iter_stanzas(chunks):
+        with parse:
+            name = None
+            for line in stanza.split(b"\n"):
+                if line.startswith(b"Package:"):
+                    name = line[8:].strip().decode("utf-8", errors="ignore")
+                    break
+        if name is not None:
+            yield name
+
+
+# Options used when neither the host nor the user sets them.
+DEFAULTS = {"component": "main", "arch": "amd64"}
+
+
+def _index_location(url: str, kwargs) -> Tuple[str, str, str]:
+    """``(base, suite, path)`` of the Packages.gz described by ``kwargs``."""
+    suite = kwargs.get("suite") or kwargs.get("codename") or ""
+    component = kwargs.get("component") or DEFAULTS["component"]
+    arch = kwargs.get("arch") or DEFAULTS["arch"]
+    return url.rstrip("/"), suite, f"{component}/binary-{arch}/Packages.gz"
+
+
+def _stanza_fields(stanza: bytes) -> Dict[bytes, bytes]:
+    fields = {}
+    for line in stanza.split(b"\n"):
+        key, sep, value = line.partition(b":")
+        if sep and not line.startswith(b" "):
+            fields[key] = value.strip()
+    return fields
+
+
+def _index_key(suite: str, path: str, fingerprint: Optional[str]) -> Optional[str]:
+    """Memo key for a Packages.gz: which index of which suite, and which snapshot it is."""
+    if not fingerprint:
+        return None
+    return f"apt:{suite}/{path}:{fingerprint}"
+
+
+# Smallest pool file worth timing; smaller ones are dominated by TTFB.
+_BENCH_MIN_BYTES = 2_000_000
 
 
 class AptRegistry(OsRegistry):
     name = "APT"
 
-    async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
-        package = package.strip()
-        if not package:
-            return None, "no package"
-        suite = kwargs.get("suite") or kwargs.get("codename") or ""
-        component = kwargs.get("component") or "main"
-        arch = kwargs.get("arch") or "amd64"
+    def default_os_kwargs(self) -> Dict[str, str]:
+        return dict(DEFAULTS)
+
+    async def benchmark_url(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Optional[str]:
+        """First pool ``.deb`` of at least 2 MB listed in the suite's index.
+
+        Mirrors serving the same snapshot pick the same file, so their
+        throughput figures are comparable.
+        """
+        base, suite, path = _index_location(url, kwargs)
         if not suite:
-            return None, "missing suite/codename"
-        base = url.rstrip("/")
-        index_url = f"{base}/dists/{suite}/{component}/binary-{arch}/Packages.gz"
+            return None
+        try:
+            async with open_index(client, f"{base}/dists/{suite}/{path}", kwargs.get("cache")) as resp:
+                if resp.status_code != 200:
+                    return None
+                async for stanza in _iter_stanzas(resp.aiter_bytes()):
+                    fields = _stanza_fields(stanza)
+                    size = fields.get(b"Size", b"")
+                    if size.isdigit() and int(size) >= _BENCH_MIN_BYTES and b"Filename" in fields:
+                        return f"{base}/{fields[b'Filename'].decode('utf-8', errors='ignore')}"
+        except (httpx.RequestError, OSError, zlib.error):
+            return None
+        return None
+
+    async def check_packages(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Dict[str, PackageStatus]:
+        base, suite, path = _index_location(url, kwargs)
+        if not suite:
+            return {p: (None, "missing suite/codename") for p in packages}
+        cache = kwargs.get("cache")
+        memo = kwargs.get("memo")
+        index_url = f"{base}/dists/{suite}/{path}"
+
+        async def scan(wanted: List[str]) -> Set[str]:
+            async with open_index(client, index_url, cache) as resp:
+                if resp.status_code != 200:
+                    raise IndexUnavailable(f"index http {resp.status_code}")
+                return await collect_names(_iter_package_names(resp.aiter_bytes()), wanted)
+
         try:
-            resp = await client.get(index_url, follow_redirects=True)
-            if resp.status_code != 200:
-                return False, f"index http {resp.status_code}"
-            data = gzip.GzipFile(fileobj=io.BytesIO(resp.content)).read().decode("utf-8", errors="ignore")
-            needle = f"Package: {package}\n"
-            return (needle in data), ("found" if needle in data else "not found")
+            # Stream the index and stop as soon as every package has shown up;
+            # leaving the ``async with`` block closes the response and cancels
+            # the rest of the download.
+            async with open_index(client, index_url, cache) as resp:
+                if resp.status_code != 200:
+                    raise IndexUnavailable(f"index http {resp.status_code}")
+                key = _index_key(suite, path, resp.fingerprint)
+                if memo is None or key is None or not memo.busy(key):
+                    names = _iter_package_names(resp.aiter_bytes())
+                    found = await memoized(memo, key, packages, lambda wanted: collect_names(names, wanted))
+                    return found_statuses(packages, found)
+            # Another mirror is scanning the same snapshot. Wait for it with
+            # this response closed; if that scan fails, fetch the index again.
+            found = await memo.lookup(key, packages, scan)
+            return found_statuses(packages, found)
+        except IndexUnavailable as exc:
+            return failed_statuses(packages, str(exc))
         except httpx.RequestError as exc:
-            return False, str(exc)
-        except OSError:
-            return False, "invalid Packages.gz"
+            return failed_statuses(packages, str(exc))
+        except (OSError, zlib.error):
+            return failed_statuses(packages, "invalid Packages.gz")
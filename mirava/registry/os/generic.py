@@ -1,14 +1,313 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+import asyncio
+import bz2
+import concurrent.futures
+import lzma
+import zlib
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 import httpx
 
-from ..base import BaseRegistry
+from ...profiling import Phase
+from ..base import BaseRegistry, PackageStatus
+
+if TYPE_CHECKING:
+    import tarfile
+
+
+class IndexUnavailable(Exception):
+    """Raised by index scans when the index cannot be fetched or read."""
+
+
+class Decompressor:
+    """Gzip stream decoder that also handles concatenated members."""
+
+    def __init__(self) -> None:
+        self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    @property
+    def eof(self) -> bool:
+        return self._obj.eof
+
+    def decompress(self, data: bytes) -> bytes:
+        out = self._obj.decompress(data)
+        while self._obj.eof and self._obj.unused_data:
+            rest = self._obj.unused_data
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            out += self._obj.decompress(rest)
+        return out
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class ZstdDecompressor:
+    """zstandard stream decoder raising ``OSError`` on corrupt input like the others."""
+
+    def __init__(self) -> None:
+        import zstandard
+
+        self._error = zstandard.ZstdError
+        self._obj = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes) -> bytes:
+        try:
+            return self._obj.decompress(data)
+        except self._error as exc:
+            raise OSError(str(exc)) from None
+
+
+def decoder_for(suffix: str) -> Optional[Callable[[], object]]:
+    """Factory of objects with ``decompress(bytes) -> bytes`` for ``suffix``."""
+    if suffix == ".gz":
+        return Decompressor
+    if suffix == ".xz":
+        return lzma.LZMADecompressor
+    if suffix == ".bz2":
+        return bz2.BZ2Decompressor
+    if suffix == ".zst":
+        # Optional: install the ``zstd`` extra (zstandard) to read .zst metadata.
+        from importlib.util import find_spec
+
+        return ZstdDecompressor if find_spec("zstandard") else None
+    return None
+
+
+_MAGIC = ((b"\x1f\x8b", ".gz"), (b"\xfd7zXZ\x00", ".xz"), (b"BZh", ".bz2"), (b"\x28\xb5\x2f\xfd", ".zst"))
+
+
+def sniff_suffix(head: bytes) -> str:
+    """Compression suffix for the magic number at the start of ``head``, "" if none."""
+    for magic, suffix in _MAGIC:
+        if head.startswith(magic):
+            return suffix
+    return ""
+
+
+class _Plain:
+    eof = True
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ChunkReader:
+    """Blocking file object over an async byte stream, read from a worker thread.
+
+    Each refill asks the event loop for the next chunk, so the download only
+    advances as fast as the reader consumes it and about one chunk is held in
+    memory. Compression is sniffed from the first bytes and undone here rather
+    than by :mod:`tarfile`, whose stream mode stops after the first gzip
+    member (``APKINDEX.tar.gz`` has two).
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop, target: str = "") -> None:
+        self._chunks = chunks.__aiter__()
+        self._loop = loop
+        self._decoder = None
+        self._inflate = Phase("decompress", target)
+        self._buf = b""
+        self._pos = 0
+        self._eof = False
+        self._pending: Optional[concurrent.futures.Future] = None
+        self.closed = False
+
+    async def _next(self) -> bytes:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+    def _fill(self) -> None:
+        self._pending = asyncio.run_coroutine_threadsafe(self._next(), self._loop)
+        raw = self._pending.result()
+        if not raw:
+            self._eof = True
+            if not getattr(self._decoder, "eof", True):
+                raise EOFError("compressed index ended early")
+            return
+        if self._decoder is None:
+            suffix = sniff_suffix(raw)
+            factory = decoder_for(suffix) if suffix else None
+            if suffix and factory is None:
+                raise IndexUnavailable(f"unsupported compression {suffix}")
+            self._decoder = factory() if factory else _Plain()
+        with self._inflate:
+            data = self._decoder.decompress(raw)
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while not self.closed and not self._eof and (size < 0 or len(self._buf) - self._pos < size):
+            self._fill()
+        if self.closed:
+            return b""
+        end = len(self._buf) if size < 0 else self._pos + size
+        data = self._buf[self._pos:end]
+        self._pos += len(data)
+        return data
+
+    def close(self) -> None:
+        """Stop reading; a thread waiting for a chunk gets ``CancelledError``."""
+        self.closed = True
+        if self._pending is not None:
+            self._pending.cancel()
+
+
+def iter_members(tf: tarfile.TarFile) -> Iterator[tarfile.TarInfo]:
+    """Members of a stream-mode archive, without keeping every ``TarInfo``.
+
+    Iterating a :class:`tarfile.TarFile` appends each member to
+    ``tf.members``, which for a sync database with thousands of entries
+    grows for the whole scan.
+    """
+    while True:
+        member = tf.next()
+        if member is None:
+            return
+        yield member
+        tf.members.clear()
+
+
+async def scan_tar(
+    chunks: AsyncIterator[bytes], scan: Callable[[tarfile.TarFile], Set[str]], target: str = "",
+) -> Set[str]:
+    """Run ``scan`` over the tar archive streamed by ``chunks``, in a worker thread.
+
+    The archive is opened in stream mode (``r|``), so members are visited
+    one at a time and nothing is buffered up front. ``scan`` may return
+    early; the caller then leaves ``open_index`` and the rest of the download
+    is cancelled. The event loop stays free while the archive is inflated.
+    """
+    import tarfile
+
+    reader = ChunkReader(chunks, asyncio.get_running_loop(), target)
+
+    def run() -> Set[str]:
+        with tarfile.open(fileobj=reader, mode="r|") as tf:
+            return scan(tf)
+
+    # to_thread copies the context, so profiling spans still land in the check.
+    worker = asyncio.ensure_future(asyncio.to_thread(run))
+    try:
+        return await asyncio.shield(worker)
+    finally:
+        reader.close()
+        if not worker.done():
+            # Cancelled: let the thread stop before the caller closes the
+            # response it is reading from.
+            await asyncio.gather(worker, return_exceptions=True)
+
+
+class IndexMemo:
+    """Package lookups shared by mirrors that serve byte-identical indexes.
+
+    Entries are keyed by a content digest (from ``repomd.xml``, or the index's
+    Last-Modified and size), so each index snapshot is scanned once per run no
+    matter how many mirrors serve it. Workers asking for the same digest wait
+    for the scan in flight instead of parsing their own copy.
+
+    Nothing is locked across a scan: a waiter gives up on its own deadline
+    without holding anyone up, and when the scan it waited for fails or is
+    cancelled (its check ran out of time, say), the waiter scans its own copy.
+    """
+
+    def __init__(self) -> None:
+        self._known: Dict[str, Dict[str, bool]] = {}
+        # key -> future resolved when the scan in flight for it ends, however it ends.
+        self._pending: Dict[str, "asyncio.Future[None]"] = {}
+
+    def busy(self, key: str) -> bool:
+        """Whether a scan for ``key`` is in flight."""
+        return key in self._pending
+
+    async def lookup(
+        self, key: str, packages: List[str],
+        scan: Callable[[List[str]], Awaitable[Set[str]]],
+    ) -> Set[str]:
+        known = self._known.setdefault(key, {})
+        while True:
+            missing = [p for p in packages if p not in known]
+            if not missing:
+                return {p for p in packages if known[p]}
+            pending = self._pending.get(key)
+            if pending is None:
+                break
+            # asyncio.wait neither raises the scan's error nor cancels the
+            # scan when this waiter is cancelled.
+            await asyncio.wait({pending})
+        done = self._pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            found = await scan(missing)
+            for p in missing:
+                known[p] = p in found
+        finally:
+            del self._pending[key]
+            done.set_result(None)
+        return {p for p in packages if known[p]}
+
+
+async def memoized(
+    memo: Optional[IndexMemo], key: Optional[str], packages: List[str],
+    scan: Callable[[List[str]], Awaitable[Set[str]]],
+) -> Set[str]:
+    if memo is None or not key:
+        return await scan(packages)
+    return await memo.lookup(key, packages, scan)
+
+
+async def collect_names(names: AsyncIterator[str], wanted: Iterable[str]) -> Set[str]:
+    """Return the subset of ``wanted`` present in ``names``.
+
+    Stops consuming ``names`` once every wanted package has been seen, which
+    lets streaming index readers cancel the rest of the download.
+    """
+    remaining = set(wanted)
+    found: Set[str] = set()
+    async for name in names:
+        if name in remaining:
+            remaining.discard(name)
+            found.add(name)
+            if not remaining:
+                break
+    return found
+
+
+def found_statuses(packages: Iterable[str], found: Set[str]) -> Dict[str, PackageStatus]:
+    return {p: (True, "found") if p in found else (False, "not found") for p in packages}
+
+
+def failed_statuses(packages: Iterable[str], detail: str) -> Dict[str, PackageStatus]:
+    return {p: (False, detail) for p in packages}
 
 
 class OsRegistry(BaseRegistry):
+    """Base for OS repositories, where one index answers every package query.
+
+    Subclasses implement :meth:`check_packages`; single lookups go through it.
+    """
+
     name = "OS"
 
     async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
-        return None, "package check not supported for this OS"
+        package = package.strip()
+        if not package:
+            return None, "no package"
+        statuses = await self.check_packages(client, url, [package], **kwargs)
+        return statuses[package]
+
+    async def check_packages(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Dict[str, PackageStatus]:
+        return {p: (None, "package check not supported for this OS") for p in packages}
@@ -1,41 +1,157 @@
 from __future__ import annotations
 
-import io
+import asyncio
+import lzma
 import tarfile
-from typing import Optional, Tuple
+import zlib
+from typing import Dict, List, Optional, Set
 
 import httpx
 
-from .generic import OsRegistry
+from ...cache import open_index
+from ...profiling import file_label
+from ..base import PackageStatus
+from .generic import IndexUnavailable, OsRegistry, failed_statuses, iter_members, memoized, scan_tar
+
+
+# Official repositories in pacman.conf order; ``--repo all``, the default, searches these.
+REPOS = ("core", "extra", "multilib")
+DEFAULTS = {"repo": "all", "arch": "x86_64"}
+# Where repositories live below a mirror's base URL. Manjaro has no ``os``
+# level; its catalog bases already end in the branch (``.../stable``).
+ARCH_LAYOUT = "$repo/os/$arch"
+MANJARO_LAYOUT = "$repo/$arch"
+
+
+def _repos(kwargs) -> List[str]:
+    """Repositories named by the ``repo`` option: one, a comma-separated list or ``all``."""
+    value = (kwargs.get("repo") or DEFAULTS["repo"]).strip()
+    if value == "all":
+        return list(REPOS)
+    return [r.strip() for r in value.split(",") if r.strip()] or list(REPOS)
+
+
+def server_url(url: str, layout: str = ARCH_LAYOUT) -> str:
+    """``url`` as a pacman ``Server`` template.
+
+    Catalog URLs either carry ``$repo``/``$arch`` already or are the mirror's
+    base, below which repositories live at ``layout``.
+    """
+    base = url.rstrip("/")
+    if "$repo" in base:
+        return base
+    return f"{base}/{layout}"
+
+
+def _db_url(url: str, kwargs, repo: Optional[str] = None, layout: str = ARCH_LAYOUT) -> str:
+    repo = repo or _repos(kwargs)[0]
+    arch = kwargs.get("arch") or DEFAULTS["arch"]
+    base = server_url(url, layout).replace("$repo", repo).replace("$arch", arch)
+    return f"{base}/{repo}.db"
+
+
+def _scan_db(tf: tarfile.TarFile, wanted: Set[str]) -> Set[str]:
+    """Names in ``wanted`` that have an entry in the sync database.
+
+    Every package is a ``<name>-<pkgver>-<pkgrel>/`` directory, and neither
+    pkgver nor pkgrel may contain a hyphen, so the name is read off the
+    member path without opening ``desc``. Returns as soon as everything has
+    been found.
+    """
+    found: Set[str] = set()
+    for member in iter_members(tf):
+        name = member.name.split("/", 1)[0].rsplit("-", 2)[0]
+        if name in wanted:
+            found.add(name)
+            if found == wanted:
+                break
+    return found
+
+
+async def _repo_names(
+    client: httpx.AsyncClient, url: str, repo: str, packages: List[str], kwargs, layout: str = ARCH_LAYOUT,
+) -> Set[str]:
+    """Names of ``packages`` in ``repo``'s sync database on the mirror at ``url``.
+
+    Raises :class:`IndexUnavailable` when the database cannot be read.
+    """
+    db_url = _db_url(url, kwargs, repo, layout)
+    arch = kwargs.get("arch") or DEFAULTS["arch"]
+    cache, memo = kwargs.get("cache"), kwargs.get("memo")
+
+    async def scan_body(resp, wanted: List[str]) -> Set[str]:
+        names = set(wanted)
+        return await scan_tar(resp.aiter_bytes(), lambda tf: _scan_db(tf, names), file_label(db_url))
+
+    async def scan(wanted: List[str]) -> Set[str]:
+        async with open_index(client, db_url, cache) as resp:
+            if resp.status_code != 200:
+                raise IndexUnavailable(f"db http {resp.status_code}")
+            return await scan_body(resp, wanted)
+
+    try:
+        # Leaving the ``async with`` block once every package has been
+        # seen closes the response and cancels the rest of the download.
+        async with open_index(client, db_url, cache) as resp:
+            if resp.status_code != 200:
+                raise IndexUnavailable(f"db http {resp.status_code}")
+            key = resp.fingerprint and f"pacman:{repo}/{arch}:{resp.fingerprint}"
+            if memo is None or not key or not memo.busy(key):
+                return await memoized(memo, key, packages, lambda wanted: scan_body(resp, wanted))
+        # Another mirror is scanning the same database. Wait for it with this
+        # response closed; if that scan fails, fetch the database again.
+        return await memo.lookup(key, packages, scan)
+    except httpx.RequestError as exc:
+        raise IndexUnavailable(str(exc)) from None
+    except (tarfile.TarError, OSError, EOFError, zlib.error, lzma.LZMAError):
+        raise IndexUnavailable("invalid db") from None
 
 
 class PacmanRegistry(OsRegistry):
     name = "Pacman"
+    layout = ARCH_LAYOUT
+
+    def default_os_kwargs(self) -> Dict[str, str]:
+        return dict(DEFAULTS)
 
-    async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
-        package = package.strip()
-        if not package:
-            return None, "no package"
-        repo = kwargs.get("repo") or "core"
-        arch = kwargs.get("arch") or "x86_64"
-        base = url.rstrip("/")
-        base = base.replace("$repo", repo).replace("$arch", arch)
-        db_url = f"{base}/{repo}.db"
+    async def benchmark_url(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Optional[str]:
+        return _db_url(url, kwargs, layout=self.layout)
+
+    async def check_packages(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Dict[str, PackageStatus]:
+        """Search every requested repository of the mirror at once.
+
+        The databases download concurrently over the shared client and are
+        merged into one name → repository index, the first repository in
+        pacman.conf order winning as it does for pacman. Results are taken in
+        that order, so once every package is placed the remaining downloads
+        are cancelled.
+        """
+        repos = _repos(kwargs)
+        tasks = [asyncio.ensure_future(_repo_names(client, url, r, packages, kwargs, self.layout)) for r in repos]
+        index: Dict[str, str] = {}
+        errors: List[str] = []
         try:
-            resp = await client.get(db_url, follow_redirects=True)
-            if resp.status_code != 200:
-                return False, f"db http {resp.status_code}"
-            with tarfile.open(fileobj=io.BytesIO(resp.content)) as tf:
-                for member in tf.getmembers():
-                    if member.name.endswith("/desc"):
-                        f = tf.extractfile(member)
-                        if not f:
-                            continue
-                        content = f.read().decode("utf-8", errors="ignore")
-                        if f"%NAME%\n{package}\n" in content:
-                            return True, "found"
-            return False, "not found"
-        except httpx.RequestError as exc:
-            return False, str(exc)
-        except tarfile.TarError:
-            return False, "invalid db"
+            for repo, task in zip(repos, tasks):
+                try:
+                    names = await task
+                except IndexUnavailable as exc:
+                    errors.append(str(exc) if len(repos) == 1 else f"{repo}: {exc}")
+                    continue
+                for name in names:
+                    index.setdefault(name, repo)
+                if all(p in index for p in packages):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if len(errors) == len(repos):
+            return failed_statuses(packages, "; ".join(errors))
+        missing = f"not found ({'; '.join(errors)})" if errors else "not found"
+        return {p: (True, f"found in {index[p]}") if p in index else (False, missing) for p in packages}
+
+
+class ManjaroRegistry(PacmanRegistry):
+    name = "Manjaro"
+    layout = MANJARO_LAYOUT
@@ -1,48 +1,183 @@
 from __future__ import annotations
 
-import gzip
-import io
-from typing import Optional, Tuple
+import lzma
+import os
+import re
+import tempfile
+import zlib
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Set
 
 import httpx
 
-from .generic import OsRegistry
+from ...cache import open_index
+from ...profiling import Phase, file_label, span
+from ..base import PackageStatus
+from .generic import (
+    IndexUnavailable,
+    OsRegistry,
+    collect_names,
+    decoder_for,
+    failed_statuses,
+    found_statuses,
+    memoized,
+)
+
+_NAME_RE = re.compile(rb"<name>([^<]*)</name>")
+# Longest tail kept between chunks while looking for a split <name> element.
+_MAX_CARRY = 4096
+
+_REPO_NS = "{http://linux.duke.edu/metadata/repo}"
+
+
+class Primary(NamedTuple):
+    """One primary metadata file listed in ``repomd.xml``."""
+
+    href: str
+    sqlite: bool
+    size: int
+    digest: Optional[str]
+
+    @property
+    def suffix(self) -> str:
+        return os.path.splitext(self.href)[1]
+
+
+def _parse_repomd(data: bytes) -> List[Primary]:
+    """``primary`` / ``primary_db`` entries of ``repomd.xml``."""
+    from xml.etree import ElementTree
+
+    try:
+        root = ElementTree.fromstring(data)
+    except ElementTree.ParseError:
+        raise IndexUnavailable("invalid repomd.xml") from None
+    entries = []
+    for node in root.iter(f"{_REPO_NS}data"):
+        kind = node.get("type")
+        if kind not in ("primary", "primary_db"):
+            continue
+        location = node.find(f"{_REPO_NS}location")
+        if location is None or not location.get("href"):
+            continue
+        size = node.findtext(f"{_REPO_NS}size") or ""
+        checksum = node.find(f"{_REPO_NS}checksum")
+        # repomd.xml carries the checksum of the compressed file, which
+        # identifies the snapshot across mirrors without downloading it.
+        digest = None
+        if checksum is not None and checksum.text:
+            digest = f"yum:{checksum.get('type')}:{checksum.text.strip()}"
+        entries.append(Primary(
+            location.get("href"), kind == "primary_db", int(size) if size.isdigit() else 0, digest,
+        ))
+    return entries
+
+
+def _choose_primary(entries: List[Primary]) -> Primary:
+    """Cheapest primary we can decode: smallest download, XML on ties.
+
+    The XML variants are streamed and can stop at the last wanted package;
+    the SQLite database always has to be downloaded in full.
+    """
+    usable = [e for e in entries if decoder_for(e.suffix)]
+    if not usable:
+        if entries:
+            raise IndexUnavailable("no supported primary format (install mirava-tui[zstd] for .zst)")
+        raise IndexUnavailable("primary not found")
+    return min(usable, key=lambda e: (e.size or float("inf"), e.sqlite))
+
+
+async def _iter_names(chunks: AsyncIterator[bytes], decompress: Callable[[bytes], bytes], target: str) -> AsyncIterator[str]:
+    """Decompress ``chunks`` incrementally and yield ``<name>`` values.
+
+    Only a short tail is carried between chunks, so memory stays flat no
+    matter how large the decompressed XML gets.
+    """
+    inflate = Phase("decompress", target)
+    search = Phase("search", target)
+    carry = b""
+    async for chunk in chunks:
+        with inflate:
+            data = decompress(chunk)
+        if not data:
+            continue
+        with search:
+            buf = carry + data
+            names = _NAME_RE.findall(buf)
+            end = buf.rfind(b"</name>")
+            carry = buf[end + 7:] if end != -1 else buf
+            if len(carry) > _MAX_CARRY:
+                carry = carry[-_MAX_CARRY:]
+        for name in names:
+            yield name.decode("utf-8", errors="ignore")
+
+
+async def _sqlite_names(chunks: AsyncIterator[bytes], decompress: Callable[[bytes], bytes], wanted: List[str], target: str) -> Set[str]:
+    """Decompress ``primary_db`` to a temporary file and query it."""
+    import sqlite3
+
+    fd, path = tempfile.mkstemp(prefix="mirava-primary-", suffix=".sqlite")
+    try:
+        inflate = Phase("decompress", target)
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in chunks:
+                with inflate:
+                    f.write(decompress(chunk))
+        with span("search", target):
+            conn = sqlite3.connect(path)
+            try:
+                marks = ",".join("?" * len(wanted))
+                rows = conn.execute(f"SELECT DISTINCT name FROM packages WHERE name IN ({marks})", wanted)
+                return {name for (name,) in rows}
+            finally:
+                conn.close()
+    except sqlite3.DatabaseError:
+        raise IndexUnavailable("invalid primary_db") from None
+    finally:
+        os.unlink(path)
+
+
+async def _read_repomd(client: httpx.AsyncClient, base: str, cache) -> bytes:
+    async with open_index(client, f"{base}/repodata/repomd.xml", cache) as repomd:
+        if repomd.status_code != 200:
+            raise IndexUnavailable(f"repomd http {repomd.status_code}")
+        return await repomd.aread()
 
 
 class YumRegistry(OsRegistry):
     name = "YUM"
 
-    async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
-        package = package.strip()
-        if not package:
-            return None, "no package"
+    async def benchmark_url(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Optional[str]:
+        """The compressed primary metadata, the largest file every repo has."""
+        base = url.rstrip("/")
+        try:
+            primary = _choose_primary(_parse_repomd(await _read_repomd(client, base, kwargs.get("cache"))))
+        except (IndexUnavailable, httpx.RequestError):
+            return None
+        return f"{base}/{primary.href}"
+
+    async def check_packages(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Dict[str, PackageStatus]:
         base = url.rstrip("/")
-        repomd_url = f"{base}/repodata/repomd.xml"
+        cache = kwargs.get("cache")
         try:
-            repomd = await client.get(repomd_url, follow_redirects=True)
-            if repomd.status_code != 200:
-                return False, f"repomd http {repomd.status_code}"
-            # find primary.xml.gz location
-            text = repomd.text
-            marker = "<data type=\"primary\">"
-            idx = text.find(marker)
-            if idx == -1:
-                return False, "primary not found"
-            loc_marker = "<location href=\""
-            loc_idx = text.find(loc_marker, idx)
-            if loc_idx == -1:
-                return False, "primary location not found"
-            loc_idx += len(loc_marker)
-            end_idx = text.find("\"", loc_idx)
-            href = text[loc_idx:end_idx]
-            primary_url = f"{base}/{href}"
-            prim = await client.get(primary_url, follow_redirects=True)
-            if prim.status_code != 200:
-                return False, f"primary http {prim.status_code}"
-            data = gzip.GzipFile(fileobj=io.BytesIO(prim.content)).read().decode("utf-8", errors="ignore")
-            needle = f"<name>{package}</name>"
-            return (needle in data), ("found" if needle in data else "not found")
+            primary = _choose_primary(_parse_repomd(await _read_repomd(client, base, cache)))
+            primary_url = f"{base}/{primary.href}"
+            target = file_label(primary_url)
+
+            async def scan(wanted: List[str]) -> Set[str]:
+                decompress = decoder_for(primary.suffix)().decompress
+                # Leaving the ``async with`` block early closes the response
+                # and cancels the rest of the download.
+                async with open_index(client, primary_url, cache) as prim:
+                    if prim.status_code != 200:
+                        raise IndexUnavailable(f"primary http {prim.status_code}")
+                    if primary.sqlite:
+                        return await _sqlite_names(prim.aiter_bytes(), decompress, wanted, target)
+                    return await collect_names(_iter_names(prim.aiter_bytes(), decompress, target), wanted)
+
+            found = await memoized(kwargs.get("memo"), primary.digest, packages, scan)
+            return found_statuses(packages, found)
+        except IndexUnavailable as exc:
+            return failed_statuses(packages, str(exc))
         except httpx.RequestError as exc:
-            return False, str(exc)
-        except OSError:
-            return False, "invalid primary.xml.gz"
+            return failed_statuses(packages, str(exc))
+        except (OSError, EOFError, zlib.error, lzma.LZMAError):
+            return failed_statuses(packages, "invalid primary metadata")
@@ -1,103 +1,60 @@
-#!/usr/bin/env python3
 from __future__ import annotations
 
-import importlib.util
-import os
-import shutil
-import subprocess
-import sys
-from pathlib import Path
-
-
-def _has_module(name: str) -> bool:
-    return importlib.util.find_spec(name) is not None
-
-
-def _check_requirements() -> None:
-    if not _has_module("zstandard"):
-        print("Missing Python package 'zstandard' (onefile compression disabled).", file=sys.stderr)
-        print("Install with: uv add zstandard", file=sys.stderr)
-
-    if sys.platform.startswith("linux") and shutil.which("patchelf") is None:
-        print("Missing patchelf. Install with one of:", file=sys.stderr)
-        print("  uv add patchelf", file=sys.stderr)
-        print("  sudo apt-get install patchelf", file=sys.stderr)
-        raise SystemExit(1)
-
-
-def _select_compiler() -> str | None:
-    if os.environ.get("CC"):
-        return os.environ["CC"]
-
-    if sys.platform == "win32":
-        # On Windows we ask Nuitka to use MSVC explicitly.
-        # Exporting CC here can force gcc/clang and conflict with --msvc.
-        return None
-
-    for candidate in ("gcc", "clang"):
-        path = shutil.which(candidate)
-        if path:
-            return candidate
-
-    print("Missing C compiler (gcc/clang). Install build tools first.", file=sys.stderr)
-    raise SystemExit(1)
-
-
-def main() -> None:
-    _check_requirements()
-
-    env = os.environ.copy()
-    compiler = _select_compiler()
-    if compiler:
-        env["CC"] = compiler
-
-    ccache = shutil.which("ccache")
-    if ccache and compiler in {"gcc", "clang"}:
-        env["NUITKA_CCACHE_BINARY"] = ccache
-        print(f"Using compiler: {compiler} (ccache: {ccache})")
-    else:
-        if compiler:
-            print(f"Using compiler: {compiler}")
-        elif sys.platform == "win32":
-            print("Using compiler: msvc (enforced by --msvc=latest)")
-        else:
-            print("Using auto compiler detection")
-
-    project_root = Path(__file__).resolve().parents[1]
-    entry = project_root / "mirava" / "cli.py"
-    data_file = project_root / "mirava_full_json.json"
-
-    no_compress = os.environ.get("NUITKA_ONEFILE_NO_COMPRESSION", "").strip().lower() in {
-        "1",
-        "true",
-        "yes",
-        "on",
-    }
-
-    cmd = [
-        sys.executable,
-        "-m",
-        "nuitka",
-        "--onefile",
-        *(
-            ["--onefile-no-compression"]
-            if no_compress
-            else []
-        ),
-        "--static-libpython=no",
-        "--output-dir=dist",
-        "--follow-imports",
-        "--include-package=mirava",
-        "--include-package=httpx",
-        "--include-package=prompt_toolkit",
-        f"--include-data-file={data_file}=mirava_full_json.json",
-        "--msvc=latest" if sys.platform == "win32" else "",
-        str(entry),
-        *sys.argv[1:],
-    ]
-
-    subprocess.run(cmd, check=True, cwd=project_root, env=env)
-
-
-if __name__ == "__main__":
-    main()
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+
+from .base import BaseRegistry
+
+
+# Package whose newest wheel --benchmark times when no package was given.
+BENCH_PACKAGE = "pip"
+
+_HREF_RE = re.compile(r'href="([^"]+)"')
+
+
+def _simple_url(url: str, package: str) -> str:
+    base = url.rstrip("/")
+    # Simple API (PEP 503): mirrors are listed either with or without /simple.
+    if not base.endswith("/simple"):
+        base = f"{base}/simple"
+    name = re.sub(r"[-_.]+", "-", package).lower()
+    return f"{base}/{name}/"
+
+
+class PyPIRegistry(BaseRegistry):
+    name = "PyPI"
+
+    async def benchmark_url(self, client: httpx.AsyncClient, url: str, packages: List[str], **kwargs) -> Optional[str]:
+        """Last distribution file linked from the project's simple page."""
+        page = _simple_url(url, packages[0] if packages else BENCH_PACKAGE)
+        try:
+            resp = await client.get(page, follow_redirects=True)
+        except httpx.RequestError:
+            return None
+        if resp.status_code != 200:
+            return None
+        # Simple pages list files oldest first; prefer the newest wheel.
+        hrefs = _HREF_RE.findall(resp.text)
+        wheels = [h for h in hrefs if h.split("#", 1)[0].endswith(".whl")]
+        chosen = (wheels or hrefs or [None])[-1]
+        if chosen is None:
+            return None
+        return urljoin(str(resp.url), chosen.split("#", 1)[0])
+
+    async def check_package(self, client: httpx.AsyncClient, url: str, package: str, **kwargs) -> Tuple[Optional[bool], str]:
+        package = package.strip()
+        if not package:
+            return None, "no package"
+        check_url = _simple_url(url, package)
+        try:
+            resp = await client.get(check_url, follow_redirects=True)
+            if resp.status_code == 200:
+                return True, "found"
+            if resp.status_code == 404:
+                return False, "not found"
+            return False, f"http {resp.status_code}"
+        except httpx.RequestError as exc:
+            return False, str(exc)
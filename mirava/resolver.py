@@ -0,0 +1,171 @@
+"""In-process DNS cache for the HTTP client.
+
+httpcore resolves the host name on every new connection. A run opens many
+connections to the same few hosts (several URLs per mirror, probes plus
+index downloads, and in the wizard the same mirrors again on every check),
+so :class:`CachingBackend` wraps httpcore's network backend: names are
+resolved once per :data:`DNS_TTL`, concurrent lookups of one name share a
+single ``getaddrinfo`` call, and the connection is opened to the address.
+TLS still verifies the host name, which httpcore passes separately.
+
+httpx has no public way to give its transport a network backend, so
+:class:`CachingTransport` drives an ``httpcore.AsyncConnectionPool`` built
+with one (its ``network_backend`` argument) and maps httpcore's exceptions
+to httpx's, as ``httpx.AsyncHTTPTransport`` does.
+"""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import socket
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+from .metrics import DNS_CACHE
+
+# getaddrinfo does not report record TTLs; mirrors rarely move faster than this.
+DNS_TTL = 300.0
+
+
+def _is_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class CachingBackend(httpcore.AsyncNetworkBackend):
+    def __init__(self, inner: httpcore.AsyncNetworkBackend, ttl: float = DNS_TTL) -> None:
+        self._inner = inner
+        self.ttl = ttl
+        # (host, port) -> (expiry on the monotonic clock, addresses).
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._pending: Dict[Tuple[str, int], "asyncio.Future[List[str]]"] = {}
+
+    async def _lookup(self, host: str, port: int) -> List[str]:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+        addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        key = (host, port)
+        hit = self._cache.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            DNS_CACHE.labels("hit").inc()
+            return hit[1]
+        pending = self._pending.get(key)
+        if pending is None:
+            DNS_CACHE.labels("miss").inc()
+            pending = self._pending[key] = asyncio.ensure_future(self._lookup(host, port))
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            # Joins a lookup already in flight.
+            DNS_CACHE.labels("hit").inc()
+        # A cancelled check must not cancel a lookup other checks wait for.
+        return await asyncio.shield(pending)
+
+    async def connect_tcp(
+        self, host: str, port: int, timeout: Optional[float] = None,
+        local_address: Optional[str] = None, socket_options: Optional[Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        if _is_address(host):
+            return await self._inner.connect_tcp(host, port, timeout, local_address, socket_options)
+        error: Optional[Exception] = None
+        for address in await self.resolve(host, port):
+            try:
+                return await self._inner.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                error = exc
+        # Every address failed: look the name up again next time.
+        self._cache.pop((host, port), None)
+        raise error or httpcore.ConnectError(f"no addresses for {host}")
+
+    async def connect_unix_socket(
+        self, path: str, timeout: Optional[float] = None, socket_options: Optional[Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._inner.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._inner.sleep(seconds)
+
+
+def _httpx_error(exc: Exception) -> Optional[httpx.TransportError]:
+    """The httpx exception matching an httpcore one; both libraries use the same names."""
+    for cls in type(exc).__mro__:
+        mapped = getattr(httpx, cls.__name__, None)
+        if isinstance(mapped, type) and issubclass(mapped, httpx.TransportError):
+            return mapped(str(exc))
+    return None
+
+
+@contextmanager
+def _mapped_errors() -> Iterator[None]:
+    try:
+        yield
+    except Exception as exc:
+        mapped = _httpx_error(exc)
+        if mapped is None:
+            raise
+        raise mapped from exc
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream) -> None:
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _mapped_errors():
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """Connection pool whose connections are opened through :class:`CachingBackend`."""
+
+    def __init__(self, limits: httpx.Limits, http2: bool = False, ttl: float = DNS_TTL) -> None:
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            network_backend=CachingBackend(httpcore.AnyIOBackend(), ttl),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        req = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _mapped_errors():
+            resp = await self._pool.handle_async_request(req)
+        return httpx.Response(
+            status_code=resp.status,
+            headers=resp.headers,
+            stream=_ResponseStream(resp.stream),
+            extensions=resp.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
@@ -0,0 +1,96 @@
+"""Event loop and HTTP client that outlive a single check.
+
+``asyncio.run`` per check gives every wizard run a new event loop and a new
+client, so "Run another check" opens fresh connections to the mirrors it has
+just talked to: DNS, TCP and TLS all over again, and latency that says more
+about handshakes than about the mirror. :class:`Runtime` keeps one loop
+running on a background thread for the whole session, with one pooled
+client (keep-alive, HTTP/2 where available, cached DNS) that every run
+reuses.
+
+The loop and client are created on first use, so opening the wizard does
+not pay for them.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Coroutine, List, Optional, TypeVar
+
+if TYPE_CHECKING:
+    import concurrent.futures
+
+    import httpx
+
+    from .models import CheckResult
+    from .scheduler import ConcurrencyConfig
+
+T = TypeVar("T")
+
+
+class Runtime:
+    def __init__(self, config: ConcurrencyConfig) -> None:
+        self.config = config
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="mirava-runtime", daemon=True)
+            self._thread.start()
+        return self._loop
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Schedule ``coro`` on the runtime's loop."""
+        return asyncio.run_coroutine_threadsafe(coro, self._start())
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run ``coro`` on the runtime's loop and wait for it; Ctrl-C cancels it."""
+        future = self.submit(coro)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def wrap(self, coro: Coroutine[Any, Any, T]) -> Awaitable[T]:
+        """``coro`` run on the runtime's loop, awaitable from another loop.
+
+        Cancelling the returned awaitable cancels ``coro``.
+        """
+        return asyncio.wrap_future(self.submit(coro))
+
+    async def client(self) -> httpx.AsyncClient:
+        """The session's client; only to be awaited on the runtime's loop."""
+        if self._client is None:
+            from .checks import open_client
+
+            self._client = open_client(self.config)
+        return self._client
+
+    async def run_checks(self, *args: Any, **kwargs: Any) -> List[CheckResult]:
+        """:func:`mirava.checks.run_checks` with the session's client."""
+        from .checks import run_checks
+
+        return await run_checks(*args, client=await self.client(), **kwargs)
+
+    def close(self) -> None:
+        """Close the client and stop the loop; the runtime can be started again."""
+        loop, thread = self._loop, self._thread
+        if loop is None or thread is None:
+            return
+
+        async def shutdown() -> None:
+            if self._client is not None:
+                await self._client.aclose()
+                self._client = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout=5)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+            self._loop = self._thread = None
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import statistics
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+from . import defaults
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+@dataclass
+class ConcurrencyConfig:
+    initial: int = defaults.CONCURRENCY
+    minimum: int = defaults.MIN_CONCURRENCY
+    maximum: int = defaults.MAX_CONCURRENCY
+    per_host: int = defaults.PER_HOST
+    # A failed check that took at least this long counts as a timeout.
+    slow_failure_s: float = 4.0
+
+    @classmethod
+    def from_args(cls, args) -> "ConcurrencyConfig":
+        return cls(
+            initial=args.concurrency,
+            minimum=args.min_concurrency,
+            maximum=args.max_concurrency,
+            per_host=args.per_host,
+        )
+
+
+class Slot:
+    def __init__(self) -> None:
+        self.failed = False
+
+    def fail(self) -> None:
+        self.failed = True
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for endpoint checks, with a per-host cap.
+
+    The limit grows by one after each window of completions whose timeout
+    rate and median latency stay flat, and halves when timeouts spike or
+    latency doubles against the best window seen so far. Every host is also
+    capped at ``per_host`` in-flight checks so a mirror with many URLs cannot
+    hog the slots.
+    """
+
+    def __init__(self, config: Optional[ConcurrencyConfig] = None) -> None:
+        self.config = config or ConcurrencyConfig()
+        cfg = self.config
+        self.limit = float(max(cfg.minimum, min(cfg.initial, cfg.maximum)))
+        self.peak = 0
+        self._in_flight = 0
+        self._per_host: Dict[str, int] = {}
+        self._cond: Optional[asyncio.Condition] = None
+        self._window: List[float] = []
+        self._window_timeouts = 0
+        self._baseline: Optional[float] = None
+        self._started: Optional[float] = None
+        self._last_change = 0.0
+        self._area = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def average(self) -> float:
+        """Time-weighted mean number of checks in flight so far."""
+        if self._started is None:
+            return 0.0
+        # Idle time after the last check finished does not count.
+        now = time.perf_counter() if self._in_flight else self._last_change
+        elapsed = now - self._started
+        area = self._area + self._in_flight * (now - self._last_change)
+        return area / elapsed if elapsed > 0 else float(self._in_flight)
+
+    def _account(self) -> None:
+        now = time.perf_counter()
+        if self._started is None:
+            self._started = now
+        else:
+            self._area += self._in_flight * (now - self._last_change)
+        self._last_change = now
+
+    def _has_room(self, host: str) -> bool:
+        return (
+            self._in_flight < int(self.limit)
+            and self._per_host.get(host, 0) < self.config.per_host
+        )
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[Slot]:
+        if self._cond is None:
+            # Imported here: the CLI reads ConcurrencyConfig at startup and
+            # must not pay for asyncio before a check runs.
+            import asyncio
+
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._has_room(host))
+            self._account()
+            self._in_flight += 1
+            self._per_host[host] = self._per_host.get(host, 0) + 1
+            self.peak = max(self.peak, self._in_flight)
+
+        slot = Slot()
+        start = time.perf_counter()
+        completed = False
+        try:
+            yield slot
+            completed = True
+        finally:
+            elapsed = time.perf_counter() - start
+            async with self._cond:
+                self._account()
+                self._in_flight -= 1
+                self._per_host[host] -= 1
+                # A check cancelled midway (race mode, Ctrl-C) says nothing
+                # about how loaded the network is.
+                if completed:
+                    self._record(elapsed, slot.failed and elapsed >= self.config.slow_failure_s)
+                self._cond.notify_all()
+
+    def _record(self, elapsed: float, timed_out: bool) -> None:
+        self._window.append(elapsed)
+        self._window_timeouts += timed_out
+        if len(self._window) < max(4, int(self.limit)):
+            return
+        cfg = self.config
+        median = statistics.median(self._window)
+        timeout_rate = self._window_timeouts / len(self._window)
+        self._window = []
+        self._window_timeouts = 0
+        if self._baseline is None or median < self._baseline:
+            self._baseline = median
+        if timeout_rate > 0.2 or median > 2 * self._baseline:
+            self.limit = max(float(cfg.minimum), self.limit / 2)
+        else:
+            self.limit = min(float(cfg.maximum), self.limit + 1)
@@ -0,0 +1,354 @@
+"""``mirava serve``: a small HTTP API answering "which mirror is best?".
+
+One host runs the checks and build hosts ask it instead of probing every
+mirror themselves::
+
+    GET /best?registry=PyPI&package=requests
+    GET /best?os=Ubuntu&suite=jammy&package=curl
+    GET /ranking?registry=npm
+    GET /metrics
+
+Rankings are cached per query (target, packages and OS options) for
+``--ttl`` seconds with the response body pre-encoded, so cache hits are a
+dict lookup. Queries are client-controlled, so the cache keeps at most
+:data:`MAX_ENTRIES` rankings (least recently used go first) and a query names
+at most :data:`MAX_PACKAGES` packages. Concurrent requests for a query that is being checked wait for
+the same probe wave instead of starting their own.
+
+The server is plain :func:`asyncio.start_server` with a minimal HTTP/1.1
+reader; as with :mod:`mirava.headless`, nothing heavy is imported until
+:func:`run_serve`.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+from .headless import OS_OPTIONS
+
+if TYPE_CHECKING:
+    import asyncio
+
+    import httpx
+
+    from .checks import RunOptions
+    from .models import CheckResult, MirrorCatalog
+    from .scheduler import AdaptiveLimiter
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8750
+DEFAULT_TTL_S = 300.0
+# Rankings kept at once, and packages one query may ask about.
+MAX_ENTRIES = 256
+MAX_PACKAGES = 32
+
+# Largest request head accepted; queries are tiny.
+_MAX_HEAD = 16 * 1024
+
+Query = Tuple[str, Tuple[str, ...], Tuple[Tuple[str, str], ...]]
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument(
+        "--ttl", type=float, default=DEFAULT_TTL_S, metavar="SECONDS",
+        help=f"how long a ranking is served before mirrors are checked again (default: {DEFAULT_TTL_S:.0f})",
+    )
+
+
+class Ranking(NamedTuple):
+    expires: float
+    checked_at: float
+    results: List[CheckResult]
+    # Pre-encoded JSON bodies for /best and /ranking.
+    best_body: bytes
+    ranking_body: bytes
+
+
+def _best(results: List[CheckResult]) -> Optional[CheckResult]:
+    """First reachable result that has every requested package."""
+    for r in results:
+        if r.reachable and r.package_ok is not False:
+            return r
+    return None
+
+
+class RankingCache:
+    """TTL cache of sorted check results with request coalescing.
+
+    Expired rankings are dropped as they are found, and past ``max_entries``
+    the least recently used ones are evicted.
+    """
+
+    def __init__(
+        self, catalog: MirrorCatalog, options: RunOptions, limiter: AdaptiveLimiter, ttl: float,
+        max_entries: int = MAX_ENTRIES,
+    ) -> None:
+        self.catalog = catalog
+        self.options = options
+        self.limiter = limiter
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Shared by every wave so repeat queries reuse warm connections.
+        self.client: Optional[httpx.AsyncClient] = None
+        # Least recently used first.
+        self._entries: OrderedDict[Query, Ranking] = OrderedDict()
+        self._waves: Dict[Query, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        # Requests that joined a wave already in flight.
+        self.coalesced = 0
+
+    async def get(self, query: Query) -> Ranking:
+        import asyncio
+
+        entry = self._entries.get(query)
+        if entry is not None:
+            if entry.expires > time.monotonic():
+                self.hits += 1
+                self._entries.move_to_end(query)
+                return entry
+            del self._entries[query]
+        wave = self._waves.get(query)
+        if wave is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            wave = asyncio.ensure_future(self._check(query))
+            self._waves[query] = wave
+            wave.add_done_callback(lambda _: self._waves.pop(query, None))
+        # shield: one client hanging up must not cancel the wave for the rest.
+        return await asyncio.shield(wave)
+
+    async def _check(self, query: Query) -> Ranking:
+        import json
+
+        from .checks import run_checks, sort_results
+        from .headless import result_row
+
+        target, packages, os_items = query
+        results = sort_results(await run_checks(
+            self.catalog.endpoints(target), list(packages), dict(os_items), self.options,
+            limiter=self.limiter, client=self.client,
+        ))
+        checked_at = time.time()
+        best = _best(results)
+        head = {"target": target, "packages": list(packages), "checked_at": checked_at}
+        entry = Ranking(
+            expires=time.monotonic() + self.ttl,
+            checked_at=checked_at,
+            results=results,
+            best_body=json.dumps(
+                dict(head, best=result_row(best) if best else None), ensure_ascii=False,
+            ).encode(),
+            ranking_body=json.dumps(
+                dict(head, results=[result_row(r) for r in results]), ensure_ascii=False,
+            ).encode(),
+        )
+        self._store(query, entry)
+        return entry
+
+    def _store(self, query: Query, entry: Ranking) -> None:
+        now = time.monotonic()
+        for stale in [q for q, e in self._entries.items() if e.expires <= now]:
+            del self._entries[stale]
+        self._entries[query] = entry
+        self._entries.move_to_end(query)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def parse_query(params: Dict[str, List[str]], os_defaults: Dict[str, str]) -> Query:
+    """Normalize query-string parameters into a cache key.
+
+    Raises ``ValueError`` with a message for the client on bad input.
+    """
+    from .utils import split_packages
+
+    targets = params.get("registry", []) + params.get("os", [])
+    if len(targets) != 1:
+        raise ValueError("exactly one of 'registry' or 'os' is required")
+    packages = sorted({p for raw in params.get("package", []) for p in split_packages(raw)})
+    if len(packages) > MAX_PACKAGES:
+        raise ValueError(f"at most {MAX_PACKAGES} packages per query")
+    os_kwargs = dict(os_defaults)
+    if "os" in params:
+        for opt in OS_OPTIONS:
+            if params.get(opt):
+                os_kwargs[opt] = params[opt][-1]
+    return targets[0], tuple(packages), tuple(sorted(os_kwargs.items()))
+
+
+class Request(NamedTuple):
+    method: str
+    target: str
+    keep_alive: bool
+    # Lower-cased header names and values.
+    headers: Dict[str, str]
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read one request head; None when the client is gone or sent garbage."""
+    import asyncio
+
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        return None
+    lines = head.decode("latin-1").split("\r\n")
+    request = lines[0].split()
+    if len(request) != 3:
+        return None
+    method, target, version = request
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip().lower()
+    connection = headers.get("connection", "")
+    keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+    return Request(method, target, keep_alive, headers)
+
+
+def _response(
+    status: int, reason: str, body: bytes, keep_alive: bool, content_type: str = "application/json",
+) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+def _error(message: str) -> bytes:
+    import json
+
+    return json.dumps({"error": message}).encode()
+
+
+def _metrics(request: Request) -> Tuple[int, str, bytes, str]:
+    from .metrics import METRICS, OPENMETRICS_TYPE, PROMETHEUS_TYPE, wants_openmetrics
+
+    openmetrics = wants_openmetrics(request.headers.get("accept", ""))
+    body = METRICS.render(openmetrics).encode()
+    return 200, "OK", body, OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE
+
+
+async def _serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, route) -> None:
+    """Answer requests on one connection with ``route(request)`` until it closes."""
+    try:
+        while True:
+            request = await _read_request(reader)
+            if request is None:
+                return
+            try:
+                status, reason, body, content_type = await route(request)
+            except Exception as exc:
+                # A failed check wave must not drop the connection without an answer.
+                status, reason, content_type = 500, "Internal Server Error", "application/json"
+                body = _error(f"{type(exc).__name__}: {exc}")
+            response = _response(status, reason, body, request.keep_alive, content_type)
+            if request.method == "HEAD":
+                response = response[: len(response) - len(body)]
+            writer.write(response)
+            await writer.drain()
+            if not request.keep_alive:
+                return
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str, port: int):
+    """Serve only ``/metrics``; used by ``mirava watch --metrics-port``."""
+    import asyncio
+
+    async def route(request: Request) -> Tuple[int, str, bytes, str]:
+        if request.target.split("?", 1)[0] != "/metrics":
+            return 404, "Not Found", _error("try /metrics"), "application/json"
+        return _metrics(request)
+
+    return await asyncio.start_server(
+        lambda r, w: _serve_connection(r, w, route), host, port, limit=_MAX_HEAD,
+    )
+
+
+class Server:
+    def __init__(self, cache: RankingCache, os_defaults: Dict[str, str]) -> None:
+        self.cache = cache
+        self.os_defaults = os_defaults
+
+    async def route(self, request: Request) -> Tuple[int, str, bytes, str]:
+        from urllib.parse import parse_qs, urlsplit
+
+        json_type = "application/json"
+        if request.method not in ("GET", "HEAD"):
+            return 405, "Method Not Allowed", _error("only GET is supported"), json_type
+        parts = urlsplit(request.target)
+        if parts.path == "/metrics":
+            return _metrics(request)
+        if parts.path not in ("/best", "/ranking"):
+            return 404, "Not Found", _error("try /best, /ranking or /metrics"), json_type
+        try:
+            query = parse_query(parse_qs(parts.query), self.os_defaults)
+        except ValueError as exc:
+            return 400, "Bad Request", _error(str(exc)), json_type
+        if not self.cache.catalog.endpoints(query[0]):
+            return 404, "Not Found", _error(f"no mirrors for {query[0]!r}"), json_type
+        ranking = await self.cache.get(query)
+        body = ranking.best_body if parts.path == "/best" else ranking.ranking_body
+        return 200, "OK", body, json_type
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await _serve_connection(reader, writer, self.route)
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .cache import IndexCache
+    from .checks import RunOptions
+    from .deadlines import Deadlines
+    from .mirrors import load_mirrors
+    from .scheduler import AdaptiveLimiter, ConcurrencyConfig
+
+    catalog = load_mirrors(args.mirrors)
+    options = RunOptions(
+        cache=None if args.no_cache else IndexCache(max_bytes=args.cache_max_mb * 1024 * 1024),
+        concurrency=ConcurrencyConfig.from_args(args),
+        probe=args.probe,
+        samples=max(1, args.samples),
+        metrics_file=args.metrics_file,
+        race=args.race,
+        deadlines=Deadlines.from_args(args),
+        hedge=args.hedge,
+    )
+    # One limiter for all waves so concurrent queries share the budget.
+    cache = RankingCache(catalog, options, AdaptiveLimiter(options.concurrency), args.ttl)
+    # Query parameters override each registry's own OS defaults.
+    server = Server(cache, {})
+
+    async def main() -> None:
+        from .checks import open_client
+        from .metrics import watch_loop_lag
+
+        srv = await asyncio.start_server(server.handle, args.host, args.port, limit=_MAX_HEAD)
+        print(f"mirava: serving on http://{args.host}:{args.port}/best", file=sys.stderr)
+        lag = asyncio.create_task(watch_loop_lag())
+        try:
+            async with srv, open_client(options.concurrency) as client:
+                cache.client = client
+                await srv.serve_forever()
+        finally:
+            lag.cancel()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,836 @@
+import argparse
+import asyncio
+import bisect
+import shutil
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from prompt_toolkit import HTML, PromptSession, print_formatted_text
+from prompt_toolkit.application import Application
+from prompt_toolkit.formatted_text import FormattedText
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout.containers import HSplit, Window
+from prompt_toolkit.layout.controls import FormattedTextControl
+from prompt_toolkit.layout.layout import Layout
+
+from .benchmark import BenchmarkConfig
+from .cache import IndexCache
+from .deadlines import Deadlines
+from .mirrors import load_mirrors
+from .models import CheckResult, MirrorCatalog, PackageEndpoint
+from .registry.factory import OS_NAMES, registry_names
+from .runtime import Runtime
+from .scheduler import AdaptiveLimiter, ConcurrencyConfig
+from .utils import detect_os, os_defaults, split_packages
+
+if TYPE_CHECKING:
+    from .checks import RunOptions
+
+BACK = "__back__"
+QUIT = "__quit__"
+
+# ── Colour palette ──────────────────────────────────────────────────────
+C_ACCENT = "#00bcd4"
+C_OK = "#00e676"
+C_FAIL = "#ff5252"
+C_WARN = "#ffc107"
+C_DIM = "#6c757d"
+C_MUTED = "#495057"
+C_HI_BG = "#1a237e"
+C_HI_FG = "#e8eaf6"
+BOX_W = 54  # inner width of menu box
+
+
+# ── Helpers ─────────────────────────────────────────────────────────────
+
+def _tw() -> int:
+    return shutil.get_terminal_size((80, 24)).columns
+
+
+def _hr(char: str = "─", color: str = C_DIM) -> None:
+    print_formatted_text(HTML(f"<style fg='{color}'>{char * min(_tw(), 90)}</style>"))
+
+
+def _title(text: str) -> None:
+    print_formatted_text(HTML(f"<style fg='{C_ACCENT}'><b>  {text}</b></style>"))
+
+
+def _subtle(text: str) -> None:
+    print_formatted_text(HTML(f"<style fg='{C_DIM}'>  {text}</style>"))
+
+
+def _success(text: str) -> None:
+    print_formatted_text(HTML(f"<style fg='{C_OK}'>  ✔  {text}</style>"))
+
+
+def _error(text: str) -> None:
+    print_formatted_text(HTML(f"<style fg='{C_FAIL}'>  ✖  {text}</style>"))
+
+
+def _banner() -> None:
+    logo = [
+        "╔╦╗╦╦═╗╔═╗╦  ╦╔═╗",
+        "║║║║╠╦╝╠═╣╚╗╔╝╠═╣",
+        "╩ ╩╩╩╚═╩ ╩ ╚╝ ╩ ╩",
+    ]
+    w = min(_tw(), 90)
+    print()
+    _hr("━", C_ACCENT)
+    for line in logo:
+        pad = max(0, (w - len(line)) // 2)
+        print_formatted_text(HTML(
+            f"<style fg='{C_ACCENT}'><b>{' ' * pad}{line}</b></style>"
+        ))
+    sub = "Mirror Health Wizard ✦"
+    pad_s = max(0, (w - len(sub)) // 2)
+    print_formatted_text(HTML(
+        f"<style fg='{C_DIM}'>{' ' * pad_s}{sub}</style>"
+    ))
+    _hr("━", C_ACCENT)
+    print()
+
+
+# ── Interactive menu ────────────────────────────────────────────────────
+
+_ICONS: Dict[str, str] = {
+    "OS mirrors": "🖥 ", "Registry mirrors": "📦", "Exit": "🚪",
+    "Run another OS check": "🔄", "Run another registry check": "🔄",
+    "Back to main menu": "↩ ", "Write package-manager config": "🛠 ",
+    "Apply": "✍ ", "Export to a directory": "📁", "Skip": "⏭ ",
+}
+
+# Example package names shown in the prompt for each registry type
+REGISTRY_EXAMPLES: Dict[str, str] = {
+    "PyPI": "e.g. requests, flask, numpy",
+    "npm": "e.g. express, lodash, react",
+    "Docker Registry": "e.g. nginx, ubuntu, python",
+    "Yarn": "e.g. webpack, typescript, vue",
+    "Composer": "e.g. laravel/framework, monolog/monolog",
+    "Maven": "e.g. com.google.guava:guava, org.apache.commons:commons-lang3",
+    "Gradle": "e.g. org.springframework.boot:spring-boot-starter",
+    "NuGet": "e.g. Newtonsoft.Json, Serilog, Dapper",
+    "NodeJS": "e.g. node, v20.11.0",
+}
+
+
+def _menu(
+    session: PromptSession,
+    title: str,
+    description: str,
+    options: List[str],
+    default: Optional[str] = None,
+    allow_back: bool = False,
+) -> str:
+    sel = 0
+    if default and default in options:
+        sel = options.index(default)
+
+    result: Optional[str] = None
+    W = BOX_W
+
+    def _render() -> FormattedText:
+        p: list[tuple[str, str]] = []
+        p.append(("", "\n"))
+        # top border
+        p.append((f"bold {C_ACCENT}", f"  ╭─ {title} "))
+        p.append((C_DIM, "─" * max(0, W - len(title) - 4) + "╮"))
+        p.append(("", "\n"))
+        # description
+        desc_pad = max(0, W - len(description) - 1)
+        p.append((C_DIM, f"  │ {description}" + " " * desc_pad + "│"))
+        p.append(("", "\n"))
+        # separator
+        p.append((C_DIM, "  ├" + "─" * (W + 1) + "┤"))
+        p.append(("", "\n"))
+
+        for i, opt in enumerate(options):
+            icon = _ICONS.get(opt, "•")
+            label = f"{icon} {opt}"
+            fill = max(0, W - len(label) - 4)
+            if i == sel:
+                p.append((f"bold {C_HI_FG} bg:{C_HI_BG}", f"  │ ▸ {label}" + " " * fill + "│"))
+            else:
+                p.append((C_MUTED, f"  │   {label}" + " " * fill + "│"))
+            p.append(("", "\n"))
+
+        # bottom border
+        p.append((C_DIM, "  ╰" + "─" * (W + 1) + "╯"))
+        p.append(("", "\n"))
+
+        # key hints
+        keys = ["↑↓ navigate", "⏎  select", "q quit"]
+        if allow_back:
+            keys.insert(2, "b back")
+        p.append((C_DIM, "  " + "  │  ".join(keys)))
+        p.append(("", "\n"))
+        return FormattedText(p)
+
+    ctrl = FormattedTextControl(_render)
+    layout = Layout(HSplit([Window(content=ctrl, always_hide_cursor=True)]))
+
+    kb = KeyBindings()
+
+    @kb.add("up")
+    @kb.add("k")
+    def _up(e):
+        nonlocal sel
+        sel = (sel - 1) % len(options)
+
+    @kb.add("down")
+    @kb.add("j")
+    def _down(e):
+        nonlocal sel
+        sel = (sel + 1) % len(options)
+
+    @kb.add("enter")
+    def _enter(e):
+        nonlocal result
+        result = options[sel]
+        e.app.exit()
+
+    @kb.add("q")
+    def _q(e):
+        nonlocal result
+        result = QUIT
+        e.app.exit()
+
+    if allow_back:
+        @kb.add("b")
+        @kb.add("escape")
+        def _b(e):
+            nonlocal result
+            result = BACK
+            e.app.exit()
+
+    Application(layout=layout, key_bindings=kb, full_screen=False, erase_when_done=True).run()
+    return result or QUIT
+
+
+# ── Text input ──────────────────────────────────────────────────────────
+
+def _text_input(
+    session: PromptSession,
+    label: str,
+    default: Optional[str] = None,
+    allow_blank: bool = True,
+    allow_back: bool = True,
+) -> str:
+    default_hint = f" <style fg='{C_DIM}'>[{default}]</style>" if default else ""
+    hints = [f"<style fg='{C_DIM}'>⏎ default</style>"]
+    if allow_back:
+        hints.append(f"<style fg='{C_DIM}'>b back</style>")
+    hints.append(f"<style fg='{C_DIM}'>q quit</style>")
+    print_formatted_text(HTML("  " + "  ".join(hints)))
+
+    while True:
+        raw = session.prompt(
+            HTML(f"<style fg='{C_ACCENT}'><b>  ❯ </b></style>{label}{default_hint}<b>: </b>")
+        ).strip()
+        low = raw.lower()
+        if low in {"q", "quit", "exit"}:
+            return QUIT
+        if allow_back and low in {"b", "back"}:
+            return BACK
+        if raw == "":
+            if default is not None:
+                return default
+            if allow_blank:
+                return ""
+            _error(f"{label} is required.")
+            continue
+        return raw
+
+
+# ── Result helpers ──────────────────────────────────────────────────────
+
+def _package_word(r: CheckResult) -> str:
+    if len(r.packages) > 1 and any(ok is not None for ok in r.packages.values()):
+        found = sum(1 for ok in r.packages.values() if ok)
+        return f"{found}/{len(r.packages)}"
+    if r.package_ok is True:
+        return "FOUND"
+    if r.package_ok is False:
+        return "NOT FOUND"
+    return "SKIPPED"
+
+
+def _shorten(value: str, width: int) -> str:
+    if len(value) <= width:
+        return value
+    return value[: max(0, width - 3)] + "…"
+
+
+def _build_table(rows: List[List[str]], headers: List[str]) -> str:
+    widths = [len(h) for h in headers]
+    for row in rows:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], len(cell))
+
+    def line(l: str, m: str, r: str, f: str = "─") -> str:
+        return l + m.join(f * (w + 2) for w in widths) + r
+
+    def fmt(row: List[str]) -> str:
+        return "│" + "│".join(f" {c.ljust(widths[i])} " for i, c in enumerate(row)) + "│"
+
+    return "\n".join(
+        [line("┌", "┬", "┐"), fmt(headers), line("├", "┼", "┤")]
+        + [fmt(r) for r in rows]
+        + [line("└", "┴", "┘")]
+    )
+
+
+# ── OS kwargs collection ────────────────────────────────────────────────
+
+def _collect_os_kwargs(
+    session: PromptSession, os_choice: str, base_kwargs: Dict[str, str],
+) -> Tuple[str, Dict[str, str]]:
+    kw = dict(base_kwargs)
+
+    if os_choice in {"Debian", "Ubuntu", "Kali", "Mint", "Raspbian"}:
+        for key, label, fallback in [
+            ("suite", "Suite/Codename", ""),
+            ("component", "Component", "main"),
+            ("arch", "Architecture", "amd64"),
+        ]:
+            v = _text_input(session, label, kw.get(key, fallback), allow_blank=False)
+            if v in {BACK, QUIT}:
+                return v, kw
+            kw[key] = v
+
+    elif os_choice in {"Arch Linux", "Manjaro", "Archlinux"}:
+        for key, label, fallback in [
+            ("repo", "Repository (core, extra, ... or all)", "all"),
+            ("arch", "Architecture", "x86_64"),
+        ]:
+            v = _text_input(session, label, kw.get(key, fallback), allow_blank=False)
+            if v in {BACK, QUIT}:
+                return v, kw
+            kw[key] = v
+
+    elif os_choice in {"Alpine"}:
+        for key, label, fallback in [
+            ("branch", "Branch", "v3.18"),
+            ("repo", "Repository", "main"),
+            ("arch", "Architecture", "x86_64"),
+        ]:
+            v = _text_input(session, label, kw.get(key, fallback), allow_blank=False)
+            if v in {BACK, QUIT}:
+                return v, kw
+            kw[key] = v
+
+    return "ok", kw
+
+
+# ── Results display ─────────────────────────────────────────────────────
+
+def _package_matrix(packages: List[str], results: List[CheckResult]) -> str:
+    """Packages × ranked endpoints; column ``#n`` is row ``n`` of the results table."""
+    ranked = [(i, r) for i, r in enumerate(results, 1) if r.reachable]
+    max_cols = max(1, (_tw() - 24) // 7)
+    ranked = ranked[:max_cols]
+    marks = {True: "✔", False: "✖", None: "—"}
+    rows = [
+        [_shorten(p, 20)] + [marks[r.packages.get(p)] for _, r in ranked]
+        + [f"{sum(1 for _, r in ranked if r.packages.get(p))}/{len(ranked)}"]
+        for p in packages
+    ]
+    return _build_table(rows, headers=["Package"] + [f"#{i}" for i, _ in ranked] + ["Found"])
+
+
+def _reach_word(r: CheckResult) -> str:
+    if not r.reachable:
+        return "✖ FAIL"
+    if r.latency and r.latency.loss_rate:
+        return f"✔ {r.latency.loss_rate:.0%} loss"
+    return "✔ OK"
+
+
+def _spread_cells(r: CheckResult) -> List[str]:
+    """``Spread`` (min–p90 of steady round trips) and ``Handshake`` cells."""
+    s = r.latency
+    if s is None or s.min_ms is None:
+        return ["—", "—"]
+    handshake = f"{s.handshake_ms:.0f}ms" if s.handshake_ms is not None else "reused"
+    return [f"{s.min_ms:.0f}–{s.p90_ms:.0f}ms", handshake]
+
+
+def _bench_cells(r: CheckResult) -> List[str]:
+    """``MB/s`` and ``File TTFB`` cells; TTFB is the median with its jitter."""
+    t = r.throughput
+    if t is None or t.mbps is None:
+        return ["—", _shorten(t.detail, 20) if t else "—"]
+    ttfb = f"{t.ttfb_ms:.0f}ms" if t.ttfb_ms is not None else "—"
+    if t.jitter_ms is not None:
+        ttfb += f" ±{t.jitter_ms:.0f}"
+    return [f"{t.mbps:.1f}", ttfb]
+
+
+class _LiveResults:
+    """Ranked results drawn in place while checks run.
+
+    Results are inserted into a sorted list as they arrive, so the best
+    mirror so far is always the first row; the view redraws at most ``fps``
+    times a second however fast results come in. Fragments are built
+    directly, without parsing markup on every frame.
+    """
+
+    def __init__(self, key: Callable[[CheckResult], Tuple[Any, ...]], benchmark: bool, fps: float = 10.0) -> None:
+        self._key = key
+        self._ranked: List[Tuple[Tuple[Any, ...], int, CheckResult]] = []
+        self.benchmark = benchmark
+        self.fps = fps
+        self.done = 0
+        self.total = 0
+        self.ok = 0
+        self.started = time.monotonic()
+        self.app: Optional[Application] = None
+
+    def add(self, r: CheckResult, done: int, total: int, dt: float) -> None:
+        # ``done`` breaks ties so results themselves are never compared.
+        bisect.insort(self._ranked, (self._key(r), done, r))
+        self.done, self.total = done, total
+        self.ok += r.reachable
+        if self.app is not None:
+            self.app.invalidate()
+
+    def _render(self) -> FormattedText:
+        width = 28
+        ratio = self.done / self.total if self.total else 0.0
+        filled = int(width * ratio)
+        p: List[Tuple[str, str]] = [
+            ("", "  "),
+            (C_ACCENT, "█" * filled + "░" * (width - filled)),
+            (C_DIM, f" {int(ratio * 100):>3}%  {self.done}/{self.total or '?'}  "),
+            (C_OK, f"✔ {self.ok}  "),
+            (C_FAIL, f"✖ {self.done - self.ok}  "),
+            (C_DIM, f"{time.monotonic() - self.started:.1f}s\n"),
+        ]
+        shown = self._ranked[: max(3, shutil.get_terminal_size((80, 24)).lines - 8)]
+        if not shown:
+            return FormattedText(p)
+        rows = [
+            [f"#{i}", _reach_word(r), _package_word(r),
+             f"{r.latency_ms:.0f}ms" if r.latency_ms is not None else "—"]
+            + (_bench_cells(r)[:1] if self.benchmark else [])
+            + [_shorten(r.mirror_name, 28), _shorten(r.url, 48)]
+            for i, (_, _, r) in enumerate(shown, 1)
+        ]
+        headers = ["#", "Reach", "Package", "Latency"] + (["MB/s"] if self.benchmark else []) + ["Mirror", "Endpoint"]
+        lines = _build_table(rows, headers).split("\n")
+        for n, line in enumerate(lines):
+            row = n - 3
+            if 0 <= row < len(shown):
+                style = "" if shown[row][2].reachable else C_DIM
+            else:
+                style = C_MUTED
+            p.append((style, f"  {line}\n"))
+        if len(self._ranked) > len(shown):
+            p.append((C_DIM, f"  … {len(self._ranked) - len(shown)} more\n"))
+        return FormattedText(p)
+
+    async def run(self, checks: Awaitable[List[CheckResult]]) -> List[CheckResult]:
+        """Await ``checks`` while showing the view; Ctrl-C cancels them."""
+        task = asyncio.ensure_future(checks)
+        kb = KeyBindings()
+
+        @kb.add("c-c")
+        def _interrupt(e):
+            task.cancel()
+
+        self.app = Application(
+            layout=Layout(HSplit([Window(content=FormattedTextControl(self._render), always_hide_cursor=True)])),
+            key_bindings=kb,
+            full_screen=False,
+            erase_when_done=True,
+            min_redraw_interval=1 / self.fps,
+            # Keeps the elapsed time ticking while no results arrive.
+            refresh_interval=0.5,
+        )
+        ui = asyncio.ensure_future(self.app.run_async())
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if task.cancelled():
+                raise KeyboardInterrupt from None
+            raise
+        finally:
+            if self.app.is_running:
+                self.app.exit()
+            else:
+                ui.cancel()
+            await asyncio.gather(ui, return_exceptions=True)
+
+
+def _run_and_show(
+    endpoints: List[PackageEndpoint],
+    packages: List[str],
+    os_kwargs: Dict[str, str],
+    options: "Optional[RunOptions]" = None,
+    runtime: Optional[Runtime] = None,
+) -> List[CheckResult]:
+    """Check ``endpoints`` and print the results; ``runtime`` keeps connections warm between calls."""
+    print()
+    _hr("─", C_DIM)
+    _title("⏳ Checking mirrors…")
+    print()
+
+    # Deferred so the banner and menus draw before httpx and the registries load.
+    from .checks import RunOptions, planned_checks, result_key, sort_results
+
+    options = options or RunOptions()
+    limiter = AdaptiveLimiter(options.concurrency)
+    benchmark = bool(options.benchmark)
+    own_runtime = runtime is None
+    runtime = runtime or Runtime(limiter.config)
+    try:
+        if sys.stdout.isatty():
+            live = _LiveResults(result_key(by_throughput=benchmark), benchmark)
+
+            async def checks() -> List[CheckResult]:
+                # Checks run on the runtime's thread; the view is drawn on this one.
+                ui = asyncio.get_running_loop()
+
+                def on_result(*args: Any) -> None:
+                    ui.call_soon_threadsafe(live.add, *args)
+
+                return await runtime.wrap(runtime.run_checks(
+                    endpoints, packages, os_kwargs, options, on_result=on_result, limiter=limiter,
+                ))
+
+            results = asyncio.run(live.run(checks()))
+        else:
+            # Piped output gets the final table only.
+            results = runtime.run(runtime.run_checks(endpoints, packages, os_kwargs, options, limiter=limiter))
+    finally:
+        if own_runtime:
+            runtime.close()
+    sorted_results = sort_results(results, by_throughput=benchmark)
+
+    ok_count = sum(1 for r in sorted_results if r.reachable)
+    fail_count = len(sorted_results) - ok_count
+
+    matrix = len(packages) > 1
+    spread = any(r.latency for r in sorted_results)
+    rows: List[List[str]] = []
+    for i, r in enumerate(sorted_results, 1):
+        lat = f"{r.latency_ms:.0f}ms" if r.latency_ms is not None else "—"
+        ttfb = f"{r.ttfb_ms:.0f}ms" if r.ttfb_ms is not None else "—"
+        rows.append(([f"#{i}"] if matrix else []) + [
+            _reach_word(r),
+            _package_word(r),
+            ttfb,
+            lat,
+        ] + (_spread_cells(r) if spread else []) + (_bench_cells(r) if benchmark else []) + [
+            _shorten(r.mirror_name, 36),
+            _shorten(r.url, 52),
+            _shorten(r.detail or "—", 44),
+        ])
+
+    print()
+    _hr("─", C_ACCENT)
+    _title("📊 Results")
+    print_formatted_text(HTML(
+        f"  <style fg='{C_OK}'><b>{ok_count}</b> reachable</style>"
+        f"  <style fg='{C_DIM}'>│</style>  "
+        f"<style fg='{C_FAIL}'><b>{fail_count}</b> failed</style>"
+        f"  <style fg='{C_DIM}'>│</style>  "
+        f"<style fg='{C_DIM}'>{len(sorted_results)} total</style>"
+    ))
+    cancelled = planned_checks(endpoints, options) - len(sorted_results)
+    if cancelled:
+        _subtle(f"Race: stopped after {options.race} good mirrors; {cancelled} slower checks cancelled")
+    _subtle(
+        f"Concurrency: avg {limiter.average:.1f}, peak {limiter.peak}, "
+        f"final limit {int(limiter.limit)} (max {limiter.config.maximum}, "
+        f"{limiter.config.per_host}/host)"
+    )
+    print()
+
+    print(_build_table(
+        rows,
+        headers=(["#"] if matrix else [])
+        + ["Reach", "Package", "TTFB", "Latency"]
+        + (["Spread", "Handshake"] if spread else [])
+        + (["MB/s", "File TTFB"] if benchmark else [])
+        + ["Mirror", "Endpoint", "Reason"],
+    ))
+
+    if matrix:
+        print()
+        _title("📦 Package matrix")
+        print(_package_matrix(packages, sorted_results))
+
+    if options.profile:
+        from .profiling import BREAKDOWN_HEADERS, format_breakdown, write_chrome_trace
+
+        print()
+        _title("⏱ Profile")
+        print(_build_table(format_breakdown(sorted_results) or [["—"] * 6], headers=BREAKDOWN_HEADERS))
+        if options.trace_file:
+            write_chrome_trace(sorted_results, options.trace_file)
+            _subtle(f"Trace written to {options.trace_file}")
+
+    print()
+    _hr("·", C_DIM)
+    _subtle("✔ OK = endpoint responded    ✖ FAIL = unreachable or error")
+    _subtle("FOUND = package exists       NOT FOUND = mirror OK but item missing")
+    if matrix:
+        _subtle("n/m = packages found out of those requested")
+    _subtle("SKIPPED = no package name provided")
+    _hr("·", C_DIM)
+    return sorted_results
+
+
+def _config_step(session: PromptSession, results: List[CheckResult], os_kwargs: Dict[str, str]) -> str:
+    """Show the package-manager config for ``results`` and offer to write it."""
+    from .configs import diff, render, write
+
+    try:
+        files = render(results, os_kwargs)
+    except ValueError as exc:
+        _error(str(exc))
+        return ""
+    if not files:
+        _error("No reachable mirror with every package to configure.")
+        return ""
+    print()
+    _title("🛠 Config changes")
+    for config in files:
+        print(diff(config) or f"  {config.path}: unchanged\n", end="")
+    choice = _menu(
+        session,
+        title="Write Config",
+        description="Previous files are kept as .bak.",
+        options=["Apply", "Export to a directory", "Skip"],
+        default="Skip",
+        allow_back=True,
+    )
+    if choice in {QUIT, BACK, "Skip"}:
+        return choice
+    root = None
+    if choice == "Export to a directory":
+        root = _text_input(session, "Directory", default="mirava-config", allow_blank=False)
+        if root in {QUIT, BACK}:
+            return root
+    for config in files:
+        try:
+            _success(f"Wrote {write(config, root)}")
+        except OSError as exc:
+            _error(f"Cannot write {config.path}: {exc}")
+    return choice
+
+
+# ── Flows ───────────────────────────────────────────────────────────────
+
+def _os_flow(
+    session: PromptSession, mirrors: MirrorCatalog, all_names: List[str],
+    os_default: Optional[str], base_kwargs: Dict[str, str],
+    options: "Optional[RunOptions]" = None, runtime: Optional[Runtime] = None,
+) -> str:
+    os_names = [n for n in all_names if n in OS_NAMES]
+
+    while True:
+        print()
+        choice = _menu(
+            session,
+            title="OS Mirror Checks",
+            description="Choose your OS. Detected OS is preselected.",
+            options=os_names,
+            default=os_default,
+            allow_back=True,
+        )
+        if choice == QUIT:
+            return QUIT
+        if choice == BACK:
+            return BACK
+
+        package = _text_input(
+            session,
+            f"OS packages for {choice} (optional, e.g. curl, gcc)",
+            default="", allow_blank=True,
+        )
+        if package == QUIT:
+            return QUIT
+        if package == BACK:
+            continue
+
+        # The host's suite, repo or arch only make sense for the host's own OS.
+        status, os_kwargs = _collect_os_kwargs(session, choice, base_kwargs if choice == os_default else {})
+        if status == QUIT:
+            return QUIT
+        if status == BACK:
+            continue
+
+        eps = mirrors.endpoints(choice)
+        if not eps:
+            _error("No mirrors found for that OS choice.")
+            continue
+
+        results = _run_and_show(eps, split_packages(package), os_kwargs, options, runtime)
+
+        from .configs import WRITERS
+
+        steps = ["Run another OS check", "Back to main menu", "Exit"]
+        if choice in WRITERS:
+            steps.insert(0, "Write package-manager config")
+        while True:
+            post = _menu(
+                session,
+                title="Next Step",
+                description="Choose what to do now.",
+                options=steps,
+                default="Run another OS check",
+                allow_back=False,
+            )
+            if post != "Write package-manager config":
+                break
+            if _config_step(session, results, os_kwargs) == QUIT:
+                return QUIT
+            steps.remove(post)
+        if post in {QUIT, "Exit"}:
+            return QUIT
+        if post == "Back to main menu":
+            return BACK
+
+
+def _registry_flow(
+    session: PromptSession, mirrors: MirrorCatalog, all_names: List[str],
+    options: "Optional[RunOptions]" = None, runtime: Optional[Runtime] = None,
+) -> str:
+    known = registry_names()
+    reg_names = [n for n in all_names if n in known]
+
+    while True:
+        print()
+        choice = _menu(
+            session,
+            title="Registry Mirror Checks",
+            description="Choose the package registry to test.",
+            options=reg_names,
+            default="PyPI" if "PyPI" in reg_names else None,
+            allow_back=True,
+        )
+        if choice == QUIT:
+            return QUIT
+        if choice == BACK:
+            return BACK
+
+        ex = REGISTRY_EXAMPLES.get(choice, "e.g. package-name")
+        package = _text_input(
+            session,
+            f"Packages/Images for {choice} ({ex})",
+            allow_blank=False,
+        )
+        if package == QUIT:
+            return QUIT
+        if package == BACK:
+            continue
+
+        eps = mirrors.endpoints(choice)
+        if not eps:
+            _error("No mirrors found for that registry choice.")
+            continue
+
+        results = _run_and_show(eps, split_packages(package), {}, options, runtime)
+
+        from .configs import WRITERS
+
+        steps = ["Run another registry check", "Back to main menu", "Exit"]
+        if choice in WRITERS:
+            steps.insert(0, "Write package-manager config")
+        while True:
+            post = _menu(
+                session,
+                title="Next Step",
+                description="Choose what to do now.",
+                options=steps,
+                default="Run another registry check",
+                allow_back=False,
+            )
+            if post != "Write package-manager config":
+                break
+            if _config_step(session, results, {}) == QUIT:
+                return QUIT
+            steps.remove(post)
+        if post in {QUIT, "Exit"}:
+            return QUIT
+        if post == "Back to main menu":
+            return BACK
+
+
+# ── Entry point ─────────────────────────────────────────────────────────
+
+def run(args: argparse.Namespace) -> None:
+    try:
+        _run_inner(args)
+    except KeyboardInterrupt:
+        print()
+        _subtle("Goodbye! ✦")
+
+
+def _run_inner(args: argparse.Namespace) -> None:
+    mirrors = load_mirrors(args.mirrors)
+    all_names = mirrors.names()
+
+    os_info = detect_os()
+    os_default, base_os_kwargs = os_defaults(os_info)
+
+    session = PromptSession()
+    _banner()
+
+    # Imported after the banner: .checks pulls in httpx and the registries.
+    from .checks import RunOptions
+
+    options = RunOptions(
+        cache=None if args.no_cache else IndexCache(max_bytes=args.cache_max_mb * 1024 * 1024),
+        concurrency=ConcurrencyConfig.from_args(args),
+        probe=args.probe,
+        samples=max(1, args.samples),
+        metrics_file=args.metrics_file,
+        profile=args.profile or bool(args.trace_file),
+        trace_file=args.trace_file,
+        benchmark=BenchmarkConfig.from_args(args),
+        race=args.race,
+        deadlines=Deadlines.from_args(args),
+        hedge=args.hedge,
+    )
+
+    # One loop and client for the whole session, so later checks reuse warm connections.
+    runtime = Runtime(options.concurrency)
+
+    try:
+        _main_menu(session, mirrors, all_names, os_default, base_os_kwargs, options, runtime)
+    finally:
+        runtime.close()
+
+
+def _main_menu(
+    session: PromptSession, mirrors: MirrorCatalog, all_names: List[str],
+    os_default: Optional[str], base_kwargs: Dict[str, str],
+    options: "RunOptions", runtime: Runtime,
+) -> None:
+    while True:
+        mode = _menu(
+            session,
+            title="Main Menu",
+            description="Pick what you want to verify.",
+            options=["OS mirrors", "Registry mirrors", "Exit"],
+            default="OS mirrors",
+            allow_back=False,
+        )
+
+        if mode in {QUIT, "Exit"}:
+            print()
+            _subtle("Goodbye! ✦")
+            return
+
+        if mode == "OS mirrors":
+            if _os_flow(session, mirrors, all_names, os_default, base_kwargs, options, runtime) == QUIT:
+                return
+            continue
+
+        if mode == "Registry mirrors":
+            if _registry_flow(session, mirrors, all_names, options, runtime) == QUIT:
+                return
+            continue
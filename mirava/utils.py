@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import os
-import platform
 import re
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 def normalize_url(url: str) -> str:
@@ -13,6 +12,11 @@ def normalize_url(url: str) -> str:
     return url
 
 
+def split_packages(raw: str) -> List[str]:
+    """Split a user-supplied package list on commas and whitespace."""
+    return [p for p in raw.replace(",", " ").split() if p]
+
+
 def detect_os() -> Dict[str, str]:
     info: Dict[str, str] = {}
     try:
@@ -24,6 +28,8 @@ def detect_os() -> Dict[str, str]:
                 key, value = line.split("=", 1)
                 info[key] = value.strip().strip('"')
     except FileNotFoundError:
+        import platform
+
         info["ID"] = platform.system().lower()
     return info
 
@@ -34,12 +40,8 @@ def os_defaults(info: Dict[str, str]) -> Tuple[Optional[str], Dict[str, str]]:
     codename = info.get("VERSION_CODENAME") or ""
     version_id = info.get("VERSION_ID") or ""
 
-    defaults: Dict[str, str] = {
-        "arch": "amd64",
-        "component": "main",
-        "repo": "core",
-        "branch": "stable",
-    }
+    # Only what the host says; the rest comes from the registry's defaults.
+    defaults: Dict[str, str] = {}
 
     if os_id in {"ubuntu", "debian", "linuxmint", "kali", "raspbian"} or "debian" in os_like:
         defaults["suite"] = codename or version_id
@@ -63,7 +65,8 @@ def os_defaults(info: Dict[str, str]) -> Tuple[Optional[str], Dict[str, str]]:
         return "CentOS", defaults
     if os_id in {"arch", "manjaro"} or "arch" in os_like:
         defaults["arch"] = os.uname().machine or "x86_64"
-        defaults["repo"] = "core"
+        # core, extra and multilib are searched together.
+        defaults["repo"] = "all"
         return "Arch Linux", defaults
     if os_id in {"alpine"}:
         defaults["branch"] = f"v{version_id}" if version_id else "v3.18"
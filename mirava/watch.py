@@ -0,0 +1,334 @@
+"""``mirava watch``: re-check mirrors on an interval and keep a health history.
+
+Every URL gets its own schedule: the first check lands at a random point of
+the first interval and each later one ``interval`` ± ``jitter`` after the
+previous, so checks trickle out evenly instead of bursting every mirror at
+once. The last ``--history`` results per URL are kept in a ring buffer; the
+current ranking and uptime percentages are written to a JSON state file that
+other hosts can read instead of probing everything themselves.
+
+Like :mod:`mirava.headless`, the CLI imports this module only to register the
+sub-command's arguments; asyncio, httpx and the registries load in
+:func:`run_watch`.
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import os
+import statistics
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from .checks import RunOptions
+    from .models import CheckResult, PackageEndpoint
+
+DEFAULT_INTERVAL_S = 300.0
+DEFAULT_JITTER = 0.1
+# One day of history at the default interval.
+DEFAULT_HISTORY = 288
+DEFAULT_PUBLISH_S = 10.0
+
+Key = Tuple[str, str]
+
+
+def default_state_path() -> Path:
+    """``$XDG_STATE_HOME/mirava/watch.json`` (``%LOCALAPPDATA%`` on Windows)."""
+    base = os.environ.get("XDG_STATE_HOME") or os.environ.get("LOCALAPPDATA")
+    root = Path(base) if base else Path.home() / ".local" / "state"
+    return root / "mirava" / "watch.json"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--target", action="append", default=[], metavar="NAME",
+        help="OS or registry to watch; repeat for several (default: every endpoint in the catalog)",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=DEFAULT_INTERVAL_S, metavar="SECONDS",
+        help=f"time between checks of the same URL (default: {DEFAULT_INTERVAL_S:.0f})",
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=DEFAULT_JITTER, metavar="FRACTION",
+        help=f"random spread applied to every interval (default: {DEFAULT_JITTER})",
+    )
+    parser.add_argument(
+        "--history", type=int, default=DEFAULT_HISTORY, metavar="N",
+        help=f"results kept per URL for uptime and latency (default: {DEFAULT_HISTORY})",
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, default=None, metavar="PORT",
+        help="serve Prometheus metrics on http://HOST:PORT/metrics",
+    )
+    parser.add_argument(
+        "--metrics-host", default="127.0.0.1", metavar="HOST",
+        help="address for --metrics-port (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--state", type=Path, default=None, metavar="PATH",
+        help=f"JSON file the ranking is written to (default: {default_state_path()})",
+    )
+
+
+class Sample(NamedTuple):
+    at: float
+    reachable: bool
+    latency_ms: Optional[float]
+
+
+class EndpointHistory:
+    """Ring buffer of recent results for one URL of one endpoint."""
+
+    __slots__ = ("endpoint", "mirror_name", "url", "samples", "detail")
+
+    def __init__(self, endpoint: str, mirror_name: str, url: str, size: int) -> None:
+        self.endpoint = endpoint
+        self.mirror_name = mirror_name
+        self.url = url
+        self.samples: Deque[Sample] = deque(maxlen=size)
+        self.detail = ""
+
+    def record(self, result: CheckResult, at: Optional[float] = None) -> None:
+        self.samples.append(Sample(at or time.time(), result.reachable, result.latency_ms))
+        self.detail = result.detail
+
+    @property
+    def up(self) -> bool:
+        return bool(self.samples) and self.samples[-1].reachable
+
+    @property
+    def uptime(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(s.reachable for s in self.samples) / len(self.samples)
+
+    @property
+    def median_latency_ms(self) -> Optional[float]:
+        latencies = [s.latency_ms for s in self.samples if s.reachable and s.latency_ms is not None]
+        return statistics.median(latencies) if latencies else None
+
+    def rank_key(self) -> Tuple[bool, float]:
+        """Up now first, then median latency scaled by unreliability.
+
+        Dividing by uptime lets a slightly slower mirror that is always up
+        beat a fast one that keeps dropping out.
+        """
+        latency = self.median_latency_ms
+        if latency is None:
+            return (not self.up, float("inf"))
+        return (not self.up, latency / max(self.uptime, 0.01))
+
+    def to_dict(self) -> Dict[str, Any]:
+        latency = self.median_latency_ms
+        return {
+            "mirror_name": self.mirror_name,
+            "url": self.url,
+            "up": self.up,
+            "uptime": round(self.uptime, 4),
+            "median_latency_ms": None if latency is None else round(latency, 1),
+            "samples": len(self.samples),
+            "last_checked": self.samples[-1].at if self.samples else None,
+            "detail": self.detail,
+        }
+
+
+class Watcher:
+    """Schedules checks for ``endpoints`` forever and tracks their history."""
+
+    def __init__(
+        self,
+        endpoints: List[PackageEndpoint],
+        options: RunOptions,
+        os_kwargs: Dict[str, str],
+        interval: float = DEFAULT_INTERVAL_S,
+        jitter: float = DEFAULT_JITTER,
+        history: int = DEFAULT_HISTORY,
+    ) -> None:
+        self.options = options
+        self.os_kwargs = os_kwargs
+        self.interval = max(1.0, interval)
+        self.jitter = min(max(jitter, 0.0), 0.9)
+        self.targets: Dict[Key, PackageEndpoint] = {}
+        self.histories: Dict[Key, EndpointHistory] = {}
+        for ep in endpoints:
+            for url in ep.urls:
+                key = (ep.name, url)
+                self.targets.setdefault(key, ep)
+                self.histories.setdefault(key, EndpointHistory(ep.name, ep.mirror_name, url, history))
+        self.started = time.time()
+        self.version = 0
+
+    def _next_delay(self) -> float:
+        import random
+
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def record(self, result: CheckResult) -> None:
+        history = self.histories.get((result.endpoint_name, result.url))
+        if history is not None:
+            history.record(result)
+            self.version += 1
+
+    def ranking(self, name: str) -> List[EndpointHistory]:
+        """Checked URLs serving ``name``, best first."""
+        ranked = [h for h in self.histories.values() if h.endpoint == name and h.samples]
+        return sorted(ranked, key=EndpointHistory.rank_key)
+
+    def best(self, name: str) -> Optional[EndpointHistory]:
+        ranked = self.ranking(name)
+        return ranked[0] if ranked and ranked[0].up else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        names = sorted({h.endpoint for h in self.histories.values()})
+        return {
+            "generated_at": time.time(),
+            "started_at": self.started,
+            "interval_s": self.interval,
+            "endpoints": {n: [h.to_dict() for h in self.ranking(n)] for n in names},
+        }
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Check until ``stop`` is set (or forever)."""
+        import asyncio
+        import random
+
+        from .checks import check_url, open_client
+        from .metrics import watch_loop_lag
+        from .scheduler import AdaptiveLimiter
+
+        loop = asyncio.get_running_loop()
+        stop = stop or asyncio.Event()
+        limiter = AdaptiveLimiter(self.options.concurrency)
+        now = loop.time()
+        # Spread first checks over one interval instead of starting all at once.
+        due: List[Tuple[float, int, Key]] = [
+            (now + random.uniform(0, self.interval), i, key) for i, key in enumerate(self.targets)
+        ]
+        heapq.heapify(due)
+        running: set = set()
+        seq = len(due)
+
+        async with open_client(limiter.config) as client:
+
+            async def one(key: Key) -> None:
+                nonlocal seq
+                ep = self.targets[key]
+                try:
+                    result = await check_url(client, ep, key[1], [], self.os_kwargs, self.options, limiter)
+                    self.record(result)
+                finally:
+                    seq += 1
+                    heapq.heappush(due, (loop.time() + self._next_delay(), seq, key))
+
+            lag = asyncio.create_task(watch_loop_lag())
+            try:
+                while not stop.is_set():
+                    now = loop.time()
+                    while due and due[0][0] <= now:
+                        _, _, key = heapq.heappop(due)
+                        task = asyncio.create_task(one(key))
+                        running.add(task)
+                        task.add_done_callback(running.discard)
+                    wait = due[0][0] - now if due else self.interval
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=max(0.05, wait))
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                lag.cancel()
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+
+
+def write_state(watcher: Watcher, path: Path) -> None:
+    """Atomically replace ``path`` with the watcher's current snapshot."""
+    import json
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(watcher.snapshot(), indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+async def _publish(watcher: Watcher, path: Path, stop: asyncio.Event, every: float) -> None:
+    import asyncio
+
+    from .metrics import METRICS
+
+    written = -1
+    while True:
+        if watcher.version != written:
+            written = watcher.version
+            write_state(watcher, path)
+            if watcher.options.metrics_file:
+                METRICS.write_textfile(watcher.options.metrics_file)
+        if stop.is_set():
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=every)
+        except asyncio.TimeoutError:
+            pass
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from .checks import RunOptions
+    from .deadlines import Deadlines
+    from .mirrors import load_mirrors
+    from .scheduler import ConcurrencyConfig
+
+    catalog = load_mirrors(args.mirrors)
+    names = args.target or catalog.names()
+    endpoints = [ep for name in names for ep in catalog.endpoints(name)]
+    if not endpoints:
+        print(f"mirava: no mirrors found for {', '.join(names)!r}", file=sys.stderr)
+        return 2
+
+    # Reachability only; each registry brings its own OS defaults.
+    os_kwargs: Dict[str, str] = {}
+    options = RunOptions(
+        cache=None,
+        concurrency=ConcurrencyConfig.from_args(args),
+        probe=args.probe,
+        samples=max(1, args.samples),
+        metrics_file=args.metrics_file,
+        deadlines=Deadlines.from_args(args),
+    )
+    watcher = Watcher(endpoints, options, os_kwargs, args.interval, args.jitter, max(1, args.history))
+    state = args.state or default_state_path()
+    urls = len(watcher.targets)
+    print(
+        f"mirava: watching {urls} URLs every {watcher.interval:.0f}s "
+        f"(~{urls / watcher.interval:.1f} checks/s); state in {state}",
+        file=sys.stderr,
+    )
+
+    async def main() -> None:
+        stop = asyncio.Event()
+        publisher = asyncio.create_task(_publish(watcher, state, stop, DEFAULT_PUBLISH_S))
+        metrics = None
+        if args.metrics_port is not None:
+            from .serve import start_metrics_server
+
+            metrics = await start_metrics_server(args.metrics_host, args.metrics_port)
+        try:
+            await watcher.run(stop)
+        finally:
+            stop.set()
+            if metrics is not None:
+                metrics.close()
+            await publisher
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        write_state(watcher, state)
+    return 0
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Compare loading the mirror catalog from JSON against the prebuilt SQLite file.
+
+    uv run python scripts/build_catalog.py
+    uv run python scripts/bench_catalog.py [--runs N] [--name Ubuntu]
+
+Each loader runs in a fresh interpreter so import costs (json, sqlite3) are
+included, then in-process for the steady-state cost.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from mirava import catalog  # noqa: E402
+from mirava.mirrors import list_package_names, load_mirrors_json  # noqa: E402
+
+SOURCE = str(PROJECT_ROOT / "mirava_full_json.json")
+
+COLD = {
+    "json: all mirrors": f"from mirava.mirrors import load_mirrors_json as f; f({SOURCE!r})",
+    "sqlite: all mirrors": f"from mirava.catalog import read_mirrors as f; f({catalog.PACKAGED_CATALOG!r})",
+    "sqlite: one name": (
+        f"from mirava.catalog import read_endpoints as f; f({catalog.PACKAGED_CATALOG!r}, '{{name}}')"
+    ),
+}
+
+
+def _median_ms(fn: Callable[[], object], runs: int) -> float:
+    samples: List[float] = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def _cold_ms(code: str, runs: int) -> float:
+    def run() -> None:
+        subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, check=True)
+    return _median_ms(run, runs) - _median_ms(lambda: subprocess.run([sys.executable, "-c", "pass"]), runs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--name", default="Ubuntu", help="endpoint name for the indexed lookup")
+    args = parser.parse_args()
+
+    if not catalog.is_fresh(catalog.PACKAGED_CATALOG, SOURCE):
+        sys.exit("catalog missing or stale; run scripts/build_catalog.py first")
+
+    db = catalog.PACKAGED_CATALOG
+    warm = {
+        "json: all mirrors + names": lambda: list_package_names(load_mirrors_json(SOURCE)),
+        "sqlite: all mirrors": lambda: catalog.read_mirrors(db),
+        "sqlite: names": lambda: catalog.read_names(db),
+        "json: one name": lambda: [
+            ep for m in load_mirrors_json(SOURCE) for ep in m.packages_by_name(args.name)
+        ],
+        "sqlite: one name": lambda: catalog.read_endpoints(db, args.name),
+    }
+    print(f"In-process (median of {args.runs}):")
+    for label, fn in warm.items():
+        print(f"  {label:<28} {_median_ms(fn, args.runs):8.3f} ms")
+
+    cold_runs = max(3, args.runs // 4)
+    print(f"\nFresh interpreter incl. imports (median of {cold_runs}, minus bare start):")
+    for label, code in COLD.items():
+        print(f"  {label:<28} {_cold_ms(code.format(name=args.name), cold_runs):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Compare the streaming Alpine / Pacman index scans with buffering the archive.
+
+    uv run python scripts/bench_index.py [--packages N] [--runs N]
+    uv run python scripts/bench_index.py --apkindex APKINDEX.tar.gz --db extra.db
+
+Without ``--apkindex`` / ``--db`` synthetic fixtures shaped like the real
+ones are generated (APKINDEX: a signature gzip member followed by the index;
+sync db: one ``name-ver-rel/desc`` per package). The body is served through
+``httpx.MockTransport`` in 64 KiB chunks. For each index the first, middle and
+a missing package are looked up; wall time is the median of ``--runs`` and
+memory is the tracemalloc peak of one run.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import io
+import statistics
+import sys
+import tarfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import httpx  # noqa: E402
+
+from mirava.registry.os.alpine import AlpineRegistry  # noqa: E402
+from mirava.registry.os.pacman import PacmanRegistry  # noqa: E402
+
+CHUNK = 64 * 1024
+
+
+def _tar(members: List[Tuple[str, bytes]], end: bool = True) -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w", format=tarfile.USTAR_FORMAT) as tf:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    data = buf.getvalue()
+    if not end:
+        # abuild strips the end-of-archive blocks from the signature part.
+        size = sum(512 + (len(d) + 511) // 512 * 512 for _, d in members)
+        data = data[:size]
+    return data
+
+
+def _names(count: int) -> List[str]:
+    return [f"pkg{i:05d}-lib" for i in range(count)]
+
+
+def make_apkindex(count: int) -> bytes:
+    entries = [
+        f"C:Q1{i:026d}=\nP:{name}\nV:1.{i}-r0\nA:x86_64\nS:{1000 + i}\nI:{4000 + i}\n"
+        f"T:synthetic package {i}\nU:https://example.org/\nL:MIT\no:{name}\nm:Nobody <n@example.org>\n"
+        f"t:1700000000\nc:{i:040x}\nD:so:libc.musl-x86_64.so.1\np:so:lib{name}.so.1={i}\n\n"
+        for i, name in enumerate(_names(count))
+    ]
+    signature = gzip.compress(_tar([(".SIGN.RSA.alpine-devel.rsa.pub", b"\0" * 512)], end=False))
+    index = gzip.compress(_tar([("DESCRIPTION", b"v3.18\n"), ("APKINDEX", "".join(entries).encode())]))
+    return signature + index
+
+
+def make_db(count: int) -> bytes:
+    members = []
+    for i, name in enumerate(_names(count)):
+        desc = (
+            f"%FILENAME%\n{name}-1.{i}-1-x86_64.pkg.tar.zst\n\n%NAME%\n{name}\n\n%VERSION%\n1.{i}-1\n\n"
+            f"%DESC%\nsynthetic package {i}\n\n%CSIZE%\n{1000 + i}\n\n%ISIZE%\n{4000 + i}\n\n"
+            f"%SHA256SUM%\n{i:064x}\n\n%ARCH%\nx86_64\n\n%DEPENDS%\nglibc\n\n"
+        )
+        members.append((f"{name}-1.{i}-1/desc", desc.encode()))
+    return gzip.compress(_tar(members))
+
+
+def buffered_apkindex(content: bytes, wanted: Set[str]) -> Set[str]:
+    """The previous implementation: whole body in memory, getmembers, decode."""
+    names: Set[str] = set()
+    with tarfile.open(fileobj=io.BytesIO(content), mode="r:gz") as tf:
+        for member in tf.getmembers():
+            if member.name.endswith("APKINDEX"):
+                f = tf.extractfile(member)
+                if not f:
+                    continue
+                text = f.read().decode("utf-8", errors="ignore")
+                names.update(line[2:] for line in text.splitlines() if line.startswith("P:"))
+    return names & wanted
+
+
+def buffered_db(content: bytes, wanted: Set[str]) -> Set[str]:
+    names: Set[str] = set()
+    with tarfile.open(fileobj=io.BytesIO(content)) as tf:
+        for member in tf.getmembers():
+            if member.name.endswith("/desc"):
+                f = tf.extractfile(member)
+                if not f:
+                    continue
+                text = f.read().decode("utf-8", errors="ignore")
+                _, sep, rest = text.partition("%NAME%\n")
+                if sep:
+                    names.add(rest.split("\n", 1)[0])
+    return names & wanted
+
+
+class _Body(httpx.AsyncByteStream):
+    def __init__(self, content: bytes, sent: List[int]) -> None:
+        self.content = content
+        self.sent = sent
+
+    async def __aiter__(self):
+        for i in range(0, len(self.content), CHUNK):
+            chunk = self.content[i:i + CHUNK]
+            self.sent[0] += len(chunk)
+            yield chunk
+            await asyncio.sleep(0)
+
+
+def streaming(registry, content: bytes, url: str, **kwargs) -> Callable[[List[str]], Tuple[Set[str], int]]:
+    def run(packages: List[str]) -> Tuple[Set[str], int]:
+        sent = [0]
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, stream=_Body(content, sent)))
+
+        async def main() -> Set[str]:
+            async with httpx.AsyncClient(transport=transport) as client:
+                statuses = await registry.check_packages(client, url, packages, **kwargs)
+            return {p for p, (ok, _) in statuses.items() if ok}
+
+        return asyncio.run(main()), sent[0]
+    return run
+
+
+def buffered(scan: Callable[[bytes, Set[str]], Set[str]], content: bytes) -> Callable[[List[str]], Tuple[Set[str], int]]:
+    def run(packages: List[str]) -> Tuple[Set[str], int]:
+        body = bytes(content)  # what the old code held after resp.aread()
+        return scan(body, set(packages)), len(body)
+    return run
+
+
+def measure(fn: Callable[[List[str]], Tuple[Set[str], int]], packages: List[str], runs: int) -> Dict[str, float]:
+    tracemalloc.start()
+    found, sent = fn(packages)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(packages)
+        times.append((time.perf_counter() - t0) * 1000)
+    return {"ms": statistics.median(times), "peak_kb": peak / 1024, "read_kb": sent / 1024, "found": len(found)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--packages", type=int, default=15000, help="packages in synthetic fixtures")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--apkindex", type=Path, help="recorded APKINDEX.tar.gz to use instead")
+    parser.add_argument("--db", type=Path, help="recorded pacman .db to use instead")
+    args = parser.parse_args()
+
+    apk = args.apkindex.read_bytes() if args.apkindex else make_apkindex(args.packages)
+    db = args.db.read_bytes() if args.db else make_db(args.packages)
+    apk_names = sorted(_all_apk_names(apk))
+    db_names = sorted(_all_db_names(db))
+
+    cases = [
+        ("APKINDEX", apk, apk_names, streaming(AlpineRegistry(), apk, "http://m/alpine/v3.18/main/x86_64", repo="main"),
+         buffered(buffered_apkindex, apk)),
+        ("pacman db", db, db_names, streaming(PacmanRegistry(), db, "http://m/archlinux/$repo/os/$arch"),
+         buffered(buffered_db, db)),
+    ]
+    print(f"{'index':<10} {'lookup':<8} {'impl':<10} {'median ms':>10} {'peak KiB':>10} {'read KiB':>10} found")
+    for label, content, names, stream_fn, buffer_fn in cases:
+        lookups = {"first": [names[0]], "middle": [names[len(names) // 2]], "missing": ["no-such-package"]}
+        print(f"{label}: {len(content) / 1024:.0f} KiB compressed, {len(names)} packages")
+        for lookup, packages in lookups.items():
+            for impl, fn in (("buffered", buffer_fn), ("streaming", stream_fn)):
+                m = measure(fn, packages, args.runs)
+                print(
+                    f"{label:<10} {lookup:<8} {impl:<10} {m['ms']:>10.1f} {m['peak_kb']:>10.0f} "
+                    f"{m['read_kb']:>10.0f} {m['found']:.0f}"
+                )
+
+
+def _all_apk_names(content: bytes) -> Set[str]:
+    with tarfile.open(fileobj=io.BytesIO(content), mode="r:gz") as tf:
+        f = tf.extractfile("APKINDEX")
+        return {line[2:].decode() for line in f.read().splitlines() if line.startswith(b"P:")} if f else set()
+
+
+def _all_db_names(content: bytes) -> Set[str]:
+    with tarfile.open(fileobj=io.BytesIO(content)) as tf:
+        return {m.name.split("/", 1)[0].rsplit("-", 2)[0] for m in tf.getmembers()}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Startup-time regression benchmark for the CLI.
+
+Runs ``python -X importtime`` on the entry modules and times cold starts of
+``mirava --help`` (and optionally a Nuitka onefile binary), then compares the
+medians against budgets. Exits non-zero when a budget is exceeded or when the
+entry point pulls in a module that must stay lazy.
+
+    uv run python scripts/bench_startup.py
+    uv run python scripts/bench_startup.py --binary dist/mirava-linux-x64
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# module -> import budget in ms (cumulative, as reported by -X importtime)
+IMPORT_BUDGETS: Dict[str, float] = {
+    "mirava.cli": 40.0,
+    "mirava.headless": 40.0,
+}
+
+# Importing the entry point must not load any of these.
+LAZY_MODULES = ("httpx", "prompt_toolkit", "asyncio", "tarfile", "gzip", "mirava.tui", "mirava.checks")
+
+# Wall-clock budget for a cold start, on top of a bare interpreter start.
+DEFAULT_STARTUP_BUDGET_MS = 100.0
+DEFAULT_BINARY_BUDGET_MS = 250.0
+
+
+def _run(cmd: Sequence[str]) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    return subprocess.run(cmd, cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+
+
+def _importtime(module: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """Cumulative import time of ``module`` and the slowest modules it pulled in."""
+    proc = _run([sys.executable, "-X", "importtime", "-c", f"import {module}"])
+    cumulative = 0.0
+    heavy: List[Tuple[float, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cum_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        if not self_us.isdigit():
+            continue
+        heavy.append((int(self_us) / 1000, name))
+        if name == module:
+            cumulative = int(cum_us) / 1000
+    heavy.sort(reverse=True)
+    return cumulative, heavy[:5]
+
+
+def _loaded_modules(module: str) -> List[str]:
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    return _run([sys.executable, "-c", code]).stdout.split()
+
+
+def _wall_ms(cmd: Sequence[str], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        _run(cmd)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="samples per measurement (median is reported)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_STARTUP_BUDGET_MS,
+                        help="cold-start budget for 'python -m mirava --help' over a bare interpreter")
+    parser.add_argument("--binary", help="onefile binary to time as well")
+    parser.add_argument("--binary-budget-ms", type=float, default=DEFAULT_BINARY_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    failures: List[str] = []
+
+    print("Import time (median of runs, -X importtime):")
+    for module, budget in IMPORT_BUDGETS.items():
+        samples = [_importtime(module) for _ in range(args.runs)]
+        median = statistics.median(s[0] for s in samples)
+        status = "ok" if median <= budget else "OVER"
+        print(f"  {module:<20} {median:7.1f} ms  (budget {budget:.0f} ms)  {status}")
+        for self_ms, name in samples[-1][1]:
+            print(f"      {self_ms:6.1f} ms self  {name}")
+        if median > budget:
+            failures.append(f"{module} imports in {median:.1f} ms > {budget:.0f} ms")
+
+    loaded = set(_loaded_modules("mirava.cli"))
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    print(f"\nLazy modules loaded by mirava.cli: {', '.join(eager) or 'none'}")
+    if eager:
+        failures.append(f"mirava.cli eagerly imports {', '.join(eager)}")
+
+    baseline = _wall_ms([sys.executable, "-c", "pass"], args.runs)
+    startup = _wall_ms([sys.executable, "-m", "mirava", "--help"], args.runs) - baseline
+    status = "ok" if startup <= args.budget_ms else "OVER"
+    print(f"\nCold start 'python -m mirava --help': {startup:.1f} ms over interpreter "
+          f"({baseline:.1f} ms)  (budget {args.budget_ms:.0f} ms)  {status}")
+    if startup > args.budget_ms:
+        failures.append(f"wheel cold start {startup:.1f} ms > {args.budget_ms:.0f} ms")
+
+    if args.binary:
+        binary = _wall_ms([args.binary, "--help"], args.runs)
+        status = "ok" if binary <= args.binary_budget_ms else "OVER"
+        print(f"Cold start '{args.binary} --help': {binary:.1f} ms  "
+              f"(budget {args.binary_budget_ms:.0f} ms)  {status}")
+        if binary > args.binary_budget_ms:
+            failures.append(f"binary cold start {binary:.1f} ms > {args.binary_budget_ms:.0f} ms")
+
+    if failures:
+        print("\nFAILED:\n  " + "\n  ".join(failures), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Compile mirava_full_json.json into the prebuilt catalog shipped with the package.
+
+    uv run python scripts/build_catalog.py [SOURCE_JSON] [OUTPUT]
+
+Run it before building the wheel or the Nuitka binary; build_nuitka.py calls
+it automatically.
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from mirava.catalog import PACKAGED_CATALOG, compile_catalog  # noqa: E402
+
+
+def main() -> None:
+    source = sys.argv[1] if len(sys.argv) > 1 else str(PROJECT_ROOT / "mirava_full_json.json")
+    output = sys.argv[2] if len(sys.argv) > 2 else PACKAGED_CATALOG
+    count = compile_catalog(source, output)
+    print(f"Wrote {output} ({count} endpoints from {source})")
+
+
+if __name__ == "__main__":
+    main()
@@ -66,6 +66,12 @@ def main() -> None:
     project_root = Path(__file__).resolve().parents[1]
     entry = project_root / "mirava" / "cli.py"
     data_file = project_root / "mirava_full_json.json"
+    catalog_file = project_root / "mirava" / "catalog.sqlite"
+
+    subprocess.run(
+        [sys.executable, str(project_root / "scripts" / "build_catalog.py")],
+        check=True, cwd=project_root,
+    )
 
     no_compress = os.environ.get("NUITKA_ONEFILE_NO_COMPRESSION", "").strip().lower() in {
         "1",
@@ -91,6 +97,7 @@ def main() -> None:
         "--include-package=httpx",
         "--include-package=prompt_toolkit",
         f"--include-data-file={data_file}=mirava_full_json.json",
+        f"--include-data-file={catalog_file}=mirava/catalog.sqlite",
         str(entry),
         *sys.argv[1:],
     ]
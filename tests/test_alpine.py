@@ -0,0 +1,75 @@
+import asyncio
+import io
+import tarfile
+
+import httpx
+
+from mirava.registry.os.alpine import AlpineRegistry, _index_key
+from mirava.registry.os.generic import IndexMemo
+
+
+def apkindex(*names):
+    body = "".join(f"P:{n}\nV:1.0-r0\n\n" for n in names).encode()
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tf:
+        info = tarfile.TarInfo("APKINDEX")
+        info.size = len(body)
+        tf.addfile(info, io.BytesIO(body))
+    return buf.getvalue()
+
+
+def serve(indexes):
+    """Client answering ``path -> body``, every body with the same Last-Modified."""
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        body = indexes.get(request.url.path)
+        if body is None:
+            return httpx.Response(404)
+        return httpx.Response(200, content=body, headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), requests
+
+
+def test_memo_key_names_branch_repo_and_arch():
+    a = _index_key("https://m/alpine/v3.19/main/x86_64/APKINDEX.tar.gz", "lm|1")
+    b = _index_key("https://m/alpine/v3.20/main/aarch64/APKINDEX.tar.gz", "lm|1")
+    assert a == "apk:v3.19/main/x86_64:lm|1"
+    assert a != b
+    assert _index_key("https://m/alpine/v3.19/main/x86_64/APKINDEX.tar.gz", None) is None
+
+
+def test_same_validators_on_different_branches_are_not_shared():
+    # Same Last-Modified and (tar-block padded) size: only the branch tells them apart.
+    assert len(apkindex("curl")) == len(apkindex("wget"))
+
+    async def main():
+        client, _ = serve({
+            "/alpine/v3.19/main/x86_64/APKINDEX.tar.gz": apkindex("curl"),
+            "/alpine/v3.20/main/x86_64/APKINDEX.tar.gz": apkindex("wget"),
+        })
+        memo, reg = IndexMemo(), AlpineRegistry()
+        async with client:
+            old = await reg.check_packages(client, "https://a/alpine", ["curl", "wget"], branch="v3.19", memo=memo)
+            new = await reg.check_packages(client, "https://b/alpine", ["curl", "wget"], branch="v3.20", memo=memo)
+        assert old == {"curl": (True, "found"), "wget": (False, "not found")}
+        assert new == {"curl": (False, "not found"), "wget": (True, "found")}
+
+    asyncio.run(main())
+
+
+def test_concurrent_mirrors_of_one_snapshot_agree():
+    async def main():
+        client, requests = serve({"/alpine/v3.20/main/x86_64/APKINDEX.tar.gz": apkindex("curl", "gcc")})
+        memo, reg = IndexMemo(), AlpineRegistry()
+        async with client:
+            results = await asyncio.gather(*(
+                reg.check_packages(client, f"https://m{i}/alpine", ["curl", "zsh"], branch="v3.20", memo=memo)
+                for i in range(4)
+            ))
+        assert all(r == {"curl": (True, "found"), "zsh": (False, "not found")} for r in results)
+        # Waiters close their response and do not fetch again when the shared scan succeeds.
+        assert len(requests) == 4
+
+    asyncio.run(main())
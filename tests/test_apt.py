@@ -0,0 +1,73 @@
+import asyncio
+import gzip
+
+import httpx
+import pytest
+
+from mirava.registry.os.apt import AptRegistry, _iter_package_names, _iter_stanzas
+from mirava.registry.os.generic import IndexMemo
+
+
+async def chunked(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def collect(aiter):
+    return [item async for item in aiter]
+
+
+def packages_text(names):
+    return "".join(f"Package: {n}\nVersion: 1.0\nDescription: {n} " + "x" * 50 + "\n\n" for n in names).encode()
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 100_000])
+def test_apt_concatenated_gzip_members(size):
+    first, second = ["curl", "gcc"], ["vim", "zsh"]
+    data = gzip.compress(packages_text(first)) + gzip.compress(packages_text(second))
+    assert asyncio.run(collect(_iter_package_names(chunked(data, size)))) == first + second
+
+
+def test_apt_stanza_split_across_chunks():
+    text = packages_text(["curl", "gcc", "vim"])
+    data = gzip.compress(text)
+    # Tiny chunks split stanzas, "Package:" lines and the blank-line separators.
+    stanzas = asyncio.run(collect(_iter_stanzas(chunked(data, 3))))
+    assert stanzas == [s for s in text.split(b"\n\n") if s]
+
+
+def test_apt_last_stanza_without_trailing_blank_line():
+    data = gzip.compress(b"Package: curl\n\nPackage: gcc\nVersion: 1")
+    assert asyncio.run(collect(_iter_package_names(chunked(data, 5)))) == ["curl", "gcc"]
+
+
+def test_apt_mirrors_serving_the_same_snapshot_share_one_scan():
+    data = gzip.compress(packages_text(["curl", "gcc", "vim"]))
+    requests, served = [], []
+
+    def mirror(request):
+        requests.append(str(request.url))
+
+        async def body():
+            for chunk in (data[:50], data[50:]):
+                served.append(request.url.host)
+                yield chunk
+
+        headers = {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT", "Content-Length": str(len(data))}
+        return httpx.Response(200, headers=headers, content=body())
+
+    async def main():
+        memo, registry = IndexMemo(), AptRegistry()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(mirror)) as client:
+            return [
+                await registry.check_packages(client, url, ["gcc", "nano"], suite="noble", memo=memo)
+                for url in ("https://a/ubuntu", "https://b/ubuntu")
+            ]
+
+    first, second = asyncio.run(main())
+    assert first == second == {"gcc": (True, "found"), "nano": (False, "not found")}
+    assert requests == [
+        "https://a/ubuntu/dists/noble/main/binary-amd64/Packages.gz",
+        "https://b/ubuntu/dists/noble/main/binary-amd64/Packages.gz",
+    ]
+    assert set(served) == {"a"}
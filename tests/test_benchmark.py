@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+
+from mirava.benchmark import BenchmarkConfig, measure_throughput
+
+BODY = b"x" * 10_000
+
+
+def measure(handler, config):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await measure_throughput(client, "https://m/pool/big.deb", config)
+
+    return asyncio.run(main())
+
+
+def test_ranged_samples_stop_at_the_budget():
+    ranges = []
+
+    def mirror(request):
+        ranges.append(request.headers["range"])
+        return httpx.Response(206, content=BODY[:4000])
+
+    t = measure(mirror, BenchmarkConfig(budget_bytes=4000, samples=3))
+    assert ranges == ["bytes=0-3999"] * 3
+    assert (t.samples, t.bytes, t.detail) == (3, 12_000, "")
+    assert t.mbps is not None and t.ttfb_ms is not None and t.jitter_ms is not None
+
+
+def test_servers_ignoring_range_are_cut_off():
+    async def chunks():
+        for i in range(0, len(BODY), 1000):
+            yield BODY[i:i + 1000]
+
+    t = measure(lambda request: httpx.Response(200, content=chunks()), BenchmarkConfig(budget_bytes=2500, samples=1))
+    assert t.bytes == 3000
+    assert t.jitter_ms is None
+
+
+def test_http_errors_end_the_benchmark():
+    calls = []
+
+    def missing(request):
+        calls.append(request)
+        return httpx.Response(404)
+
+    t = measure(missing, BenchmarkConfig(samples=3))
+    assert len(calls) == 1
+    assert (t.mbps, t.samples, t.detail) == (None, 0, "http 404")
+
+
+def test_transport_errors_are_retried():
+    def broken(request):
+        raise httpx.ConnectError("refused")
+
+    t = measure(broken, BenchmarkConfig(samples=2))
+    assert (t.mbps, t.samples, t.detail) == (None, 0, "refused")
@@ -0,0 +1,127 @@
+import asyncio
+
+import httpx
+import pytest
+
+from mirava.cache import IndexCache, open_index
+
+URL = "https://m/dists/noble/main/binary-amd64/Packages.gz"
+BODY = bytes(range(256)) * 64
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+class Mirror:
+    """Serves ``BODY`` in 1 kB chunks, honouring validators and ranges like a static file server."""
+
+    def __init__(self, ranges=True, etag='"v1"'):
+        self.ranges = ranges
+        self.etag = etag
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        headers = {"ETag": self.etag, "Last-Modified": LAST_MODIFIED}
+        if request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304, headers=headers)
+        status, start = 200, 0
+        wanted = request.headers.get("range", "")
+        if self.ranges and wanted and request.headers.get("if-range") in (self.etag, LAST_MODIFIED):
+            status, start = 206, int(wanted[len("bytes="):].rstrip("-"))
+            headers["Content-Range"] = f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"
+        body = BODY[start:]
+        headers["Content-Length"] = str(len(body))
+
+        async def chunks():
+            for i in range(0, len(body), 1024):
+                yield body[i:i + 1024]
+
+        return httpx.Response(status, headers=headers, content=chunks())
+
+
+async def read(client, cache, limit=None):
+    """Read the index through ``open_index``, stopping after ``limit`` bytes."""
+    data = b""
+    async with open_index(client, URL, cache) as resp:
+        async for chunk in resp.aiter_bytes():
+            data += chunk
+            if limit is not None and len(data) >= limit:
+                break
+        return resp.status_code, resp.from_cache, resp.fingerprint, data
+
+
+def run(mirror, tmp_path, *limits):
+    async def main():
+        cache = IndexCache(root=str(tmp_path))
+        async with httpx.AsyncClient(transport=httpx.MockTransport(mirror)) as client:
+            return [await read(client, cache, limit) for limit in limits], cache
+
+    return asyncio.run(main())
+
+
+def test_complete_body_is_revalidated_with_304(tmp_path):
+    mirror = Mirror()
+    (first, second), cache = run(mirror, tmp_path, None, None)
+    assert first[:2] == (200, False) and first[3] == BODY
+    assert second == (200, True, f"{LAST_MODIFIED}|{len(BODY)}", BODY)
+    assert mirror.requests[1].headers["if-none-match"] == '"v1"'
+    assert cache.get(URL).complete
+
+
+def test_early_exit_keeps_a_prefix_and_resumes_with_range(tmp_path):
+    mirror = Mirror()
+    (partial, resumed, cached), cache = run(mirror, tmp_path, 3000, None, None)
+    assert partial[3] == BODY[:3072]
+    # The prefix read (whole chunks) was kept, and only the rest was asked for.
+    assert mirror.requests[1].headers["range"] == "bytes=3072-"
+    assert mirror.requests[1].headers["if-range"] == '"v1"'
+    assert resumed == (200, False, f"{LAST_MODIFIED}|{len(BODY)}", BODY)
+    assert cached == (200, True, f"{LAST_MODIFIED}|{len(BODY)}", BODY)
+    assert cache.get(URL).complete
+
+
+def test_partial_prefix_grows_across_early_exits(tmp_path):
+    (_, _), cache = run(Mirror(), tmp_path, 1000, 5000)
+    entry = cache.get(URL)
+    assert not entry.complete
+    with open(entry.path, "rb") as f:
+        assert f.read() == BODY[:5120]
+
+
+def test_weak_etag_resumes_on_last_modified(tmp_path):
+    mirror = Mirror(etag='W/"v1"')
+    (_, resumed), _ = run(mirror, tmp_path, 1000, None)
+    assert mirror.requests[1].headers["if-range"] == LAST_MODIFIED
+    assert resumed[3] == BODY
+
+
+def test_mirror_ignoring_range_replaces_the_entry(tmp_path):
+    mirror = Mirror(ranges=False)
+    (_, full), cache = run(mirror, tmp_path, 1000, None)
+    assert "range" in mirror.requests[1].headers
+    assert full == (200, False, f"{LAST_MODIFIED}|{len(BODY)}", BODY)
+    assert cache.get(URL).complete
+
+
+@pytest.mark.parametrize("status, content_range", [
+    (206, f"bytes 0-9/{len(BODY)}"),
+    (416, f"bytes */{len(BODY)}"),
+])
+def test_unexpected_range_refetches_the_whole_index(tmp_path, status, content_range):
+    mirror = Mirror()
+
+    def wrong(request):
+        if "range" in request.headers:
+            return httpx.Response(status, headers={"Content-Range": content_range}, content=BODY[:10])
+        return mirror(request)
+
+    async def main():
+        cache = IndexCache(root=str(tmp_path))
+        async with httpx.AsyncClient(transport=httpx.MockTransport(Mirror())) as client:
+            await read(client, cache, 1000)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(wrong)) as client:
+            return await read(client, cache), cache
+
+    (status, from_cache, _, data), cache = asyncio.run(main())
+    assert (status, from_cache, data) == (200, False, BODY)
+    assert "range" not in mirror.requests[0].headers
+    assert cache.get(URL).complete
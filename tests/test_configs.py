@@ -0,0 +1,248 @@
+import json
+
+import pytest
+
+from mirava import configs
+from mirava.configs import _set_ini, _set_key, render
+from mirava.models import CheckResult
+
+
+def result(name, url, reachable=True, package_ok=True):
+    return CheckResult("m", name, url, reachable, 10.0, package_ok)
+
+
+@pytest.fixture
+def files(monkeypatch):
+    """Pretend file system for ``current_text``: path -> contents."""
+    existing = {}
+    monkeypatch.setattr(configs, "current_text", lambda path: existing.get(path, ""))
+    monkeypatch.setattr(configs, "_pip_conf_path", lambda: "/home/u/.config/pip/pip.conf")
+    monkeypatch.setenv("HOME", "/home/u")
+    return existing
+
+
+@pytest.mark.parametrize("text, values, expected", [
+    # New file.
+    ("", {"index-url": "https://m/simple"}, "[global]\nindex-url = https://m/simple\n"),
+    # Existing key replaced, other keys and sections kept.
+    (
+        "[global]\ntimeout = 60\nindex-url = https://old/simple\n[install]\nuser = true\n",
+        {"index-url": "https://m/simple"},
+        "[global]\nindex-url = https://m/simple\ntimeout = 60\n[install]\nuser = true\n",
+    ),
+    # Continuation lines of a replaced value go with it.
+    (
+        "[global]\nindex-url =\n    https://a/simple\n    https://b/simple\ntimeout = 5\n",
+        {"index-url": "https://m/simple"},
+        "[global]\nindex-url = https://m/simple\ntimeout = 5\n",
+    ),
+    # Continuation lines of other keys stay.
+    (
+        "[global]\nextra-index-url =\n    https://a/simple\n",
+        {"index-url": "https://m/simple"},
+        "[global]\nindex-url = https://m/simple\nextra-index-url =\n    https://a/simple\n",
+    ),
+    # Duplicate keys collapse into one.
+    (
+        "[global]\nindex-url = https://a\nindex-url = https://b\n",
+        {"index-url": "https://m/simple"},
+        "[global]\nindex-url = https://m/simple\n",
+    ),
+    # Section missing: appended after a blank line; same key elsewhere untouched.
+    (
+        "[install]\nindex-url = https://keep\n",
+        {"index-url": "https://m/simple"},
+        "[install]\nindex-url = https://keep\n\n[global]\nindex-url = https://m/simple\n",
+    ),
+])
+def test_set_ini(text, values, expected):
+    assert _set_ini(text, "global", values) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", "registry=https://m/\n"),
+    ("registry=https://old/\n", "registry=https://m/\n"),
+    ("//reg/:_authToken=x\nregistry = https://old/\n", "//reg/:_authToken=x\nregistry=https://m/\n"),
+    ("registry=https://a/\nsave-exact=true\nregistry=https://b/\n", "registry=https://m/\nsave-exact=true\n"),
+    ("@scope:registry=https://s/\n", "@scope:registry=https://s/\nregistry=https://m/\n"),
+])
+def test_set_key(text, expected):
+    assert _set_key(text, "registry", "https://m/") == expected
+
+
+def test_only_qualifying_results_in_rank_order(files):
+    results = [
+        result("Arch Linux", "https://a/archlinux/"),
+        result("Arch Linux", "https://b/archlinux", package_ok=False),
+        result("Arch Linux", "https://c/archlinux", reachable=False),
+        result("Arch Linux", "https://d/arch/$repo/os/$arch"),
+        result("Arch Linux", "https://a/archlinux"),
+    ]
+    [mirrorlist] = render(results, {})
+    assert mirrorlist.path == "/etc/pacman.d/mirrorlist"
+    assert mirrorlist.content.splitlines()[1:] == [
+        "Server = https://a/archlinux/$repo/os/$arch",
+        "Server = https://d/arch/$repo/os/$arch",
+    ]
+
+
+def test_manjaro_servers_have_no_os_level(files):
+    [mirrorlist] = render([result("Manjaro", "https://m/manjaro/stable/")], {})
+    assert mirrorlist.content.splitlines()[1:] == ["Server = https://m/manjaro/stable/$repo/$arch"]
+
+
+def test_pacman_keeps_at_most_five_servers(files):
+    results = [result("Manjaro", f"https://m{i}/$repo/$arch") for i in range(8)]
+    [mirrorlist] = render(results, {})
+    assert mirrorlist.content.count("Server = ") == configs.FALLBACK_MIRRORS
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://m/alpine", ["https://m/alpine/v3.20/main", "https://m/alpine/v3.20/community"]),
+    ("https://m/alpine/@@version@@/main", ["https://m/alpine/v3.20/main", "https://m/alpine/v3.20/community"]),
+    ("https://m/alpine/v3.19/community", ["https://m/alpine/v3.19/main", "https://m/alpine/v3.19/community"]),
+])
+def test_alpine(files, url, expected):
+    [repositories] = render([result("Alpine", url), result("Alpine", "https://second/alpine")], {"branch": "v3.20"})
+    assert repositories.content.splitlines()[1:] == expected
+
+
+@pytest.mark.parametrize("url, values", [
+    ("https://m/pypi", {"index-url": "https://m/pypi/simple"}),
+    ("https://m/simple/", {"index-url": "https://m/simple"}),
+    ("http://m:8080/pypi", {"index-url": "http://m:8080/pypi/simple", "trusted-host": "m:8080"}),
+])
+def test_pip(files, url, values):
+    files["/home/u/.config/pip/pip.conf"] = "[global]\ntimeout = 60\n"
+    [conf] = render([result("PyPI", url)], {})
+    assert conf.content == _set_ini("[global]\ntimeout = 60\n", "global", values)
+
+
+def test_npm_and_yarn_share_npmrc(files):
+    for name in ("npm", "Yarn"):
+        [npmrc] = render([result(name, "https://m/npm")], {})
+        assert npmrc.path.endswith(".npmrc")
+        assert npmrc.content == "registry=https://m/npm/\n"
+
+
+def test_docker_merges_daemon_json(files):
+    files["/etc/docker/daemon.json"] = '{"log-driver": "local", "registry-mirrors": ["https://old"]}'
+    [daemon] = render([result("Docker Registry", f"https://d{i}/") for i in range(7)], {})
+    assert json.loads(daemon.content) == {
+        "log-driver": "local",
+        "registry-mirrors": [f"https://d{i}" for i in range(5)],
+    }
+
+
+def test_docker_refuses_invalid_daemon_json(files):
+    files["/etc/docker/daemon.json"] = "{not json"
+    with pytest.raises(ValueError, match="not valid JSON"):
+        render([result("Docker Registry", "https://d")], {})
+
+
+@pytest.mark.parametrize("name, suite, expected", [
+    ("Ubuntu", "noble", ["noble", "noble-updates"]),
+    ("Debian", "bookworm", ["bookworm", "bookworm-updates"]),
+    ("Kali", "kali-rolling", ["kali-rolling"]),
+])
+def test_apt_suites(files, name, suite, expected):
+    mirrors, sources = render([result(name, "https://a/x/"), result(name, "https://b/x")], {"suite": suite})
+    assert mirrors.content == "https://a/x\nhttps://b/x\n"
+    lines = [line.split() for line in sources.content.splitlines()[1:]]
+    assert [line[2] for line in lines] == expected
+    assert {line[1] for line in lines} == {f"mirror+file:{mirrors.path}"}
+
+
+@pytest.mark.parametrize("name, suite, component, expected", [
+    ("Ubuntu", "noble", "main", "main restricted universe multiverse"),
+    ("Debian", "bookworm", "main", "main contrib non-free non-free-firmware"),
+    ("Debian", "trixie", "main", "main contrib non-free non-free-firmware"),
+    ("Debian", "bullseye", "main", "main contrib non-free"),
+    ("Debian", "11", "main", "main contrib non-free"),
+    ("Debian", "bookworm", "main,contrib", "main contrib"),
+    ("Mint", "wilma", "main", "main"),
+])
+def test_apt_components(files, name, suite, component, expected):
+    _, sources = render([result(name, "https://a/x")], {"suite": suite, "component": component})
+    assert sources.content.splitlines()[1].split(None, 3)[3] == expected
+
+
+def test_apt_needs_a_suite(files):
+    with pytest.raises(ValueError, match="suite"):
+        render([result("Debian", "https://a/debian")], {})
+
+
+def test_apt_switches_off_distribution_entries(files):
+    files["/etc/apt/sources.list"] = (
+        "deb http://ir.archive.ubuntu.com/ubuntu noble main\n"
+        "deb [arch=amd64 signed-by=/k.gpg] http://archive.ubuntu.com/ubuntu/ noble-updates main\n"
+        "deb http://b/ubuntu noble universe\n"
+        "deb http://security.ubuntu.com/ubuntu noble-security main\n"
+        "deb-src http://archive.ubuntu.com/ubuntu noble main\n"
+    )
+    files["/etc/apt/sources.list.d/ubuntu.sources"] = (
+        "Types: deb\nURIs: http://archive.ubuntu.com/ubuntu\nSuites: noble noble-updates noble-backports\n"
+        "Components: main\n"
+        "\n"
+        "Types: deb\nURIs: http://archive.ubuntu.com/ubuntu\nSuites: noble\nEnabled: yes\n"
+        "\n"
+        "Types: deb\nURIs: http://security.ubuntu.com/ubuntu\nSuites: noble-security\n"
+    )
+    results = [result("Ubuntu", "https://a/ubuntu"), result("Ubuntu", "https://b/ubuntu/")]
+    out = {f.path: f.content for f in render(results, {"suite": "noble"})}
+    assert out["/etc/apt/sources.list"] == (
+        "# disabled by mirava: deb http://ir.archive.ubuntu.com/ubuntu noble main\n"
+        "# disabled by mirava: deb [arch=amd64 signed-by=/k.gpg] http://archive.ubuntu.com/ubuntu/ noble-updates main\n"
+        "# disabled by mirava: deb http://b/ubuntu noble universe\n"
+        "deb http://security.ubuntu.com/ubuntu noble-security main\n"
+        "deb-src http://archive.ubuntu.com/ubuntu noble main\n"
+    )
+    assert out["/etc/apt/sources.list.d/ubuntu.sources"] == (
+        "Types: deb\nURIs: http://archive.ubuntu.com/ubuntu\nSuites: noble-backports\nComponents: main\n"
+        "\n"
+        "Types: deb\nURIs: http://archive.ubuntu.com/ubuntu\nSuites: noble\nEnabled: no\n"
+        "\n"
+        "Types: deb\nURIs: http://security.ubuntu.com/ubuntu\nSuites: noble-security\n"
+    )
+
+
+def test_apt_keeps_third_party_repositories_on_the_same_suite(files):
+    files["/etc/apt/sources.list"] = (
+        "deb http://ppa.launchpadcontent.net/deadsnakes/ppa/ubuntu noble main\n"
+        "deb [signed-by=/k.gpg] https://download.docker.com/linux/ubuntu noble stable\n"
+    )
+    files["/etc/apt/sources.list.d/ubuntu.sources"] = (
+        "Types: deb\nURIs: https://apt.example.com/ubuntu http://archive.ubuntu.com/ubuntu\nSuites: noble\n"
+    )
+    paths = [f.path for f in render([result("Ubuntu", "https://a/ubuntu")], {"suite": "noble"})]
+    assert "/etc/apt/sources.list" not in paths
+    assert "/etc/apt/sources.list.d/ubuntu.sources" not in paths
+
+
+def test_apt_leaves_unrelated_sources_alone(files):
+    files["/etc/apt/sources.list"] = "deb http://security/ubuntu noble-security main\n"
+    paths = [f.path for f in render([result("Ubuntu", "https://a/ubuntu")], {"suite": "noble"})]
+    assert "/etc/apt/sources.list" not in paths
+
+
+def test_unsupported_or_failed_types_render_nothing(files):
+    assert render([result("Maven", "https://m")], {}) == []
+    assert render([result("PyPI", "https://m", reachable=False)], {}) == []
+
+
+def test_write_export_and_in_place(tmp_path):
+    target = tmp_path / "etc" / "npmrc"
+    target.parent.mkdir()
+    target.write_text("registry=https://old/\n")
+    target.chmod(0o600)
+    config = configs.ConfigFile(str(target), "registry=https://m/\n")
+
+    exported = configs.write(config, str(tmp_path / "out"))
+    assert exported == str(tmp_path / "out") + str(target)
+    assert open(exported).read() == config.content
+    assert target.read_text() == "registry=https://old/\n"
+
+    assert configs.write(config) == str(target)
+    assert target.read_text() == config.content
+    assert (target.stat().st_mode & 0o777) == 0o600
+    assert (tmp_path / "etc" / "npmrc.bak").read_text() == "registry=https://old/\n"
@@ -0,0 +1,36 @@
+import asyncio
+
+import httpx
+import pytest
+
+from mirava.deadlines import Deadlines, guard
+
+LIMITS = Deadlines(min_bytes_per_s=100_000, grace_s=0.05)
+
+
+async def stream(chunks, delay):
+    for _ in range(chunks):
+        await asyncio.sleep(delay)
+        yield b"x" * 1000
+
+
+async def consume(chunks, work=0.0):
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        # Time spent parsing is the consumer's, not the mirror's.
+        await asyncio.sleep(work)
+    return received
+
+
+def test_slow_consumer_is_not_blamed_on_the_mirror():
+    assert asyncio.run(consume(guard(stream(10, 0), LIMITS), work=0.02)) == 10_000
+
+
+def test_slow_mirror_is_abandoned():
+    with pytest.raises(httpx.ReadTimeout, match="transfer below 100 kB/s"):
+        asyncio.run(consume(guard(stream(20, 0.02), LIMITS)))
+
+
+def test_disabled_guard_passes_everything():
+    assert asyncio.run(consume(guard(stream(5, 0.02), Deadlines(min_bytes_per_s=0)))) == 5000
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from mirava.registry.os.generic import IndexMemo
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Scanner:
+    """A scan that lists ``index`` and blocks until ``release`` is set."""
+
+    def __init__(self, index, fail=False):
+        self.index = set(index)
+        self.fail = fail
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, wanted):
+        self.calls.append(list(wanted))
+        await self.release.wait()
+        if self.fail:
+            raise OSError("broken stream")
+        return self.index & set(wanted)
+
+
+def test_identical_snapshots_are_scanned_once():
+    async def main():
+        memo = IndexMemo()
+        first, second = Scanner({"curl"}), Scanner({"curl"})
+        a = asyncio.ensure_future(memo.lookup("k", ["curl", "gcc"], first))
+        b = asyncio.ensure_future(memo.lookup("k", ["curl"], second))
+        await asyncio.sleep(0)
+        first.release.set()
+        assert await a == {"curl"}
+        assert await b == {"curl"}
+        assert (first.calls, second.calls) == ([["curl", "gcc"]], [])
+
+    run(main())
+
+
+def test_waiter_scans_only_what_is_still_missing():
+    async def main():
+        memo = IndexMemo()
+        first, second = Scanner({"curl", "vim"}), Scanner({"curl", "vim"})
+        a = asyncio.ensure_future(memo.lookup("k", ["curl"], first))
+        b = asyncio.ensure_future(memo.lookup("k", ["curl", "vim"], second))
+        await asyncio.sleep(0)
+        first.release.set()
+        await a
+        await asyncio.sleep(0)
+        second.release.set()
+        assert await b == {"curl", "vim"}
+        assert second.calls == [["vim"]]
+
+    run(main())
+
+
+def test_waiter_gives_up_on_its_own_deadline():
+    async def main():
+        memo = IndexMemo()
+        first = Scanner({"curl"})
+        a = asyncio.ensure_future(memo.lookup("k", ["curl"], first))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(memo.lookup("k", ["curl"], Scanner({"curl"})), 0.01)
+        assert not a.done()
+        first.release.set()
+        assert await a == {"curl"}
+
+    run(main())
+
+
+@pytest.mark.parametrize("cancel", [False, True])
+def test_waiter_falls_back_when_the_shared_scan_ends_badly(cancel):
+    async def main():
+        memo = IndexMemo()
+        first, second = Scanner({"curl"}, fail=not cancel), Scanner({"curl"})
+        a = asyncio.ensure_future(memo.lookup("k", ["curl"], first))
+        b = asyncio.ensure_future(memo.lookup("k", ["curl"], second))
+        await asyncio.sleep(0)
+        if cancel:
+            a.cancel()
+        else:
+            first.release.set()
+        await asyncio.gather(a, return_exceptions=True)
+        second.release.set()
+        assert await b == {"curl"}
+        assert second.calls == [["curl"]]
+
+    run(main())
@@ -0,0 +1,69 @@
+import pytest
+
+from mirava.metrics import MetricsRegistry, wants_openmetrics
+
+
+def registry():
+    metrics = MetricsRegistry()
+    up = metrics.gauge("mirava_endpoint_up", "1 if up", ("endpoint", "url"))
+    requests = metrics.counter("mirava_requests", "Requests", ("result",))
+    latency = metrics.histogram("mirava_latency_seconds", "Latency", ("endpoint",), buckets=(0.5, 0.1))
+    return metrics, up, requests, latency
+
+
+def test_prometheus_format():
+    metrics, up, requests, latency = registry()
+    up.labels("PyPI", 'https://a/"q"\n').set(1)
+    requests.labels("hit").inc()
+    requests.labels("hit").inc(2)
+    for value in (0.05, 0.2, 3.0):
+        latency.labels("PyPI").observe(value)
+
+    assert metrics.render().splitlines() == [
+        "# HELP mirava_endpoint_up 1 if up",
+        "# TYPE mirava_endpoint_up gauge",
+        'mirava_endpoint_up{endpoint="PyPI",url="https://a/\\"q\\"\\n"} 1',
+        "# HELP mirava_requests_total Requests",
+        "# TYPE mirava_requests_total counter",
+        'mirava_requests_total{result="hit"} 3',
+        "# HELP mirava_latency_seconds Latency",
+        "# TYPE mirava_latency_seconds histogram",
+        'mirava_latency_seconds_bucket{endpoint="PyPI",le="0.1"} 1',
+        'mirava_latency_seconds_bucket{endpoint="PyPI",le="0.5"} 2',
+        'mirava_latency_seconds_bucket{endpoint="PyPI",le="+Inf"} 3',
+        'mirava_latency_seconds_sum{endpoint="PyPI"} 3.25',
+        'mirava_latency_seconds_count{endpoint="PyPI"} 3',
+    ]
+
+
+def test_openmetrics_names_counter_family_without_suffix():
+    metrics, _, requests, _ = registry()
+    requests.labels("miss").inc()
+    text = metrics.render(openmetrics=True)
+    assert "# TYPE mirava_requests counter\n" in text
+    assert 'mirava_requests_total{result="miss"} 1\n' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_labels_must_match_the_declared_names():
+    _, up, _, _ = registry()
+    with pytest.raises(ValueError):
+        up.labels("PyPI")
+
+
+def test_write_textfile(tmp_path):
+    metrics, up, _, _ = registry()
+    up.labels("PyPI", "https://a/").set(0)
+    path = tmp_path / "textfile" / "mirava.prom"
+    metrics.write_textfile(str(path))
+    assert path.read_text(encoding="utf-8") == metrics.render()
+    assert [p.name for p in path.parent.iterdir()] == ["mirava.prom"]
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/openmetrics-text; version=1.0.0,text/plain;q=0.5", True),
+    ("text/plain", False),
+    ("", False),
+])
+def test_negotiation(accept, expected):
+    assert wants_openmetrics(accept) is expected
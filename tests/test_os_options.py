@@ -0,0 +1,43 @@
+import pytest
+
+from mirava.registry.factory import registry_for
+from mirava.registry.os import alpine, apt, pacman
+from mirava.utils import os_defaults
+
+
+def test_unknown_host_sets_no_os_options():
+    assert os_defaults({}) == (None, {})
+
+
+@pytest.mark.parametrize("info, target, expected", [
+    ({"ID": "ubuntu", "VERSION_CODENAME": "noble"}, "Ubuntu", {"suite": "noble"}),
+    ({"ID": "rocky", "VERSION_ID": "9.4"}, "Rocky Linux", {"releasever": "9.4"}),
+])
+def test_host_options(info, target, expected):
+    assert os_defaults(info) == (target, expected)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Alpine", {"branch": "v3.18", "repo": "main", "arch": "x86_64"}),
+    ("Arch Linux", {"repo": "all", "arch": "x86_64"}),
+    ("Debian", {"component": "main", "arch": "amd64"}),
+    ("PyPI", {}),
+])
+def test_registry_defaults(name, expected):
+    assert registry_for(name).default_os_kwargs() == expected
+
+
+def test_defaults_build_working_index_urls():
+    assert alpine._index_url("https://m/alpine", registry_for("Alpine").default_os_kwargs()) == (
+        "https://m/alpine/v3.18/main/x86_64/APKINDEX.tar.gz"
+    )
+    assert pacman._db_url("https://m/archlinux", registry_for("Arch Linux").default_os_kwargs()) == (
+        "https://m/archlinux/core/os/x86_64/core.db"
+    )
+    manjaro = registry_for("Manjaro")
+    assert pacman._db_url("https://m/manjaro/stable/", manjaro.default_os_kwargs(), layout=manjaro.layout) == (
+        "https://m/manjaro/stable/core/x86_64/core.db"
+    )
+    assert apt._index_location("https://m/debian/", {"suite": "bookworm", **apt.DEFAULTS}) == (
+        "https://m/debian", "bookworm", "main/binary-amd64/Packages.gz"
+    )
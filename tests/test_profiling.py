@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+from mirava.models import CheckResult, Span
+from mirava.profiling import Phase, collect, format_breakdown, span, write_chrome_trace
+
+
+def result(url, *spans):
+    return CheckResult("m", "Debian", url, True, 10.0, None, spans=list(spans))
+
+
+def test_spans_are_only_recorded_inside_collect():
+    with span("parse"):
+        pass
+    with collect() as spans:
+        with span("parse", "Packages.gz"):
+            pass
+    assert [(s.name, s.target) for s in spans] == [("parse", "Packages.gz")]
+
+
+def test_tasks_started_inside_collect_record_into_it():
+    async def gunzip():
+        phase = Phase("gunzip", "Packages.gz")
+        for _ in range(3):
+            with phase:
+                await asyncio.sleep(0)
+
+    async def main():
+        with collect() as spans:
+            await asyncio.ensure_future(gunzip())
+        return spans
+
+    [s] = asyncio.run(main())
+    # A phase entered once per chunk is reported as one span.
+    assert (s.name, s.target) == ("gunzip", "Packages.gz")
+
+
+def test_breakdown_groups_by_phase_and_file_largest_first():
+    results = [
+        result("https://a/", Span("download", 0.0, 30.0, "Packages.gz"), Span("connect", 0.0, 5.0)),
+        result("https://b/", Span("download", 0.0, 10.0, "Packages.gz"), Span("connect", 0.0, 7.0)),
+    ]
+    assert format_breakdown(results) == [
+        ["download", "Packages.gz", "2", "40ms", "20.0ms", "30.0ms"],
+        ["connect", "", "2", "12ms", "6.0ms", "7.0ms"],
+    ]
+
+
+def test_chrome_trace_has_one_track_per_url(tmp_path):
+    results = [
+        result("https://a/", Span("connect", 100.0, 5.0)),
+        result("https://b/", Span("download", 100.5, 2.0, "Release")),
+    ]
+    path = tmp_path / "trace.json"
+    write_chrome_trace(results, str(path))
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+    tracks = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert tracks == {1: "m Debian https://a/", 2: "m Debian https://b/"}
+    timed = [(e["tid"], e["name"], e["ts"], e["dur"]) for e in events if e["ph"] == "X"]
+    assert timed == [(1, "connect", 0.0, 5000.0), (2, "download Release", 500000.0, 2000.0)]
@@ -0,0 +1,158 @@
+import asyncio
+
+import httpx
+import pytest
+
+from mirava.registry.composer import ComposerRegistry
+from mirava.registry.maven import MavenRegistry
+from mirava.registry.nodejs import NodeJSRegistry
+from mirava.registry.nuget import NuGetRegistry
+
+
+class Site:
+    """Serves ``routes`` (url -> status or (status, json)) and records each request."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+
+    async def __call__(self, request):
+        url = str(request.url)
+        self.requests.append((request.method, url))
+        route = self.routes.get(url, 404)
+        status, body = route if isinstance(route, tuple) else (route, None)
+        return httpx.Response(status, json=body)
+
+
+def check(registry, site, url, packages):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(site)) as client:
+            return await registry.check_packages(client, url, packages)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("package, expected", [
+    ("org.slf4j:slf4j-api", (True, "found")),
+    ("org.slf4j:slf4j-api:2.0.9", (True, "found")),
+    ("org.slf4j:slf4j-api:0.0.1", (False, "not found")),
+    ("slf4j-api", (False, "expected group:artifact[:version]")),
+])
+def test_maven(package, expected):
+    site = Site({
+        "https://m/maven2/org/slf4j/slf4j-api/maven-metadata.xml": 200,
+        "https://m/maven2/org/slf4j/slf4j-api/2.0.9/slf4j-api-2.0.9.pom": 200,
+    })
+    assert check(MavenRegistry(), site, "https://m/maven2/", [package]) == {package: expected}
+
+
+def test_maven_skips_single_file_entries():
+    site = Site({})
+    assert check(MavenRegistry(), site, "https://m/gradle/gradle-8.5-bin.zip", ["a:b"]) == {
+        "a:b": (None, "not a Maven repository"),
+    }
+    assert site.requests == []
+
+
+def test_nuget_reads_the_service_index_once():
+    site = Site({
+        "https://m/nuget/v3/index.json": (200, {"resources": [
+            {"@id": "https://m/nuget/search", "@type": "SearchQueryService"},
+            {"@id": "https://m/flat", "@type": ["PackageBaseAddress/3.0.0"]},
+        ]}),
+        "https://m/flat/newtonsoft.json/index.json": (200, {"versions": ["13.0.1", "13.0.3"]}),
+    })
+    statuses = check(NuGetRegistry(), site, "https://m/nuget", [
+        "Newtonsoft.Json", "Newtonsoft.Json@13.0.3", "Newtonsoft.Json@1.0.0", "Missing",
+    ])
+    assert statuses == {
+        "Newtonsoft.Json": (True, "found"),
+        "Newtonsoft.Json@13.0.3": (True, "found"),
+        "Newtonsoft.Json@1.0.0": (False, "version 1.0.0 not found"),
+        "Missing": (False, "not found"),
+    }
+    assert site.requests.count(("GET", "https://m/nuget/v3/index.json")) == 1
+
+
+def test_nuget_falls_back_to_the_flat_container():
+    site = Site({"https://m/nuget/v3-flatcontainer/serilog/index.json": (200, {"versions": ["3.1.1"]})})
+    assert check(NuGetRegistry(), site, "https://m/nuget/", ["Serilog"]) == {"Serilog": (True, "found")}
+
+
+def test_composer_uses_the_published_metadata_url():
+    site = Site({
+        "https://m/packagist/packages.json": (200, {"metadata-url": "/meta/%package%.json"}),
+        "https://m/meta/monolog/monolog.json": 200,
+    })
+    statuses = check(ComposerRegistry(), site, "https://m/packagist", ["Monolog/Monolog", "acme/missing", "bad"])
+    assert statuses == {
+        "Monolog/Monolog": (True, "found"),
+        "acme/missing": (False, "not found"),
+        "bad": (False, "expected vendor/package"),
+    }
+    assert site.requests.count(("GET", "https://m/packagist/packages.json")) == 1
+
+
+def test_composer_defaults_to_p2():
+    site = Site({"https://m/packagist/p2/laravel/framework.json": 200})
+    assert check(ComposerRegistry(), site, "https://m/packagist/", ["laravel/framework"]) == {
+        "laravel/framework": (True, "found"),
+    }
+
+
+def test_failed_discovery_is_not_remembered():
+    async def main():
+        nuget, composer = NuGetRegistry(), ComposerRegistry()
+        routes = {}
+        site = Site(routes)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(site)) as client:
+            # The first checks see neither a service index nor packages.json...
+            await nuget.check_packages(client, "https://m/nuget", ["Serilog", "Polly"])
+            await composer.check_packages(client, "https://m/packagist", ["a/b", "c/d"])
+            assert [url for _, url in site.requests if url.endswith(("/index.json", "/packages.json"))] == [
+                "https://m/nuget/v3/index.json",
+                "https://m/nuget/index.json",
+                "https://m/nuget/v3-flatcontainer/serilog/index.json",
+                "https://m/nuget/v3-flatcontainer/polly/index.json",
+                "https://m/packagist/packages.json",
+            ]
+            routes.update({
+                "https://m/nuget/v3/index.json": (200, {"resources": [
+                    {"@id": "https://m/flat/", "@type": "PackageBaseAddress/3.0.0"},
+                ]}),
+                "https://m/flat/serilog/index.json": (200, {"versions": ["3.1.1"]}),
+                "https://m/packagist/packages.json": (200, {"metadata-url": "/meta/%package%.json"}),
+                "https://m/meta/a/b.json": 200,
+            })
+            # ...the next ones read them once they are served.
+            return (
+                await nuget.check_packages(client, "https://m/nuget", ["Serilog"]),
+                await composer.check_packages(client, "https://m/packagist", ["a/b"]),
+            )
+
+    assert asyncio.run(main()) == ({"Serilog": (True, "found")}, {"a/b": (True, "found")})
+
+
+RELEASES = [
+    {"version": "v21.5.0", "lts": False},
+    {"version": "v20.11.1", "lts": "Iron"},
+    {"version": "v20.10.0", "lts": "Iron"},
+    {"version": "v18.19.0", "lts": "Hydrogen"},
+]
+
+
+def test_nodejs_matches_versions_from_one_index():
+    site = Site({"https://m/node/dist/index.json": (200, RELEASES)})
+    statuses = check(NodeJSRegistry(), site, "https://m/node", ["latest", "lts", "node@18", "v20.10", "16"])
+    assert statuses == {
+        "latest": (True, "found v21.5.0"),
+        "lts": (True, "found v20.11.1"),
+        "node@18": (True, "found v18.19.0"),
+        "v20.10": (True, "found v20.10.0"),
+        "16": (False, "not found"),
+    }
+    assert [url for _, url in site.requests] == ["https://m/node/index.json", "https://m/node/dist/index.json"]
+
+
+def test_nodejs_reports_a_missing_index():
+    assert check(NodeJSRegistry(), Site({}), "https://m/node/dist/", ["20"]) == {"20": (False, "index.json http 404")}
@@ -0,0 +1,122 @@
+import asyncio
+import socket
+
+import httpcore
+import httpx
+import pytest
+
+from mirava.resolver import CachingBackend, _httpx_error
+
+
+class Inner(httpcore.AsyncNetworkBackend):
+    """Records connection attempts; addresses in ``refuse`` fail to connect."""
+
+    def __init__(self, refuse=()):
+        self.refuse = set(refuse)
+        self.connected = []
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.connected.append(host)
+        if host in self.refuse:
+            raise httpcore.ConnectError(f"refused {host}")
+        return object()
+
+
+def run(main, answers):
+    """Run ``main`` with getaddrinfo answered from ``answers`` after a short delay."""
+    lookups = []
+
+    async def getaddrinfo(host, port, **kwargs):
+        lookups.append(host)
+        await asyncio.sleep(0.01)
+        if host not in answers:
+            raise socket.gaierror(f"unknown {host}")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (a, port)) for a in answers[host]]
+
+    async def wrapper():
+        asyncio.get_running_loop().getaddrinfo = getaddrinfo
+        return await main()
+
+    return asyncio.run(wrapper()), lookups
+
+
+def test_concurrent_lookups_share_one_query_and_later_ones_hit_the_cache():
+    backend = CachingBackend(Inner())
+
+    async def main():
+        first = await asyncio.gather(*(backend.resolve("m.example", 443) for _ in range(5)))
+        return first, await backend.resolve("m.example", 443)
+
+    (first, again), lookups = run(main, {"m.example": ["10.0.0.1", "10.0.0.1", "10.0.0.2"]})
+    assert lookups == ["m.example"]
+    assert first == [["10.0.0.1", "10.0.0.2"]] * 5
+    assert again == ["10.0.0.1", "10.0.0.2"]
+
+
+def test_expired_entries_are_looked_up_again():
+    backend = CachingBackend(Inner(), ttl=0)
+
+    async def main():
+        await backend.resolve("m.example", 443)
+        await backend.resolve("m.example", 443)
+
+    _, lookups = run(main, {"m.example": ["10.0.0.1"]})
+    assert lookups == ["m.example", "m.example"]
+
+
+def test_connect_falls_through_to_the_next_address():
+    inner = Inner(refuse={"10.0.0.1"})
+    backend = CachingBackend(inner)
+
+    async def main():
+        await backend.connect_tcp("m.example", 443)
+
+    run(main, {"m.example": ["10.0.0.1", "10.0.0.2"]})
+    assert inner.connected == ["10.0.0.1", "10.0.0.2"]
+
+
+def test_failed_connect_forgets_the_addresses():
+    inner = Inner(refuse={"10.0.0.1"})
+    backend = CachingBackend(inner)
+
+    async def main():
+        for _ in range(2):
+            with pytest.raises(httpcore.ConnectError):
+                await backend.connect_tcp("m.example", 443)
+
+    _, lookups = run(main, {"m.example": ["10.0.0.1"]})
+    assert lookups == ["m.example", "m.example"]
+
+
+def test_addresses_skip_the_resolver():
+    inner = Inner()
+    backend = CachingBackend(inner)
+
+    async def main():
+        await backend.connect_tcp("192.0.2.7", 80)
+
+    _, lookups = run(main, {})
+    assert lookups == [] and inner.connected == ["192.0.2.7"]
+
+
+def test_unknown_names_raise_connect_error():
+    backend = CachingBackend(Inner())
+
+    async def main():
+        with pytest.raises(httpcore.ConnectError):
+            await backend.resolve("nowhere.example", 443)
+
+    run(main, {})
+
+
+@pytest.mark.parametrize("exc, expected", [
+    (httpcore.ConnectTimeout("t"), httpx.ConnectTimeout),
+    (httpcore.ReadError("r"), httpx.ReadError),
+    (httpcore.RemoteProtocolError("p"), httpx.RemoteProtocolError),
+])
+def test_httpcore_errors_map_to_httpx(exc, expected):
+    assert type(_httpx_error(exc)) is expected
+
+
+def test_other_errors_are_not_mapped():
+    assert _httpx_error(ValueError("v")) is None
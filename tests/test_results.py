@@ -0,0 +1,65 @@
+import asyncio
+import io
+
+from mirava.checks import RunOptions, sort_results
+from mirava.headless import write_results
+from mirava.models import CheckResult, LatencyStats
+from mirava.registry.base import BaseRegistry, Probe
+
+
+def stat_columns(results):
+    out = io.StringIO()
+    write_results(results, [], "csv", out)
+    return [c for c in out.getvalue().splitlines()[0].split(",") if c.startswith("latency_") and c != "latency_ms"]
+
+
+def test_single_probe_by_default():
+    assert RunOptions().samples == 1
+
+
+def test_percentile_columns_only_when_sampled():
+    single = CheckResult("m", "PyPI", "https://a", True, 12.0, None)
+    assert stat_columns([single]) == []
+
+    sampled = CheckResult(
+        "m", "PyPI", "https://b", True, 10.0, None,
+        latency=LatencyStats(3, 0.0, 9.0, 10.0, 11.0, 11.0, 30.0),
+    )
+    assert stat_columns([single, sampled]) == [
+        "latency_min_ms", "latency_median_ms", "latency_p90_ms", "latency_p99_ms",
+        "latency_loss_rate", "latency_handshake_ms",
+    ]
+
+
+class Scripted(BaseRegistry):
+    """Answers reachability probes from a list instead of the network."""
+
+    def __init__(self, probes):
+        self.probes = list(probes)
+
+    async def check_reachable(self, client, url, mode="head"):
+        return self.probes.pop(0)
+
+
+def test_latency_is_total_probe_time_with_or_without_samples():
+    single, _ = asyncio.run(Scripted([Probe(True, 80.0, 60.0, "ok", 50.0, 30.0)]).sample_reachable(None, "u"))
+    assert single.latency_ms == 80.0
+
+    probes = [
+        Probe(True, 80.0, 60.0, "ok", 50.0, 30.0),
+        Probe(True, 34.0, 30.0, "ok", 0.0, 34.0),
+        Probe(True, 36.0, 31.0, "ok", 0.0, 36.0),
+    ]
+    sampled, stats = asyncio.run(Scripted(probes).sample_reachable(None, "u", samples=3))
+    assert sampled.latency_ms == 36.0
+    assert (stats.min_ms, stats.median_ms, stats.handshake_ms) == (30.0, 34.0, 50.0)
+
+
+def test_sampled_results_rank_by_median_round_trip():
+    steady = CheckResult(
+        "m", "PyPI", "https://a", True, 40.0, None, latency=LatencyStats(3, 0.0, 9.0, 10.0, 11.0, 11.0, 30.0),
+    )
+    jumpy = CheckResult(
+        "m", "PyPI", "https://b", True, 35.0, None, latency=LatencyStats(3, 0.0, 20.0, 30.0, 31.0, 31.0, None),
+    )
+    assert sort_results([jumpy, steady]) == [steady, jumpy]
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+
+from mirava import checks
+from mirava.checks import RunOptions, run_checks
+from mirava.models import PackageEndpoint
+from mirava.scheduler import ConcurrencyConfig
+
+
+class Mirrors:
+    """Answers HEAD probes after a per-host delay, recording cancelled requests."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.started = []
+        self.cancelled = []
+
+    async def __call__(self, request):
+        host = request.url.host
+        self.started.append(host)
+        try:
+            await asyncio.sleep(self.delays[host])
+        except asyncio.CancelledError:
+            self.cancelled.append(host)
+            raise
+        return httpx.Response(200)
+
+
+def run(mirrors, endpoints, **options):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(mirrors)) as client:
+            return await run_checks(
+                endpoints, [], {}, RunOptions(concurrency=ConcurrencyConfig(initial=16), **options), client=client,
+            )
+
+    return asyncio.run(main())
+
+
+def endpoint(*hosts):
+    return PackageEndpoint("PyPI", [f"https://{h}/simple" for h in hosts], "m", "https://m")
+
+
+def test_race_returns_the_first_winners_and_cancels_the_rest():
+    mirrors = Mirrors({"fast1": 0.01, "fast2": 0.02, "slow1": 5, "slow2": 5})
+    results = run(mirrors, [endpoint("slow1", "fast1"), endpoint("fast2", "slow2")], race=2)
+    assert sorted(r.url for r in results) == ["https://fast1/simple", "https://fast2/simple"]
+    assert sorted(mirrors.cancelled) == ["slow1", "slow2"]
+
+
+def test_hedge_keeps_the_first_good_url_and_cancels_the_slow_one(monkeypatch):
+    monkeypatch.setattr(checks, "HEDGE_FALLBACK_S", 0.05)
+    mirrors = Mirrors({"slow": 5, "fast": 0.01})
+    [result] = run(mirrors, [endpoint("slow", "fast")], hedge=90)
+    assert result.url == "https://fast/simple"
+    # The slow URL was started first, hedged after the delay, then cancelled.
+    assert mirrors.started == ["slow", "fast"]
+    assert mirrors.cancelled == ["slow"]
+
+
+def test_hedge_does_not_start_the_next_url_when_the_first_is_quick(monkeypatch):
+    monkeypatch.setattr(checks, "HEDGE_FALLBACK_S", 1.0)
+    mirrors = Mirrors({"a": 0.01, "b": 0.01})
+    [result] = run(mirrors, [endpoint("a", "b")], hedge=90)
+    assert result.url == "https://a/simple"
+    assert mirrors.started == ["a"]
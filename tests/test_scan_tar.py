@@ -0,0 +1,91 @@
+import asyncio
+import concurrent.futures
+import io
+import tarfile
+import threading
+import zlib
+
+import pytest
+
+from mirava.registry.os.generic import ChunkReader, scan_tar
+
+
+def tarball(names):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tf:
+        for n in names:
+            info = tarfile.TarInfo(f"{n}-1.0-1/desc")
+            body = f"%NAME%\n{n}\n".encode() * 200
+            info.size = len(body)
+            tf.addfile(info, io.BytesIO(body))
+    return zlib.compress(buf.getvalue(), wbits=16 + zlib.MAX_WBITS)
+
+
+def test_scan_tar_stops_early_and_leaves_the_rest_unread():
+    data = tarball([f"pkg{i}" for i in range(200)])
+    pulled = []
+
+    async def stream():
+        for i in range(0, len(data), 512):
+            pulled.append(i)
+            yield data[i:i + 512]
+
+    def scan(tf):
+        for member in tf:
+            if member.name.startswith("pkg2-"):
+                return {"pkg2"}
+        return set()
+
+    assert asyncio.run(scan_tar(stream(), scan)) == {"pkg2"}
+    assert len(pulled) < len(data) // 512
+
+
+def test_cancelled_scan_waits_for_the_worker_thread():
+    started, release = threading.Event(), threading.Event()
+    finished = []
+
+    async def stream():
+        while True:
+            yield b"\0" * 512
+
+    def scan(tf):
+        started.set()
+        release.wait(5)
+        finished.append(True)
+        return set()
+
+    async def main():
+        task = asyncio.ensure_future(scan_tar(stream(), scan))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        # Not done until the worker thread has let go of the stream.
+        assert not task.done()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert finished
+
+    asyncio.run(main())
+
+
+def test_chunk_reader_close_unblocks_a_waiting_thread():
+    async def main():
+        gate = asyncio.Event()
+
+        async def stream():
+            yield b"abc"
+            await gate.wait()
+            yield b"never read"
+
+        reader = ChunkReader(stream(), asyncio.get_running_loop())
+        first = await asyncio.to_thread(reader.read, 3)
+        blocked = asyncio.ensure_future(asyncio.to_thread(reader.read, 3))
+        await asyncio.sleep(0.05)
+        reader.close()
+        with pytest.raises((asyncio.CancelledError, concurrent.futures.CancelledError)):
+            await blocked
+        return first
+
+    assert asyncio.run(main()) == b"abc"
@@ -0,0 +1,78 @@
+import asyncio
+
+from mirava.scheduler import AdaptiveLimiter, ConcurrencyConfig
+
+
+def limiter(**kwargs):
+    return AdaptiveLimiter(ConcurrencyConfig(initial=4, minimum=2, maximum=6, per_host=2, **kwargs))
+
+
+def window(lim, elapsed, timed_out=False):
+    """Feed one full window of completions."""
+    for _ in range(max(4, int(lim.limit))):
+        lim._record(elapsed, timed_out)
+
+
+def test_flat_windows_increase_up_to_the_maximum():
+    lim = limiter()
+    for expected in (5, 6, 6):
+        window(lim, 0.1)
+        assert lim.limit == expected
+
+
+def test_timeouts_halve_down_to_the_minimum():
+    lim = limiter()
+    window(lim, 0.1, timed_out=True)
+    assert lim.limit == 2
+    window(lim, 0.1, timed_out=True)
+    assert lim.limit == 2
+
+
+def test_latency_doubling_against_the_best_window_halves():
+    lim = limiter()
+    window(lim, 0.1)
+    assert lim.limit == 5
+    window(lim, 0.25)
+    assert lim.limit == 2.5
+
+
+def test_slots_respect_the_limit_and_per_host_cap():
+    async def main():
+        lim = limiter()
+        seen = []
+        gate = asyncio.Event()
+
+        async def check(host):
+            async with lim.slot(host):
+                seen.append((lim.in_flight, lim._per_host[host]))
+                await gate.wait()
+
+        tasks = [asyncio.ensure_future(check(h)) for h in ["a"] * 3 + ["b"] * 3]
+        await asyncio.sleep(0.01)
+        # Limit 4, but at most 2 per host: a, a, b, b.
+        assert lim.in_flight == 4
+        gate.set()
+        await asyncio.gather(*tasks)
+        assert max(n for n, _ in seen) <= 4
+        assert max(h for _, h in seen) <= 2
+        assert lim.peak == 4
+
+    asyncio.run(main())
+
+
+def test_cancelled_checks_are_not_recorded():
+    async def main():
+        lim = limiter()
+
+        async def check():
+            async with lim.slot("a"):
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(check())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert lim.in_flight == 0
+        assert lim._window == []
+
+    asyncio.run(main())
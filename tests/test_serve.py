@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+
+from mirava import serve
+from mirava.serve import MAX_PACKAGES, Ranking, RankingCache, parse_query
+
+
+def ranking(expires):
+    return Ranking(expires=expires, checked_at=0.0, results=[], best_body=b"{}", ranking_body=b"{}")
+
+
+def query(n):
+    return ("PyPI", (f"p{n}",), ())
+
+
+def test_parse_query_caps_packages():
+    ok = {"registry": ["PyPI"], "package": [",".join(f"p{i}" for i in range(MAX_PACKAGES))]}
+    assert len(parse_query(ok, {})[1]) == MAX_PACKAGES
+    with pytest.raises(ValueError, match="at most"):
+        parse_query({"registry": ["PyPI"], "package": [f"p{i}" for i in range(MAX_PACKAGES + 1)]}, {})
+
+
+def test_cache_evicts_least_recently_used_and_expired():
+    cache = RankingCache(catalog=None, options=None, limiter=None, ttl=60, max_entries=3)
+    later = time.monotonic() + 60
+    for n in range(3):
+        cache._store(query(n), ranking(later))
+    # Touch q0 so q1 is the least recently used.
+    assert asyncio.run(cache.get(query(0))).expires == later
+    cache._store(query(3), ranking(later))
+    assert list(cache._entries) == [query(2), query(0), query(3)]
+
+    cache._entries[query(2)] = ranking(time.monotonic() - 1)
+    cache._store(query(4), ranking(later))
+    assert list(cache._entries) == [query(0), query(3), query(4)]
+
+
+def test_expired_entry_is_dropped_on_lookup(monkeypatch):
+    cache = RankingCache(catalog=None, options=None, limiter=None, ttl=60)
+    cache._entries[query(0)] = ranking(time.monotonic() - 1)
+    fresh = ranking(time.monotonic() + 60)
+
+    async def check(q):
+        assert q not in cache._entries
+        cache._store(q, fresh)
+        return fresh
+
+    monkeypatch.setattr(cache, "_check", check)
+    assert asyncio.run(cache.get(query(0))) is fresh
+    assert cache.misses == 1
+
+
+def test_failed_route_answers_500():
+    async def route(request):
+        raise RuntimeError("wave failed")
+
+    async def main():
+        server = await asyncio.start_server(lambda r, w: serve._serve_connection(r, w, route), "127.0.0.1", 0)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /best?registry=PyPI HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+        return response
+
+    response = asyncio.run(main())
+    assert response.startswith(b"HTTP/1.1 500 ")
+    assert response.endswith(b'{"error": "RuntimeError: wave failed"}')
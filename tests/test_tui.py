@@ -0,0 +1,44 @@
+from mirava.checks import result_key, sort_results
+from mirava.models import CheckResult
+from mirava.tui import _LiveResults, _run_and_show
+
+
+def result(name, reachable, latency_ms):
+    return CheckResult(name, "PyPI", f"https://{name}/", reachable, latency_ms, None)
+
+
+RESULTS = [
+    result("slow", True, 300.0),
+    result("down", False, None),
+    result("fast", True, 20.0),
+    result("tied", True, 20.0),
+    result("medium", True, 90.0),
+]
+
+
+def live():
+    view = _LiveResults(result_key(), benchmark=False)
+    for done, r in enumerate(RESULTS, 1):
+        view.add(r, done, len(RESULTS), 0.0)
+    return view
+
+
+def test_results_are_ranked_as_they_arrive():
+    view = live()
+    ranked = [r for _, _, r in view._ranked]
+    assert [r.mirror_name for r in ranked] == ["fast", "tied", "medium", "slow", "down"]
+    # The live order matches the final table.
+    assert ranked == sort_results(RESULTS)
+    assert (view.done, view.total, view.ok) == (5, 5, 4)
+
+
+def test_render_draws_the_best_mirror_first():
+    text = "".join(fragment for _, fragment in live()._render())
+    positions = [text.index(f"https://{name}/") for name in ("fast", "tied", "medium", "slow", "down")]
+    assert positions == sorted(positions)
+    assert "5/5" in text
+
+
+def test_run_and_show_without_options(capsys):
+    assert _run_and_show([], [], {}) == []
+    assert "0 total" in capsys.readouterr().out
@@ -0,0 +1,113 @@
+import asyncio
+import contextlib
+import json
+
+from mirava import checks
+from mirava.checks import RunOptions
+from mirava.models import CheckResult, PackageEndpoint
+from mirava.watch import EndpointHistory, Watcher, write_state
+
+
+def result(url, reachable=True, latency_ms=10.0, name="PyPI"):
+    return CheckResult("m", name, url, reachable, latency_ms if reachable else None, None)
+
+
+def history(*samples):
+    h = EndpointHistory("PyPI", "m", "https://a/", 10)
+    for at, (reachable, latency) in enumerate(samples, 1):
+        h.record(result("https://a/", reachable, latency), at=at)
+    return h
+
+
+def watcher(*urls, history=10):
+    return Watcher([PackageEndpoint("PyPI", list(urls), "m", "https://m/")], RunOptions(), {}, history=history)
+
+
+def test_history_keeps_the_last_results():
+    h = EndpointHistory("PyPI", "m", "https://a/", 3)
+    for reachable in (False, True, True, True):
+        h.record(result("https://a/", reachable))
+    assert len(h.samples) == 3
+    assert h.up and h.uptime == 1.0
+
+
+def test_uptime_and_median_latency():
+    h = history((True, 10.0), (False, None), (True, 30.0), (True, 20.0))
+    assert h.uptime == 0.75
+    assert h.median_latency_ms == 20.0
+    assert h.up
+
+
+def test_reliable_slower_mirror_ranks_before_flaky_fast_one():
+    steady = history((True, 40.0), (True, 40.0), (True, 40.0), (True, 40.0))
+    flaky = history((True, 25.0), (False, None), (False, None), (True, 25.0))
+    assert steady.rank_key() < flaky.rank_key()
+
+
+def test_down_mirror_ranks_last_whatever_its_latency():
+    down = history((True, 1.0), (False, None))
+    slow = history((True, 900.0))
+    assert slow.rank_key() < down.rank_key()
+
+
+def test_ranking_skips_unchecked_urls_and_best_needs_an_up_mirror():
+    w = watcher("https://a/", "https://b/", "https://c/")
+    w.record(result("https://a/", latency_ms=50.0))
+    w.record(result("https://b/", latency_ms=5.0))
+    assert [h.url for h in w.ranking("PyPI")] == ["https://b/", "https://a/"]
+    assert w.best("PyPI").url == "https://b/"
+
+    for url in ("https://a/", "https://b/"):
+        w.record(result(url, reachable=False))
+    assert w.best("PyPI") is None
+    assert w.best("npm") is None
+
+
+def test_results_for_unknown_urls_are_ignored():
+    w = watcher("https://a/")
+    w.record(result("https://elsewhere/"))
+    assert w.version == 0
+    assert w.ranking("PyPI") == []
+
+
+def test_write_state(tmp_path):
+    w = watcher("https://a/", "https://b/")
+    w.record(result("https://a/", latency_ms=12.0))
+    path = tmp_path / "state" / "watch.json"
+    write_state(w, path)
+    state = json.loads(path.read_text(encoding="utf-8"))
+    assert state["interval_s"] == w.interval
+    [entry] = state["endpoints"]["PyPI"]
+    assert entry["url"] == "https://a/"
+    assert entry["up"] and entry["uptime"] == 1.0 and entry["median_latency_ms"] == 12.0
+    assert not list(tmp_path.glob("state/*.tmp"))
+
+
+def test_run_rechecks_every_url_on_its_own_schedule(monkeypatch):
+    checked = {}
+
+    @contextlib.asynccontextmanager
+    async def open_client(config):
+        yield None
+
+    async def check_url(client, ep, url, packages, os_kwargs, options, limiter):
+        checked.setdefault(url, []).append(asyncio.get_running_loop().time())
+        return result(url)
+
+    monkeypatch.setattr(checks, "open_client", open_client)
+    monkeypatch.setattr(checks, "check_url", check_url)
+    w = watcher("https://a/", "https://b/")
+    w.interval, w.jitter = 0.1, 0.0
+
+    async def main():
+        stop = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.45, stop.set)
+        await w.run(stop)
+
+    asyncio.run(main())
+    assert set(checked) == {"https://a/", "https://b/"}
+    for times in checked.values():
+        assert len(times) >= 3
+        # The next check is scheduled when the previous one finishes.
+        assert all(b - a >= 0.09 for a, b in zip(times, times[1:]))
+    assert w.version == sum(len(t) for t in checked.values())
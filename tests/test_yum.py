@@ -0,0 +1,34 @@
+import asyncio
+
+from mirava.registry.os.yum import _MAX_CARRY, _iter_names
+
+
+async def chunked(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def collect(aiter):
+    return [item async for item in aiter]
+
+
+def test_yum_name_split_at_the_carry_boundary():
+    # The element straddles the chunk boundary after a long run without </name>.
+    filler = b"<package><description>" + b"d" * (2 * _MAX_CARRY) + b"</description>"
+    xml = b"<metadata>" + filler + b"<name>curl</name>" + filler + b"<name>gcc</name></metadata>"
+
+    for cut in (xml.index(b"<name>curl") + 3, xml.index(b"curl") + 2, xml.index(b"</name>") + 4):
+        chunks = [xml[:cut], xml[cut:]]
+
+        async def stream():
+            for c in chunks:
+                yield c
+
+        names = asyncio.run(collect(_iter_names(stream(), lambda b: b, "primary.xml")))
+        assert names == ["curl", "gcc"], cut
+
+
+def test_yum_name_after_a_long_run_without_names():
+    xml = b"<metadata>" + b"z" * (10 * _MAX_CARRY) + b"<name>curl</name></metadata>"
+    names = asyncio.run(collect(_iter_names(chunked(xml, _MAX_CARRY - 1), lambda b: b, "primary.xml")))
+    assert names == ["curl"]